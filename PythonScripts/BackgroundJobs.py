@@ -0,0 +1,128 @@
+# Runs heavy calculations (simulations, exact distributions, sweeps) away from the Tk mainloop
+# A job is a list of tasks sent to a process pool (or a thread pool). The window polls for finished tasks with after(),
+# so partial results can be shown while the rest of the job is still running and the window never stops responding.
+# Submitting a job with the same name as a running one cancels the old one, its remaining results are never delivered
+
+import os
+
+
+# Milliseconds between checks for finished tasks
+POLL_INTERVAL_MS = 50
+
+
+# The futures of one submitted job and the callbacks to deliver their results to
+class Job:
+    def __init__(self, futures, on_partial, on_done, on_error):
+        self.futures = futures
+        self.pending = list(futures)
+        self.completed = 0
+        self.cancelled = False
+        self.on_partial = on_partial
+        self.on_done = on_done
+        self.on_error = on_error
+
+    @property
+    def total(self):
+        return len(self.futures)
+
+    def cancel(self):
+        self.cancelled = True
+        for future in self.pending:
+            future.cancel()
+
+
+class BackgroundJobs:
+    # widget is any Tk widget, used to schedule polling on the mainloop
+    def __init__(self, widget, max_workers=None):
+        self.widget = widget
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.process_pool = None
+        self.thread_pool = None
+        self.jobs = {}
+        self.poll_job = None
+
+    # Pools are only started (and concurrent.futures imported) the first time they are needed, which keeps startup fast
+    def _executor(self, in_process):
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        if in_process:
+            if self.process_pool is None:
+                self.process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self.process_pool
+        if self.thread_pool is None:
+            self.thread_pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self.thread_pool
+
+    # Run tasks, a list of (function, args) pairs, as the job called name
+    # on_partial(result, completed, total) is called on the mainloop as each task finishes (in completion order),
+    # on_done() once all of them have, and on_error(exception) if one fails, which also stops the job
+    def submit(self, name, tasks, on_partial, on_done=None, on_error=None, in_process=True):
+        self.cancel(name)
+        executor = self._executor(in_process)
+        futures = [executor.submit(function, *args) for function, args in tasks]
+        self.jobs[name] = Job(futures, on_partial, on_done, on_error)
+        self._schedule_poll()
+
+    # Stop a job, tasks that haven't started are dropped and results of running ones are ignored
+    def cancel(self, name):
+        job = self.jobs.pop(name, None)
+        if job is not None:
+            job.cancel()
+
+    def cancel_all(self):
+        for name in list(self.jobs):
+            self.cancel(name)
+
+    def is_running(self, name):
+        return name in self.jobs
+
+    # Cancel everything and stop the pools, for when the window closes
+    def shutdown(self):
+        self.cancel_all()
+        if self.poll_job is not None:
+            self.widget.after_cancel(self.poll_job)
+            self.poll_job = None
+        for pool in (self.process_pool, self.thread_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self.process_pool = None
+        self.thread_pool = None
+
+    def _schedule_poll(self):
+        if self.poll_job is None:
+            self.poll_job = self.widget.after(POLL_INTERVAL_MS, self._poll)
+
+    # Deliver the results of finished tasks, then poll again while any job is still running
+    def _poll(self):
+        self.poll_job = None
+
+        for name, job in list(self.jobs.items()):
+            finished = [future for future in job.pending if future.done()]
+            for future in finished:
+                # A callback may have cancelled or replaced this job
+                if job.cancelled:
+                    break
+                job.pending.remove(future)
+                error = future.exception()
+                if error is not None:
+                    self._finish(name, job)
+                    if job.on_error is not None:
+                        job.on_error(error)
+                    break
+                job.completed += 1
+                job.on_partial(future.result(), job.completed, job.total)
+
+            if not job.cancelled and not job.pending and self.jobs.get(name) is job:
+                self._finish(name, job)
+                if job.on_done is not None:
+                    job.on_done()
+
+        if self.jobs:
+            self._schedule_poll()
+
+    # Stop delivering a job's results, and drop its tasks that haven't started (after an error they would only hold up
+    # the workers the next job needs)
+    def _finish(self, name, job):
+        job.cancel()
+        if self.jobs.get(name) is job:
+            del self.jobs[name]
@@ -0,0 +1,72 @@
+# Sorted index over a badge ladder, for finding the badge a point total has reached and how far it is from the next one
+# Single point totals are looked up with bisect and whole arrays (e.g. a leaderboard) with np.searchsorted
+
+from bisect import bisect_right
+
+import numpy as np
+
+
+class BadgeIndex:
+    # badge_options is a list of (label, points needed) pairs, like the world tour badges
+    def __init__(self, badge_options):
+        ladder = sorted(badge_options, key=lambda option: option[1])
+        self.labels = [label for label, _ in ladder]
+        self.thresholds = [points for _, points in ladder]
+        self.threshold_array = np.array(self.thresholds, dtype=np.int64)
+        # Label lookups for arrays, with "" for "no badge yet" (index -1) and "no next badge" (index len)
+        self.label_array = np.array([""] + self.labels + [""], dtype=object)
+
+    def __len__(self):
+        return len(self.thresholds)
+
+    # Current badge, next badge, points to the next badge, and percent through the current tier for one point total
+    # The current badge is None before the first badge, and the next badge is None once the last badge is reached
+    def classify(self, points):
+        current = bisect_right(self.thresholds, points) - 1
+        next_index = current + 1
+
+        if next_index < len(self.thresholds):
+            tier_start = self.thresholds[current] if current >= 0 else 0
+            tier_end = self.thresholds[next_index]
+            points_to_next = tier_end - points
+            percent = (points - tier_start) / (tier_end - tier_start) * 100
+        else:
+            points_to_next = 0
+            percent = 100.0
+
+        return {
+            "current_badge": self.labels[current] if current >= 0 else None,
+            "next_badge": self.labels[next_index] if next_index < len(self.labels) else None,
+            "points_to_next": points_to_next,
+            "percent_through_tier": percent,
+        }
+
+    # Same as classify for a whole array of point totals, badges are returned as indexes into labels
+    # (-1 for no badge yet, len(self) for no next badge), use badge_labels to turn them into names
+    def classify_array(self, points):
+        points = np.asarray(points, dtype=np.int64)
+        thresholds = self.threshold_array
+
+        current = np.searchsorted(thresholds, points, side="right") - 1
+        next_index = current + 1
+        has_next = next_index < len(thresholds)
+
+        # Tier bounds with 0 below the first badge, and the last badge repeated after it
+        padded = np.concatenate(([0], thresholds, thresholds[-1:]))
+        tier_start = padded[current + 1]
+        tier_end = padded[next_index + 1]
+
+        points_to_next = np.where(has_next, tier_end - points, 0)
+        tier_size = np.where(has_next, tier_end - tier_start, 1)
+        percent = np.where(has_next, (points - tier_start) / tier_size * 100, 100.0)
+
+        return {
+            "current_badge": current,
+            "next_badge": next_index,
+            "points_to_next": points_to_next,
+            "percent_through_tier": percent,
+        }
+
+    # Names for badge indexes returned by classify_array
+    def badge_labels(self, indexes):
+        return self.label_array[np.asarray(indexes) + 1]
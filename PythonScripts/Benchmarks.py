@@ -0,0 +1,446 @@
+# Benchmarks for the calculator's hot paths: the engine, formatting, the bulk modes, and the window's refreshes
+# Run "python Benchmarks.py -o results.json" to save the timings, and "python Benchmarks.py --baseline results.json"
+# later to compare against them. The comparison exits with 1 when a benchmark is slower than the baseline by more than
+# the threshold (25% by default), so it can gate a build
+#
+# Inputs are generated from fixed seeds, so every run times the same work. Bulk paths are timed at 1, 1,000 and
+# 1,000,000 inputs (--quick stops at 1,000). The window benchmarks need a display, on a machine without one run them
+# under a virtual display, e.g. "xvfb-run python Benchmarks.py", otherwise they are skipped
+#
+# The startup benchmarks time a fresh interpreter each run, importing the window's module (startup.import) and opening
+# the window until its startup has finished (startup.window, the same run as "--startup-profile")
+
+import argparse
+from datetime import date
+from itertools import cycle, islice
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tkinter as tk
+
+import numpy as np
+
+from BadgeIndex import BadgeIndex
+from BudgetOdds import budget_odds_curve
+from CalculationEngine import calculate_batch, division_round_up
+from GameConstants import (
+    ADDITIONAL_GAME_TIME,
+    BASE_GAME_TIME,
+    BATCH_OUTPUT_COLUMNS,
+    ROUND_POINTS,
+    ROUND_WEIGHTS,
+    ROW_LABELS,
+    WORLD_TOUR_BADGE_OPTIONS,
+)
+from CalculatorServer import CalculatorServer
+from CommandLine import badge_points_lookup, batch_results, roster_chunk
+from ExactDistribution import ExactDistributionTable
+from GrindSchedule import GrindSchedule, fill_minutes, loading_weights
+from ModeComparison import Mode, ModeTable, compare_modes
+from PlaytimeSimulator import simulate_chunk, simulation_arguments, simulation_chunks
+from ProgressHistory import PaceEstimate
+from ReportExport import write_report
+from RoundMixPlanner import max_win_rate, min_quick_play_share, plan_round_mix
+from RoundResults import format_duration, format_durations
+from SeasonData import default_registry
+from WeightSweep import sweep_weights
+from WorldTourCalculator import WorldTourCalculator
+
+
+# Sizes the bulk paths are timed at
+BULK_SIZES = (1, 1000, 1000000)
+QUICK_SIZES = (1, 1000)
+
+# Each timing repeats a benchmark until it has run for at least this many seconds
+MIN_TIME = 0.05
+REPEATS = 5
+
+# A benchmark regresses when it is this much slower than the baseline
+REGRESSION_THRESHOLD = 0.25
+
+GAME_TIME = BASE_GAME_TIME + ADDITIONAL_GAME_TIME
+SEED = 2024
+
+SCRIPT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (setup function, sizes or None, needs a display)
+_BENCHMARKS = {}
+
+
+# Register a benchmark, the setup function takes the size (when there are sizes) and returns the function to time
+def benchmark(name, sizes=None, display=False):
+    def register(setup):
+        _BENCHMARKS[name] = (setup, sizes, display)
+        return setup
+    return register
+
+
+def _points(size, low=0, high=2400):
+    return np.random.default_rng(SEED).integers(low, high, size)
+
+
+# --- Engine ---
+@benchmark("engine.calculate_batch", BULK_SIZES)
+def _calculate_batch(size):
+    current_points = _points(size)
+    return lambda: calculate_batch(current_points, 2400, GAME_TIME, 60)
+
+
+@benchmark("engine.division_round_up", BULK_SIZES)
+def _division_round_up(size):
+    points_remaining = _points(size)[:, None]
+    points = np.asarray(ROUND_POINTS)
+    return lambda: division_round_up(points_remaining, points)
+
+
+@benchmark("badges.classify_array", BULK_SIZES)
+def _classify_array(size):
+    index = BadgeIndex(WORLD_TOUR_BADGE_OPTIONS)
+    points = _points(size, 0, 2600)
+    return lambda: index.classify_array(points)
+
+
+@benchmark("badges.classify")
+def _classify():
+    index = BadgeIndex(WORLD_TOUR_BADGE_OPTIONS)
+    return lambda: index.classify(1234)
+
+
+@benchmark("planner.plan_round_mix")
+def _plan_round_mix():
+    constraints = (max_win_rate(0.2), min_quick_play_share(0.4))
+    return lambda: plan_round_mix(2400, GAME_TIME, constraints)
+
+
+@benchmark("simulation.simulate_chunk")
+def _simulate_chunk():
+    arguments = simulation_arguments(2400, GAME_TIME, ROUND_WEIGHTS, ROUND_POINTS, (1, 2, 3, 3, 1, 1, 1))
+    seed, size = simulation_chunks(8192, SEED)[0]
+    return lambda: simulate_chunk(seed, size, *arguments)
+
+
+@benchmark("exact.build_table")
+def _build_table():
+    return lambda: ExactDistributionTable(ROUND_WEIGHTS, GAME_TIME)
+
+
+@benchmark("odds.budget_odds_curve")
+def _budget_odds_curve():
+    return lambda: budget_odds_curve(2400, 100, GAME_TIME)
+
+
+# Mode tables of 10 and 1,000 modes, the comparison is one pass over the table so it should grow far slower than that
+@benchmark("modes.compare_modes", (10, 1000))
+def _compare_modes(size):
+    rng = np.random.default_rng(SEED)
+    table = ModeTable([
+        Mode(f"Mode {i}", "Benchmark", ["Win", "Second", "Lose"], rng.integers(1, 30, 3).tolist(),
+             weights=rng.uniform(0, 1, 3).tolist(), game_time=int(rng.integers(5, 15)))
+        for i in range(size)
+    ])
+    return lambda: compare_modes(table, 1550, 60)
+
+
+# A 120 day season: one player's replan for a new point total, and the plan of every player of a roster at once
+@benchmark("schedule.replan")
+def _schedule_replan():
+    today = date(2026, 1, 1)
+    schedule = GrindSchedule(0, 2400, today, date(2026, 5, 1), [60, 60, 60, 60, 90, 240, 240], loading="front")
+    return lambda: schedule.replan(800, date(2026, 2, 1))
+
+
+@benchmark("schedule.fill_minutes", (1, 1000, 10000))
+def _schedule_fill_minutes(size):
+    rng = np.random.default_rng(SEED)
+    capacity = np.tile([60.0, 60, 60, 60, 90, 240, 240], 18)[:120]
+    weights = loading_weights(120, "back")
+    minutes_needed = rng.uniform(0, 15000, size)
+    return lambda: fill_minutes(capacity, weights, minutes_needed)
+
+
+@benchmark("sweep.sweep_weights")
+def _sweep_weights():
+    return lambda: sweep_weights(0, 2400, GAME_TIME, 60)
+
+
+@benchmark("history.sixty_snapshots")
+def _sixty_snapshots():
+    season_end, today = date(2026, 3, 26), date(2026, 1, 1)
+
+    def run():
+        estimate = PaceEstimate.first(0.0, 0)
+        for day in range(1, 61):
+            estimate.add(float(day), day * 40)
+        return estimate.forecast(2400, season_end, today)
+    return run
+
+
+# --- Bulk Modes ---
+def _player_rows(size):
+    rng = np.random.default_rng(SEED)
+    template = [
+        {"player": f"player{i}", "current_points": str(points), "goal": "Emerald 1"}
+        for i, points in enumerate(rng.integers(0, 2400, min(size, 1000)).tolist())
+    ]
+    return lambda: islice(cycle(template), size)
+
+
+@benchmark("cli.batch_results", BULK_SIZES)
+def _batch_results(size):
+    rows = _player_rows(size)
+    badge_points = badge_points_lookup(WORLD_TOUR_BADGE_OPTIONS)
+    return lambda: sum(1 for _ in batch_results(rows(), 60, badge_points))
+
+
+# Stream that drops what is written, so the export benchmarks only time the formatting
+class _NullStream:
+    def write(self, data):
+        return len(data)
+
+
+# Batch output rows written as each report format, the rows are worked out once beforehand
+def _export_benchmark(output_format):
+    def setup(size):
+        badge_points = badge_points_lookup(WORLD_TOUR_BADGE_OPTIONS)
+        rows = list(batch_results(_player_rows(size)(), 60, badge_points))
+        return lambda: write_report(_NullStream(), output_format, BATCH_OUTPUT_COLUMNS, rows)
+    return setup
+
+
+for _format in ("csv", "jsonl", "html", "columnar"):
+    benchmark(f"export.{_format}", BULK_SIZES)(_export_benchmark(_format))
+
+
+@benchmark("cli.roster_chunk", BULK_SIZES)
+def _roster_chunk(size):
+    rows = list(_player_rows(size)())
+    badge_points = badge_points_lookup(WORLD_TOUR_BADGE_OPTIONS)
+    return lambda: roster_chunk(rows, 60, badge_points, WORLD_TOUR_BADGE_OPTIONS, ROUND_POINTS, 120)
+
+
+@benchmark("server.calculate_keys", QUICK_SIZES)
+def _calculate_keys(size):
+    server = CalculatorServer(default_registry())
+    keys = [
+        (points, 2400, GAME_TIME, tuple(float(w) for w in ROUND_WEIGHTS), 60) for points in _points(size).tolist()
+    ]
+    return lambda: server.calculate_keys(keys)
+
+
+# --- Formatting ---
+@benchmark("format.format_duration")
+def _format_duration():
+    minutes = cycle([5, 75, 1500, 15535])
+    return lambda: format_duration(next(minutes))
+
+
+@benchmark("format.format_durations", BULK_SIZES)
+def _format_durations(size):
+    minutes = np.random.default_rng(SEED).uniform(0, 40000, size)
+    return lambda: format_durations(minutes)
+
+
+@benchmark("format.table_rows")
+def _table_rows():
+    results = calculate_batch(850, 2400, GAME_TIME, 60).round_results()
+    return lambda: results.table_rows(ROW_LABELS)
+
+
+# --- Window ---
+_app = None
+
+
+def _window():
+    global _app
+    if _app is None:
+        _app = WorldTourCalculator()
+        _app.withdraw()
+    return _app
+
+
+def _display_available():
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        return False
+    try:
+        tk.Tk().destroy()
+    except tk.TclError:
+        return False
+    return True
+
+
+@benchmark("gui.calculate", display=True)
+def _gui_calculate():
+    app = _window()
+    points = cycle(["0", "850", "1700"])
+
+    def run():
+        app.points_var.set(next(points))
+        app.calculate()
+    return run
+
+
+@benchmark("gui.validate_weight", display=True)
+def _gui_validate_weight():
+    app = _window()
+    values = cycle(["25", "30"])
+
+    def run():
+        # Setting the variable fires the trace, like typing in the entry
+        app.round_weights_vars[0].set(next(values))
+        app.validate_weight(0, app.round_weights_vars)
+    return run
+
+
+@benchmark("gui.refresh_games_table", display=True)
+def _gui_refresh_games_table():
+    app = _window()
+    data = app.tab_data[app.current_tab]
+    tables = cycle([
+        [[label, i, f"{i} minutes"] for i, label in enumerate(app.row_labels)],
+        [[label, i + 1, f"{i + 1} minutes"] for i, label in enumerate(app.row_labels)],
+    ])
+
+    def run():
+        data["tree_data"] = next(tables)
+        app.refresh_games_table()
+    return run
+
+
+# --- Startup ---
+@benchmark("startup.import")
+def _startup_import():
+    command = [sys.executable, "-c", "import WorldTourCalculator"]
+    return lambda: subprocess.run(command, cwd=SCRIPT_DIRECTORY, check=True)
+
+
+@benchmark("startup.window", display=True)
+def _startup_window():
+    command = [sys.executable, "WorldTourCalculator.py", "--startup-profile"]
+    return lambda: subprocess.run(command, cwd=SCRIPT_DIRECTORY, check=True, stderr=subprocess.DEVNULL)
+
+
+# --- Running ---
+# Seconds per call of function, as the median and minimum of repeated timings
+def measure(function, min_time=MIN_TIME, repeats=REPEATS):
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(loops):
+            function()
+        timings.append((time.perf_counter() - started) / loops)
+
+    return {"median": statistics.median(timings), "min": min(timings), "loops": loops, "repeats": repeats}
+
+
+def run_benchmarks(names=None, quick=False, min_time=MIN_TIME, repeats=REPEATS, stream=sys.stderr):
+    results = {}
+    skipped = {}
+    display = None
+
+    for name, (setup, sizes, needs_display) in _BENCHMARKS.items():
+        if names and not any(name.startswith(prefix) for prefix in names):
+            continue
+        if needs_display:
+            if display is None:
+                display = _display_available()
+            if not display:
+                skipped[name] = "no display"
+                continue
+
+        for size in sizes or (None,):
+            if quick and size is not None and size > max(QUICK_SIZES):
+                continue
+            key = name if size is None else f"{name}[{size}]"
+            result = measure(setup(size) if size is not None else setup(), min_time, repeats)
+            results[key] = result
+            print(f"{key}: {format_seconds(result['median'])}", file=stream)
+
+    if _app is not None:
+        _app.on_close()
+
+    return {
+        "metadata": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": SEED,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+# Benchmarks slower than the baseline by more than threshold, as (name, baseline seconds, seconds) tuples
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD, stream=sys.stderr):
+    regressions = []
+    for name, result in results["results"].items():
+        if name not in baseline["results"]:
+            continue
+        # The fastest timing is compared, it is the least affected by other work on the machine
+        before = baseline["results"][name]["min"]
+        after = result["min"]
+        change = after / before - 1 if before > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append((name, before, after))
+            flag = "  REGRESSION"
+        print(f"{name}: {format_seconds(before)} -> {format_seconds(after)} ({change:+.1%}){flag}", file=stream)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the calculator's hot paths")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved earlier")
+    parser.add_argument(
+        "--threshold", type=float, default=REGRESSION_THRESHOLD * 100,
+        help="percent slower than the baseline that counts as a regression (default %(default).0f%%)",
+    )
+    parser.add_argument("--quick", action="store_true", help="skip the 1,000,000 input sizes")
+    parser.add_argument("--filter", nargs="+", help="only run benchmarks whose names start with these")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="seconds each timing runs for at least")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="timings per benchmark")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.filter, args.quick, args.min_time, args.repeats)
+    for name, reason in results["skipped"].items():
+        print(f"{name}: skipped ({reason})", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold / 100)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0f}%", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# Chance of reaching the goal points before the season ends when playing a set number of minutes each day
+# Each day, games are started while the first round of a game still fits in the day's play time, and every game takes
+# game_time x its round's time multiplier. The points earned in one day are worked out exactly for each budget,
+# then added up over the days left with FFT convolutions (raising the day's distribution to the power of the number
+# of days), so 100+ days of thousands of games take milliseconds
+
+import numpy as np
+
+from GameConstants import (
+    ADDITIONAL_GAME_TIME,
+    BASE_GAME_TIME,
+    ROUND_POINTS,
+    ROUND_TIME_MULTIPLIERS,
+    ROUND_WEIGHTS,
+)
+
+
+# Daily play times (minutes) in the default odds curve
+DAILY_BUDGETS = tuple(range(0, 481, 15))
+
+# Chances the budget needed for is shown
+BUDGET_TARGETS = (0.5, 0.9)
+
+
+# Chance of earning each number of points in one day, index = points
+def day_points_distribution(daily_minutes, game_time, round_weights=ROUND_WEIGHTS, round_points=ROUND_POINTS,
+                            round_time_multipliers=ROUND_TIME_MULTIPLIERS):
+    if game_time <= 0:
+        raise ValueError("Game time must be above 0 minutes")
+    weights = np.asarray(round_weights, dtype=np.float64)
+    if weights.sum() <= 0 or weights.min() < 0:
+        raise ValueError("Round weights must not be negative and at least one must be above 0")
+    weights = weights / weights.sum()
+    points = [int(p) for p in round_points]
+    slots = [int(m) for m in round_time_multipliers]
+
+    # Time is counted in rounds, a game can start while at least one round fits in the day
+    day_slots = int(daily_minutes // game_time)
+    max_points = (day_slots + max(slots)) * max(p / s for p, s in zip(points, slots))
+    size = int(max_points) + max(points) + 1
+
+    # at_slot[s] is the chance of having played s rounds with each number of points and still playing
+    at_slot = np.zeros((day_slots + max(slots), size))
+    at_slot[0, 0] = 1.0
+    day = np.zeros(size)
+    for s in range(day_slots + max(slots)):
+        if s >= day_slots:
+            day += at_slot[s]
+            continue
+        state = at_slot[s]
+        reached = np.flatnonzero(state)
+        if len(reached) == 0:
+            continue
+        top = reached[-1] + 1
+        for weight, p, m in zip(weights, points, slots):
+            if weight > 0:
+                at_slot[s + m, p:p + top] += weight * state[:top]
+
+    # Trim the unused tail
+    last = np.flatnonzero(day)
+    return day[:last[-1] + 1] if len(last) else np.ones(1)
+
+
+# Product of two sets of point distributions (one per row, the second already transformed), keeping only the chances
+# below limit points
+def _truncated_product(a, b_transform, limit, size):
+    product = np.fft.irfft(np.fft.rfft(a, size) * b_transform, size)[:, :limit]
+    return np.clip(product, 0, None)
+
+
+# Chance the points earned over days days are at least points_remaining, for each row of day_distributions
+# Only the chances of ending up below points_remaining are needed, so every distribution is cut off there. That keeps
+# the FFTs small, and days is reached by repeated squaring
+def reach_probabilities(points_remaining, days, day_distributions):
+    if points_remaining <= 0:
+        return np.ones(len(day_distributions))
+    days = max(int(days), 1)
+
+    base = np.zeros((len(day_distributions), points_remaining))
+    for row, distribution in zip(base, day_distributions):
+        count = min(len(distribution), points_remaining)
+        row[:count] = distribution[:count]
+
+    size = 1 << (2 * points_remaining - 1).bit_length()
+    total = None
+    while days:
+        transform = np.fft.rfft(base, size)
+        if days & 1:
+            total = base if total is None else _truncated_product(total, transform, points_remaining, size)
+        days >>= 1
+        if days:
+            base = np.clip(np.fft.irfft(transform * transform, size)[:, :points_remaining], 0, None)
+
+    return np.clip(1 - total.sum(axis=1), 0, 1)
+
+
+def reach_probability(points_remaining, days, day_distribution):
+    return float(reach_probabilities(points_remaining, days, [day_distribution])[0])
+
+
+# Chance of reaching the goal for each daily play time
+class BudgetOddsCurve:
+    def __init__(self, budgets, probabilities, points_remaining, days_remaining):
+        self.budgets = budgets
+        self.probabilities = probabilities
+        self.points_remaining = points_remaining
+        self.days_remaining = days_remaining
+
+    def __len__(self):
+        return len(self.budgets)
+
+    # Smallest daily play time in the curve with at least the given chance, None if no budget in it is enough
+    def budget_for(self, chance):
+        enough = np.flatnonzero(self.probabilities >= chance)
+        return int(self.budgets[enough[0]]) if len(enough) else None
+
+    def rows(self):
+        return zip(self.budgets.tolist(), np.round(self.probabilities, 6).tolist())
+
+
+# Odds of reaching the goal before the season ends for every daily play time in budgets
+# On the last day of the season (or after it) there is one day left, like in the rest of the calculator
+def budget_odds_curve(points_remaining, days_remaining, game_time=BASE_GAME_TIME + ADDITIONAL_GAME_TIME,
+                      budgets=DAILY_BUDGETS, round_weights=ROUND_WEIGHTS, round_points=ROUND_POINTS,
+                      round_time_multipliers=ROUND_TIME_MULTIPLIERS):
+    budgets = np.asarray(budgets, dtype=np.int64)
+    days = [
+        day_points_distribution(budget, game_time, round_weights, round_points, round_time_multipliers)
+        for budget in budgets.tolist()
+    ]
+    probabilities = reach_probabilities(points_remaining, days_remaining, days)
+    return BudgetOddsCurve(budgets, probabilities, points_remaining, max(days_remaining, 1))
@@ -0,0 +1,121 @@
+# Headless calculation engine for the World Tour Calculator
+# Works on NumPy arrays so thousands of player states can be calculated in a single call, without a Tk window
+# If NumPy is not installed, install it by running "pip install numpy"
+
+import numpy as np
+
+from GameConstants import ROUND_POINTS, ROUND_TIME_MULTIPLIERS, ROUND_WEIGHTS
+from Instrumentation import phase
+from RoundResults import RoundResults
+
+
+# Holds the results of a batch calculation, one entry (or row) per player state
+class CalculationResult:
+    __slots__ = (
+        "points_remaining", "games", "playtime", "weighted_playtime", "days_remaining", "daily_points",
+        "max_daily_playtime", "weighted_daily_playtime",
+    )
+
+    def __init__(self, points_remaining, games, playtime, weighted_playtime, days_remaining,
+                 daily_points, max_daily_playtime, weighted_daily_playtime):
+        # Shape (n,)
+        self.points_remaining = points_remaining
+        # Shape (n, rounds), games and minutes needed if only that round type is played
+        self.games = games
+        self.playtime = playtime
+        # Shape (n,)
+        self.weighted_playtime = weighted_playtime
+        self.days_remaining = days_remaining
+        self.daily_points = daily_points
+        self.max_daily_playtime = max_daily_playtime
+        self.weighted_daily_playtime = weighted_daily_playtime
+
+    def __len__(self):
+        return len(self.points_remaining)
+
+    # Games and play time per round type as RoundResults, which formats them for display in bulk
+    def round_results(self):
+        return RoundResults(self.games, self.playtime)
+
+    # One row per player matching BATCH_OUTPUT_COLUMNS, as written by the batch command and the window's exports
+    def batch_rows(self, players, current_points, goal_points):
+        columns = [
+            list(players),
+            np.asarray(current_points).tolist(),
+            np.asarray(goal_points).tolist(),
+            self.points_remaining.tolist(),
+            *self.games.T.tolist(),
+            np.round(self.weighted_playtime, 2).tolist(),
+            self.days_remaining.tolist(),
+            self.daily_points.tolist(),
+            np.round(self.max_daily_playtime, 2).tolist(),
+            np.round(self.weighted_daily_playtime, 2).tolist(),
+        ]
+        return zip(*columns)
+
+
+# --- Math Utility Functions ---
+# Integer division that rounds up, matching math.ceil(dividend / divisor) for positive divisors
+def division_round_up(dividend, divisor):
+    return -np.floor_divide(-np.asarray(dividend), divisor)
+
+
+# Time (in minutes) spent on each round type for the given game time(s)
+# Returns shape (n, rounds) when game_time is an array, otherwise shape (rounds,)
+def round_times(game_time, round_time_multipliers=ROUND_TIME_MULTIPLIERS):
+    multipliers = np.asarray(round_time_multipliers)
+    return np.multiply.outer(np.asarray(game_time), multipliers)
+
+
+# --- Main Calculations ---
+# Calculate games, playtime, and daily figures for every player state at once
+# current_points, goal_points, game_time, and days_remaining can be scalars or arrays of shape (n,)
+# round_weights can be a single set of weights of shape (rounds,) or one set per player of shape (n, rounds)
+def calculate_batch(current_points, goal_points, game_time, days_remaining,
+                    round_points=ROUND_POINTS,
+                    round_time_multipliers=ROUND_TIME_MULTIPLIERS,
+                    round_weights=ROUND_WEIGHTS):
+    current_points = np.atleast_1d(np.asarray(current_points, dtype=np.int64))
+    goal_points = np.asarray(goal_points, dtype=np.int64)
+    game_time = np.asarray(game_time, dtype=np.int64)
+    days_remaining = np.asarray(days_remaining, dtype=np.int64)
+    points = np.asarray(round_points, dtype=np.int64)
+    weights = np.asarray(round_weights, dtype=np.float64)
+
+    # The amount of points left to reach the goal points
+    points_remaining = goal_points - current_points
+    n = len(points_remaining)
+
+    # Number of games required for each round type to reach the goal points, shape (n, rounds)
+    with phase("engine.game_counts"):
+        games = division_round_up(points_remaining[:, None], points)
+
+    with phase("engine.playtime"):
+        # Playtime to reach goal points if only the round type specified is played
+        times = np.broadcast_to(round_times(game_time, round_time_multipliers), (n, len(points)))
+        playtime = games * times
+
+        # Playtime based on the chance of each round type occurring
+        if weights.ndim == 1:
+            weighted_playtime = playtime @ (weights / 100)
+        else:
+            weighted_playtime = np.einsum("ij,ij->i", playtime, weights / 100)
+
+    # On the last day of the season (or after it) everything left has to be played today
+    days = np.broadcast_to(np.maximum(days_remaining, 1), (n,))
+    daily_points = points_remaining // days
+
+    # Round one earns points the slowest (tied with losing quick play), so it gives the maximum daily play time
+    max_daily_playtime = playtime[:, 0] / days
+    weighted_daily_playtime = weighted_playtime / days
+
+    return CalculationResult(
+        points_remaining,
+        games,
+        playtime,
+        weighted_playtime,
+        np.broadcast_to(days_remaining, (n,)),
+        daily_points,
+        max_daily_playtime,
+        weighted_daily_playtime,
+    )
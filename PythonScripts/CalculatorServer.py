@@ -0,0 +1,422 @@
+# Local HTTP/JSON service for the calculator, so bots and dashboards can get the numbers without the window
+# Run "python WorldTourCalculator.py serve" (localhost:8080 by default), it only needs the standard library and NumPy
+#
+# Endpoints:
+#   POST /calculate   JSON body with current_points (required), goal (badge name or points, defaults to the highest
+#                     badge), additional_game_time (defaults to 3) and round_weights (7 percentages in table order, or
+#                     an object keyed by round name, adding up to 100)
+#   GET /calculate    the same fields as query parameters, e.g. /calculate?current_points=850&goal=Gold%201
+#   GET /stats        request and cache counts, batch sizes, and latency percentiles
+#   GET /metrics      instrumentation timings in Prometheus text format (start the server with --instrument)
+#   GET /health
+#
+# Responses are cached in an LRU keyed on the normalized inputs. Requests that arrive together are calculated in one
+# call to the engine, so a burst of requests costs about as much as one
+
+import asyncio
+from collections import OrderedDict, deque
+from datetime import date
+import json
+import sys
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from BadgeIndex import BadgeIndex
+from Instrumentation import COUNT_BUCKETS, REGISTRY, count, observe, phase
+from CalculationEngine import calculate_batch
+from GameConstants import (
+    ADDITIONAL_GAME_TIME,
+    BASE_GAME_TIME,
+    MAX_POINTS,
+    ROUND_NAMES,
+    ROUND_WEIGHTS,
+)
+from SeasonData import load_season_registry
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# Responses kept in the cache
+RESPONSE_CACHE_SIZE = 4096
+
+# Most requests calculated in one call to the engine
+MAX_BATCH_SIZE = 1024
+
+# Latencies kept for the percentiles in /stats
+LATENCY_WINDOW = 10000
+
+# Largest request header and body accepted, in bytes
+MAX_HEADER_SIZE = 16384
+MAX_BODY_SIZE = 65536
+
+# Largest time between games accepted, in minutes
+MAX_ADDITIONAL_GAME_TIME = 24 * 60
+
+_STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+# An invalid request, the message is sent back to the client
+class RequestError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# --- Responses ---
+# Least recently used cache of encoded responses
+class ResponseCache:
+    def __init__(self, max_size=RESPONSE_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        body = self.entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key, body):
+        self.entries[key] = body
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+def encode_response(status, payload):
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return status, body
+
+
+def _http_response(status, body, keep_alive, content_type="application/json"):
+    head = (
+        f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+# --- Validation ---
+def _integer(fields, name, default=None, minimum=None, maximum=None):
+    value = fields.get(name, default)
+    if value is None or value == "":
+        raise RequestError(f"{name} is required")
+    if isinstance(value, bool) or isinstance(value, float) and not value.is_integer():
+        raise RequestError(f"{name} must be a whole number")
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise RequestError(f"{name} must be a whole number") from None
+    if minimum is not None and value < minimum:
+        raise RequestError(f"{name} must be at least {minimum}")
+    if maximum is not None and value > maximum:
+        raise RequestError(f"{name} must be at most {maximum}")
+    return value
+
+
+def _round_weights(value):
+    if value is None or value == "":
+        return tuple(float(weight) for weight in ROUND_WEIGHTS)
+    if isinstance(value, str):
+        value = value.split(",")
+    if isinstance(value, dict):
+        unknown = set(value) - set(ROUND_NAMES)
+        if unknown:
+            raise RequestError(f"Unknown round names in round_weights: {', '.join(sorted(unknown))}")
+        value = [value.get(name, 0) for name in ROUND_NAMES]
+    if not isinstance(value, list) or len(value) != len(ROUND_NAMES):
+        raise RequestError(f"round_weights needs {len(ROUND_NAMES)} values, one for each round type")
+
+    try:
+        weights = tuple(float(weight) for weight in value)
+    except (TypeError, ValueError):
+        raise RequestError("round_weights must be numbers") from None
+    if min(weights) < 0 or abs(sum(weights) - 100) > 0.01:
+        raise RequestError("round_weights must not be negative and must add up to 100")
+    return weights
+
+
+# --- Server ---
+class CalculatorServer:
+    def __init__(self, season=None, cache_size=RESPONSE_CACHE_SIZE, max_batch_size=MAX_BATCH_SIZE):
+        season = season or load_season_registry()
+        self.season_end_date = season.season_end_date
+        self.round_points = season.round_points
+        self.badge_index = BadgeIndex(season.badge_options())
+        self.badge_points = {label.lower(): points for label, points in season.badge_options()}
+        self.highest_badge = max(self.badge_points.values())
+
+        self.cache = ResponseCache(cache_size)
+        self.max_batch_size = max_batch_size
+        # (key, future) pairs waiting for the next batch
+        self.pending = []
+        self.flush_scheduled = False
+
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.largest_batch = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    # Turn the request fields into the inputs that identify a response
+    def normalize(self, fields):
+        current_points = _integer(fields, "current_points", minimum=0, maximum=MAX_POINTS)
+
+        goal = fields.get("goal")
+        if goal is None or goal == "":
+            goal_points = self.highest_badge
+        elif isinstance(goal, str) and goal.strip().lower() in self.badge_points:
+            goal_points = self.badge_points[goal.strip().lower()]
+        else:
+            goal_points = _integer(fields, "goal", minimum=0, maximum=MAX_POINTS)
+
+        additional_game_time = _integer(
+            fields, "additional_game_time", ADDITIONAL_GAME_TIME, minimum=0, maximum=MAX_ADDITIONAL_GAME_TIME
+        )
+        weights = _round_weights(fields.get("round_weights"))
+        days_remaining = (self.season_end_date - date.today()).days
+
+        return current_points, goal_points, BASE_GAME_TIME + additional_game_time, weights, days_remaining
+
+    # Response for normalized inputs, from the cache or from the next batch
+    async def calculate(self, key):
+        body = self.cache.get(key)
+        if body is not None:
+            return body
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((key, future))
+        if len(self.pending) >= self.max_batch_size:
+            self.flush()
+        elif not self.flush_scheduled:
+            # Runs after every request that is already readable has been parsed, so they share a batch
+            self.flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+        return await future
+
+    # Calculate every waiting request in one call to the engine
+    def flush(self):
+        self.flush_scheduled = False
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+
+        keys = list(dict.fromkeys(key for key, _ in pending))
+        observe("server.batch_size", len(pending), COUNT_BUCKETS)
+        errors = {}
+        try:
+            with phase("server.batch"):
+                bodies = dict(zip(keys, self.calculate_keys(keys)))
+        except Exception:
+            # Each request is calculated on its own, so one that fails doesn't fail the rest of the batch
+            bodies = {}
+            for key in keys:
+                try:
+                    bodies[key] = self.calculate_keys([key])[0]
+                except Exception as error:
+                    errors[key] = error
+
+        for key, body in bodies.items():
+            self.cache.put(key, body)
+        for key, future in pending:
+            if future.done():
+                continue
+            if key in errors:
+                future.set_exception(errors[key])
+            else:
+                future.set_result(bodies[key])
+
+        self.batches += 1
+        self.batched_requests += len(pending)
+        self.largest_batch = max(self.largest_batch, len(pending))
+
+    def calculate_keys(self, keys):
+        current_points, goal_points, game_time, weights, days_remaining = (np.array(column) for column in zip(*keys))
+        result = calculate_batch(
+            current_points, goal_points, game_time, days_remaining, self.round_points, round_weights=weights
+        )
+        badges = self.badge_index.classify_array(current_points)
+        current_badges = self.badge_index.badge_labels(badges["current_badge"]).tolist()
+        next_badges = self.badge_index.badge_labels(badges["next_badge"]).tolist()
+
+        columns = zip(
+            current_points.tolist(),
+            goal_points.tolist(),
+            result.points_remaining.tolist(),
+            result.games.tolist(),
+            result.playtime.tolist(),
+            result.weighted_playtime.tolist(),
+            result.days_remaining.tolist(),
+            result.daily_points.tolist(),
+            result.max_daily_playtime.tolist(),
+            result.weighted_daily_playtime.tolist(),
+            current_badges,
+            next_badges,
+            badges["points_to_next"].tolist(),
+        )
+        bodies = []
+        for row in columns:
+            payload = {
+                "current_points": row[0],
+                "goal_points": row[1],
+                "points_remaining": row[2],
+                "games": dict(zip(ROUND_NAMES, row[3])),
+                "playtime": dict(zip(ROUND_NAMES, row[4])),
+                "weighted_playtime": round(row[5], 2),
+                "days_remaining": row[6],
+                "daily_points": row[7],
+                "max_daily_playtime": round(row[8], 2),
+                "weighted_daily_playtime": round(row[9], 2),
+                "current_badge": row[10] or None,
+                "next_badge": row[11] or None,
+                "points_to_next": row[12],
+            }
+            bodies.append(encode_response(200, payload))
+        return bodies
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        p50, p90, p99 = np.percentile(latencies, (50, 90, 99)).tolist()
+        uptime = time.perf_counter() - self.started
+        return {
+            "requests": self.requests,
+            "requests_per_second": round(self.requests / uptime, 1) if uptime > 0 else 0.0,
+            "cache_size": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "batches": self.batches,
+            "mean_batch_size": round(self.batched_requests / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "latency_ms": {
+                "p50": round(p50, 3),
+                "p90": round(p90, 3),
+                "p99": round(p99, 3),
+                "max": round(float(latencies.max()), 3),
+            },
+        }
+
+    # Status and encoded body for one request
+    async def route(self, method, target, body):
+        url = urlsplit(target)
+        count(f"server.requests{url.path.replace('/', '.')}")
+        if url.path == "/health":
+            return encode_response(200, {"status": "ok"})
+        if url.path == "/stats":
+            return encode_response(200, self.stats())
+        if url.path != "/calculate":
+            raise RequestError(f"No endpoint at {url.path}", 404)
+
+        if method == "GET":
+            fields = dict(parse_qsl(url.query))
+        elif method == "POST":
+            try:
+                fields = json.loads(body or b"{}")
+            except ValueError:
+                raise RequestError("The body must be JSON") from None
+            if not isinstance(fields, dict):
+                raise RequestError("The body must be a JSON object")
+        else:
+            raise RequestError("Use GET or POST", 405)
+
+        return await self.calculate(self.normalize(fields))
+
+    # Read requests from one connection until it closes (connections are kept alive by default)
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    writer.write(_http_response(413, b'{"error":"Request header too large"}', False))
+                    break
+                started = time.perf_counter()
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    writer.write(_http_response(400, b'{"error":"Malformed request line"}', False))
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                # Only plain digits, int() would also take signs, spaces and underscores
+                length = headers.get("content-length", "") or "0"
+                if not (length.isascii() and length.isdigit()):
+                    writer.write(_http_response(400, b'{"error":"Invalid Content-Length"}', False))
+                    break
+                length = int(length)
+                if length > MAX_BODY_SIZE:
+                    writer.write(_http_response(413, b'{"error":"Request body too large"}', False))
+                    break
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except asyncio.IncompleteReadError:
+                    writer.write(_http_response(400, b'{"error":"Request body is shorter than its length"}', False))
+                    break
+
+                if target == "/metrics":
+                    writer.write(_http_response(
+                        200, REGISTRY.prometheus_text().encode("utf-8"), keep_alive, "text/plain; version=0.0.4"
+                    ))
+                    await writer.drain()
+                    continue
+
+                try:
+                    status, response = await self.route(method, target, body)
+                except RequestError as error:
+                    status, response = encode_response(error.status, {"error": str(error)})
+                except Exception as error:
+                    status, response = encode_response(500, {"error": str(error)})
+
+                writer.write(_http_response(status, response, keep_alive))
+                self.requests += 1
+                self.latencies.append(time.perf_counter() - started)
+                if not keep_alive:
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, cache_size=RESPONSE_CACHE_SIZE):
+    calculator = CalculatorServer(cache_size=cache_size)
+    server = await asyncio.start_server(calculator.handle_connection, host, port, limit=MAX_HEADER_SIZE)
+    print(f"Serving the calculator on http://{host}:{port}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT, cache_size=RESPONSE_CACHE_SIZE):
+    try:
+        asyncio.run(serve(host, port, cache_size))
+    except KeyboardInterrupt:
+        pass
+    return 0
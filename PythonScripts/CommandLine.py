@@ -0,0 +1,788 @@
+# Headless command line mode for the World Tour Calculator
+# Run "python WorldTourCalculator.py batch players.csv -o results.csv" (or pass "-" to read stdin / write stdout)
+#
+# Batch files have one player per row (CSV with a header, or JSON Lines) with these columns:
+#   current_points        required
+#   goal                  badge name (e.g. "Emerald 1") or a point value, defaults to the highest badge
+#   additional_game_time  minutes between games, defaults to 3
+#   <round>_weight        percent chance of each round type, e.g. round_one_weight ... lose_qp_weight
+#   player                optional, copied to the output
+# Rows are read and written in fixed-size chunks, so memory use stays flat no matter how large the input is
+
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from datetime import date, datetime, timedelta
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+from CalculationEngine import calculate_batch
+from GameConstants import (
+    ADDITIONAL_GAME_TIME,
+    BASE_GAME_TIME,
+    BATCH_OUTPUT_COLUMNS,
+    MAX_POINTS,
+    ROUND_NAMES,
+    ROUND_POINTS,
+    ROUND_WEIGHTS,
+    ROW_LABELS,
+    WEIGHT_COLUMNS,
+)
+from BadgeIndex import BadgeIndex
+from BudgetOdds import BUDGET_TARGETS, budget_odds_curve
+from CalculatorServer import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    MAX_ADDITIONAL_GAME_TIME,
+    RESPONSE_CACHE_SIZE,
+    run_server,
+)
+from GrindSchedule import LOADINGS, SCHEDULE_COLUMNS, GrindSchedule
+from Instrumentation import REGISTRY, enable
+from MatchHistory import MatchStatistics, ingest_match_history
+from ModeComparison import COMPARISON_COLUMNS, compare_modes, mode_table
+from ProgressHistory import ProgressHistory
+from ReportExport import EXPORT_FORMATS, chunked, export_file, export_format, open_export
+from RosterReport import AT_RISK_DAILY_MINUTES, RosterSummary
+from RoundMixPlanner import max_win_rate, min_quick_play_share, plan_round_mix
+from SeasonData import WORLD_TOUR_SOURCE, load_season_registry
+from WeightSweep import SWEEP_STEP, SWEEP_VALUE_COLUMNS, sweep_size, sweep_weights
+
+
+# Number of rows calculated together
+BATCH_CHUNK_SIZE = 65536
+
+CLASSIFY_OUTPUT_COLUMNS = ("player", "points", "current_badge", "next_badge", "points_to_next", "percent_through_tier")
+
+ODDS_OUTPUT_COLUMNS = ("daily_minutes", "chance")
+
+ROSTER_OUTPUT_COLUMNS = (
+    "player", "current_points", "goal_points", "points_remaining", "current_badge", "next_badge", "points_to_next",
+    "percent_through_tier", "weighted_playtime", "daily_points", "weighted_daily_playtime", "at_risk",
+)
+
+# --- Reading Rows ---
+def open_input(path):
+    if path == "-":
+        return sys.stdin
+    return open(path, newline="", encoding="utf-8")
+
+
+# Yield each row of the input as a dictionary of column name to value
+def read_rows(stream, input_format):
+    if input_format == "jsonl":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        yield from csv.DictReader(stream)
+
+
+# --- Parsing Rows ---
+# Lower case badge name -> points, for looking up goals
+def badge_points_lookup(badge_options):
+    return {label.lower(): points for label, points in badge_options}
+
+
+# Turn a goal given as a badge name or a point value into points
+def parse_goal(value, badge_points):
+    if value is None or value == "":
+        return max(badge_points.values())
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            raise ValueError(f"goal must be a number of points, not {value}")
+        return int(value)
+    key = value.strip().lower()
+    if key in badge_points:
+        return badge_points[key]
+    return int(key)
+
+
+# Values of one column, using the default for missing values (a default of None means the column is required)
+def _column(rows, name, default, convert):
+    values = []
+    for row in rows:
+        value = row.get(name)
+        if value is None or value == "":
+            if default is None:
+                raise ValueError(f"Every row needs a value for {name}")
+            values.append(default)
+        else:
+            values.append(convert(value))
+    return values
+
+
+# Values checked to be from minimum to maximum (NaN never is), so a bad row can't overflow or poison the results
+def _in_range(values, name, minimum, maximum):
+    for value in values:
+        if not minimum <= value <= maximum:
+            raise ValueError(f"{name} must be from {minimum} to {maximum}, not {value}")
+    return values
+
+
+# Convert a chunk of rows to the arrays taken by the engine
+def parse_chunk(rows, badge_points):
+    current_points = np.array(
+        _in_range(_column(rows, "current_points", None, int), "current_points", 0, MAX_POINTS), dtype=np.int64
+    )
+    goal_points = np.array(
+        _in_range([parse_goal(row.get("goal"), badge_points) for row in rows], "goal", 0, MAX_POINTS),
+        dtype=np.int64,
+    )
+    # A game must take at least a minute
+    additional_game_time = _column(rows, "additional_game_time", ADDITIONAL_GAME_TIME, int)
+    _in_range(additional_game_time, "additional_game_time", 1 - BASE_GAME_TIME, MAX_ADDITIONAL_GAME_TIME)
+    game_time = BASE_GAME_TIME + np.array(additional_game_time, dtype=np.int64)
+
+    # One set of weights per row when any row of the chunk has weight columns, rows without them get the defaults
+    if any(column in row for row in rows for column in WEIGHT_COLUMNS):
+        round_weights = np.column_stack([
+            _in_range(_column(rows, column, default, float), column, 0, 100)
+            for column, default in zip(WEIGHT_COLUMNS, ROUND_WEIGHTS)
+        ])
+    else:
+        round_weights = np.asarray(ROUND_WEIGHTS, dtype=np.float64)
+
+    return current_points, goal_points, game_time, round_weights
+
+
+# --- Batch Mode ---
+# Calculate each chunk of players and yield one output row per player
+def batch_results(rows, days_remaining, badge_points, round_points=ROUND_POINTS, chunk_size=BATCH_CHUNK_SIZE):
+    for chunk in chunked(rows, chunk_size):
+        current_points, goal_points, game_time, round_weights = parse_chunk(chunk, badge_points)
+        result = calculate_batch(
+            current_points, goal_points, game_time, days_remaining, round_points, round_weights=round_weights
+        )
+
+        yield from result.batch_rows([row.get("player", "") for row in chunk], current_points, goal_points)
+
+
+# Read the input file given on the command line, turn its rows into results and write them to the output file
+def stream_file(args, columns, results, title):
+    input_stream = open_input(args.input)
+    try:
+        rows = read_rows(input_stream, export_format(args.input, args.input_format))
+        export_file(args.output, export_format(args.output, args.output_format), columns, results(rows), title)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+    return 0
+
+
+def run_batch(args):
+    season = load_season_registry()
+    today = date.fromisoformat(args.today) if args.today else date.today()
+    days_remaining = (season.season_end_date - today).days
+    badge_points = badge_points_lookup(season.badge_options())
+
+    return stream_file(
+        args,
+        BATCH_OUTPUT_COLUMNS,
+        lambda rows: batch_results(rows, days_remaining, badge_points, season.round_points, args.chunk_size),
+        "Batch results",
+    )
+
+
+# --- Classify Mode ---
+# Badge reached, next badge, and progress through the tier for each row's "points" (or "current_points")
+def classify_results(rows, badge_index, chunk_size=BATCH_CHUNK_SIZE):
+    for chunk in chunked(rows, chunk_size):
+        column = "points" if "points" in chunk[0] else "current_points"
+        points = np.array(_column(chunk, column, None, int), dtype=np.int64)
+        result = badge_index.classify_array(points)
+
+        columns = [
+            [row.get("player", "") for row in chunk],
+            points.tolist(),
+            badge_index.badge_labels(result["current_badge"]).tolist(),
+            badge_index.badge_labels(result["next_badge"]).tolist(),
+            result["points_to_next"].tolist(),
+            np.round(result["percent_through_tier"], 2).tolist(),
+        ]
+        yield from zip(*columns)
+
+
+def run_classify(args):
+    season = load_season_registry()
+    badge_index = BadgeIndex(season.badge_options(args.ladder))
+
+    return stream_file(
+        args,
+        CLASSIFY_OUTPUT_COLUMNS,
+        lambda rows: classify_results(rows, badge_index, args.chunk_size),
+        "Badges",
+    )
+
+
+# --- Roster Mode ---
+# Output rows and the summary of one chunk of players, run in a worker process
+def roster_chunk(rows, days_remaining, badge_points, badge_options, round_points, at_risk_daily_minutes):
+    current_points, goal_points, game_time, round_weights = parse_chunk(rows, badge_points)
+    result = calculate_batch(
+        current_points, goal_points, game_time, days_remaining, round_points, round_weights=round_weights
+    )
+    badge_index = BadgeIndex(badge_options)
+    badges = badge_index.classify_array(current_points)
+    players = [row.get("player", "") for row in rows]
+
+    summary = RosterSummary(badge_index.labels, at_risk_daily_minutes)
+    summary.add(
+        players, result.points_remaining, result.weighted_playtime, result.weighted_daily_playtime,
+        badges["current_badge"],
+    )
+    at_risk = (result.points_remaining > 0) & (result.weighted_daily_playtime > at_risk_daily_minutes)
+
+    columns = [
+        players,
+        current_points.tolist(),
+        goal_points.tolist(),
+        result.points_remaining.tolist(),
+        badge_index.badge_labels(badges["current_badge"]).tolist(),
+        badge_index.badge_labels(badges["next_badge"]).tolist(),
+        badges["points_to_next"].tolist(),
+        np.round(badges["percent_through_tier"], 2).tolist(),
+        np.round(result.weighted_playtime, 2).tolist(),
+        result.daily_points.tolist(),
+        np.round(result.weighted_daily_playtime, 2).tolist(),
+        at_risk.tolist(),
+    ]
+    return list(zip(*columns)), summary
+
+
+# Calculate chunks of players across worker processes and yield their rows in input order, merging each chunk's
+# summary into summary as it comes back. Only a few chunks per worker are in flight, so memory use stays flat
+def roster_results(rows, summary, days_remaining, badge_points, badge_options, round_points=ROUND_POINTS,
+                   chunk_size=BATCH_CHUNK_SIZE, workers=None):
+    arguments = (days_remaining, badge_points, badge_options, round_points, summary.at_risk_daily_minutes)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for chunk in chunked(rows, chunk_size):
+            chunk_rows, chunk_summary = roster_chunk(chunk, *arguments)
+            summary.merge(chunk_summary)
+            yield from chunk_rows
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        chunks = chunked(rows, chunk_size)
+        for chunk in chunks:
+            in_flight.append(executor.submit(roster_chunk, chunk, *arguments))
+            if len(in_flight) >= workers * 2:
+                break
+        while in_flight:
+            chunk_rows, chunk_summary = in_flight.popleft().result()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                in_flight.append(executor.submit(roster_chunk, chunk, *arguments))
+            summary.merge(chunk_summary)
+            yield from chunk_rows
+
+
+def print_roster_report(report, stream):
+    print(f"Players: {report['players']:,} ({report['finished']:,} already at their goal)", file=stream)
+    if report["median_hours_to_goal"] is not None:
+        print(f"Median play time to goal: {report['median_hours_to_goal']:.1f} hours", file=stream)
+    print(
+        f"At risk (over {report['at_risk_daily_minutes']} minutes a day needed): {report['at_risk']:,}", file=stream
+    )
+    for entry in report["most_at_risk"]:
+        print(f"  {entry['player'] or '(unnamed)'}: {entry['weighted_daily_playtime']:.0f} minutes a day", file=stream)
+    print("Badges:", file=stream)
+    for label, count in report["badge_distribution"].items():
+        if count:
+            print(f"  {label}: {count:,}", file=stream)
+
+
+def run_roster(args):
+    season = load_season_registry()
+    today = date.fromisoformat(args.today) if args.today else date.today()
+    days_remaining = (season.season_end_date - today).days
+    badge_options = season.badge_options()
+    badge_points = badge_points_lookup(badge_options)
+    summary = RosterSummary(BadgeIndex(badge_options).labels, args.at_risk_minutes)
+
+    stream_file(
+        args,
+        ROSTER_OUTPUT_COLUMNS,
+        lambda rows: roster_results(
+            rows, summary, days_remaining, badge_points, badge_options, season.round_points, args.chunk_size,
+            args.workers,
+        ),
+        "Roster",
+    )
+
+    report = summary.report()
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    print_roster_report(report, sys.stderr)
+    return 0
+
+
+# --- Plan Mode ---
+# Print the fastest mix of round types for one player
+def run_plan(args):
+    season = load_season_registry()
+    goal_points = parse_goal(args.goal, badge_points_lookup(season.badge_options()))
+    points_remaining = goal_points - args.current_points
+
+    constraints = []
+    if args.min_quick_play is not None:
+        constraints.append(min_quick_play_share(args.min_quick_play / 100))
+    if args.max_win_rate is not None:
+        constraints.append(max_win_rate(args.max_win_rate / 100))
+
+    plan = plan_round_mix(
+        points_remaining, BASE_GAME_TIME + args.additional_game_time, constraints, season.round_points
+    )
+
+    print(f"Points remaining: {points_remaining}")
+    print(f"Points per minute: {plan.points_per_minute:.3f}")
+    print(f"Expected games: {plan.expected_games:.1f}")
+    print(f"Expected play time (minutes): {plan.expected_minutes:.1f}")
+    for label, share, games in zip(ROW_LABELS, plan.shares, plan.games_per_round.tolist()):
+        if share > 0:
+            print(f"{label}: {share:.1%} ({games} games)")
+    return 0
+
+
+# --- Sweep Mode ---
+# Sweep step option, checked before anything is allocated
+def sweep_step(value):
+    try:
+        step = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid step {value!r}")
+    try:
+        sweep_size(step)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+    return step
+
+
+# Print how much each round weight changes the play time, and optionally write the whole grid for heatmaps
+def run_sweep(args):
+    season = load_season_registry()
+    goal_points = parse_goal(args.goal, badge_points_lookup(season.badge_options()))
+    today = date.fromisoformat(args.today) if args.today else date.today()
+    days_remaining = (season.season_end_date - today).days
+
+    sweep = sweep_weights(
+        args.current_points,
+        goal_points,
+        BASE_GAME_TIME + args.additional_game_time,
+        days_remaining,
+        args.step,
+        season.round_points,
+    )
+
+    print(f"Sets of weights: {len(sweep):,}")
+    print(f"Weighted play time (minutes): {sweep.weighted_playtime.min():.1f} to {sweep.weighted_playtime.max():.1f}")
+    labels = dict(zip(ROUND_NAMES, ROW_LABELS))
+    for result in sweep.sensitivities():
+        print(
+            f"{labels[result['round']]}: range {result['range']:.1f} minutes, "
+            f"{result['slope']:+.2f} minutes per percent"
+        )
+
+    if args.output:
+        export_file(
+            args.output,
+            export_format(args.output, args.output_format),
+            WEIGHT_COLUMNS + SWEEP_VALUE_COLUMNS,
+            sweep.rows(),
+            "Weight sweep",
+        )
+    return 0
+
+
+# --- Matches Mode ---
+# Estimate the round weights and additional game time from a match history log, carrying on from the state file
+def run_matches(args):
+    if args.input == "-":
+        raise ValueError("The match history has to be a file, so it can be read from where the last import stopped")
+
+    statistics = None
+    if args.state and os.path.exists(args.state):
+        statistics = MatchStatistics.load(args.state)
+    statistics = ingest_match_history(args.input, export_format(args.input, args.input_format), statistics)
+    if args.state:
+        statistics.save(args.state)
+
+    estimate = statistics.estimate()
+    print(f"Matches: {estimate['matches']:,} ({estimate['skipped']:,} rows skipped)")
+    labels = dict(zip(ROUND_NAMES, ROW_LABELS))
+    for name, weight in estimate["round_weights"].items():
+        low, high = estimate["round_weight_intervals"][name]
+        print(f"{labels[name]}: {weight:.1f}% (95% interval {low:.1f}% to {high:.1f}%)")
+
+    additional_game_time = estimate["additional_game_time"]
+    interval = estimate["additional_game_time_interval"]
+    if additional_game_time is not None:
+        line = f"Additional game time: {additional_game_time:.1f} minutes"
+        if interval is not None:
+            line += f" (95% interval {interval[0]:.1f} to {interval[1]:.1f})"
+        print(line)
+    return 0
+
+
+# --- Odds Mode ---
+# Write the chance of reaching the goal before the season ends for each daily play time
+def run_odds(args):
+    season = load_season_registry()
+    goal_points = parse_goal(args.goal, badge_points_lookup(season.badge_options()))
+    today = date.fromisoformat(args.today) if args.today else date.today()
+    days_remaining = (season.season_end_date - today).days
+    round_weights = args.weights or ROUND_WEIGHTS
+    if len(round_weights) != len(ROUND_WEIGHTS):
+        raise ValueError(f"--weights needs {len(ROUND_WEIGHTS)} values, one for each round type")
+
+    curve = budget_odds_curve(
+        goal_points - args.current_points,
+        days_remaining,
+        BASE_GAME_TIME + args.additional_game_time,
+        range(0, args.max_budget + 1, args.budget_step),
+        round_weights,
+        season.round_points,
+    )
+
+    for target in BUDGET_TARGETS:
+        budget = curve.budget_for(target)
+        needed = f"{budget} minutes" if budget is not None else f"more than {args.max_budget} minutes"
+        print(f"Daily play time for a {target:.0%} chance: {needed}", file=sys.stderr)
+
+    output_format = export_format(args.output, args.output_format)
+    export_file(args.output, output_format, ODDS_OUTPUT_COLUMNS, curve.rows(), "Daily play time odds")
+    return 0
+
+
+# --- Modes Mode ---
+# Write every mode that earns points towards the ladder, from the most points per minute to the least
+def run_modes(args):
+    season = load_season_registry()
+    goal_points = parse_goal(args.goal, badge_points_lookup(season.badge_options(args.ladder)))
+    today = date.fromisoformat(args.today) if args.today else date.today()
+    days_remaining = (season.season_end_date - today).days
+
+    table = mode_table(season, args.ladder)
+    for value in args.weights or ():
+        name, _, weights = value.rpartition("=")
+        if not name:
+            raise ValueError(f"--weights takes MODE=WEIGHT,WEIGHT,..., not {value}")
+        table.set_weights(name, weights.split(","))
+
+    comparison = compare_modes(table, goal_points - args.current_points, days_remaining, args.additional_game_time)
+    best = comparison.ranking[0]
+    print(
+        f"Most points per minute: {table.modes[best].name} ({comparison.points_per_minute[best]:.3f})", file=sys.stderr
+    )
+
+    output_format = export_format(args.output, args.output_format)
+    export_file(args.output, output_format, COMPARISON_COLUMNS, comparison.rows(), "Modes by points per minute")
+    return 0
+
+
+# --- Schedule Mode ---
+# Blackout dates from the command line, each a date or an inclusive range like 2026-12-24:2026-12-26
+def parse_blackouts(values):
+    dates = []
+    for value in values or ():
+        first, _, last = value.partition(":")
+        first = date.fromisoformat(first)
+        last = date.fromisoformat(last) if last else first
+        if last < first:
+            raise ValueError(f"Blackout range {value} ends before it starts")
+        dates.extend(first + timedelta(days=day) for day in range((last - first).days + 1))
+    return dates
+
+
+# Print the day by day plan as a calendar, and optionally export it as CSV, JSON Lines or an iCalendar file
+def run_schedule(args):
+    season = load_season_registry()
+    goal_points = parse_goal(args.goal, badge_points_lookup(season.badge_options()))
+    today = date.fromisoformat(args.today) if args.today else date.today()
+    round_weights = args.weights or ROUND_WEIGHTS
+    if len(round_weights) != len(ROUND_WEIGHTS):
+        raise ValueError(f"--weights needs {len(ROUND_WEIGHTS)} values, one for each round type")
+
+    schedule = GrindSchedule(
+        args.current_points,
+        goal_points,
+        today,
+        season.season_end_date,
+        args.available,
+        parse_blackouts(args.blackout),
+        args.loading,
+        BASE_GAME_TIME + args.additional_game_time,
+        round_weights,
+        season.round_points,
+    )
+
+    # The calendar goes to stderr when the export is written to stdout
+    stream = sys.stderr if args.output == "-" else sys.stdout
+    print(schedule.calendar_text(), file=stream)
+    if schedule.shortfall:
+        print(f"Short of the goal by {schedule.shortfall} points with this play time", file=stream)
+    if not args.output:
+        return 0
+
+    output_format = args.output_format
+    if output_format is None and args.output.lower().endswith(".ics"):
+        output_format = "ics"
+    if output_format != "ics":
+        output_format = export_format(args.output, output_format)
+        export_file(args.output, output_format, SCHEDULE_COLUMNS, schedule.rows(), "Grind schedule")
+        return 0
+
+    output_stream = open_export(args.output)
+    try:
+        output_stream.write(schedule.ics_text())
+    finally:
+        if output_stream is not sys.stdout:
+            output_stream.close()
+    return 0
+
+
+# --- History Mode ---
+# Snapshot time from the command line or a file, now when left out
+def parse_when(value):
+    return datetime.fromisoformat(value) if value else datetime.now()
+
+
+# Save or import snapshots, and print a player's forecast (also printed after saving one snapshot)
+def run_history(args):
+    season = load_season_registry()
+    season_name = season.season_end_date.isoformat()
+
+    with ProgressHistory(args.history) as history:
+        today = date.fromisoformat(args.today) if args.today else date.today()
+        if args.action == "record":
+            when = parse_when(args.when)
+            history.record(args.player, args.points, season_name, when)
+            today = when.date()
+
+        elif args.action == "import":
+            # Rows must be in time order for each player, e.g. a log that was appended to as the season went on
+            input_stream = open_input(args.input)
+            try:
+                rows = read_rows(input_stream, export_format(args.input, args.input_format))
+                snapshots = (
+                    (row["player"], int(row["points"]), parse_when(row.get("recorded_at"))) for row in rows
+                )
+                print(f"Imported {history.record_many(snapshots, season_name):,} snapshots")
+            finally:
+                if input_stream is not sys.stdin:
+                    input_stream.close()
+            return 0
+
+        goal_points = parse_goal(args.goal, badge_points_lookup(season.badge_options()))
+        forecast = history.forecast(args.player, season_name, goal_points, season.season_end_date, today)
+
+    if forecast is None:
+        raise ValueError(f"No progress saved for {args.player} this season")
+    if forecast["pace"] is None:
+        print("Save progress on at least two different days to get a forecast")
+        return 0
+
+    completion_date = forecast["completion_date"]
+    print(f"Points remaining: {forecast['points_remaining']}")
+    print(f"Recent pace (points per day): {forecast['pace']:.1f}")
+    if forecast["regression_pace"] is not None:
+        print(f"Season pace (points per day): {forecast['regression_pace']:.1f}")
+    print(f"Projected completion: {completion_date.isoformat() if completion_date else 'not at this pace'}")
+    if forecast["chance_before_end"] is None:
+        print("Chance to finish before the season ends: save progress on one more day to get it")
+    else:
+        print(f"Chance to finish before the season ends: {forecast['chance_before_end']:.1%}")
+    return 0
+
+
+# --- Serve Mode ---
+def run_serve(args):
+    if args.instrument:
+        enable()
+    return run_server(args.host, args.port, args.cache_size)
+
+
+# --- Entry Point ---
+def build_parser():
+    parser = argparse.ArgumentParser(prog="WorldTourCalculator", description="World Tour Points Calculator")
+    parser.add_argument(
+        "--metrics", metavar="PATH",
+        help="time each phase and write the timings here when done (JSON for .json, otherwise Prometheus text)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch = subparsers.add_parser("batch", help="calculate every player in a CSV or JSON Lines file")
+    batch.add_argument("input", help="input file, or - for stdin")
+    batch.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    batch.add_argument("--input-format", choices=("csv", "jsonl"), help="defaults to the input file extension")
+    batch.add_argument("--output-format", choices=EXPORT_FORMATS, help="defaults to the output file extension")
+    batch.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE, help="rows calculated together")
+    batch.add_argument("--today", help="date to count the days left in the season from (YYYY-MM-DD)")
+    batch.set_defaults(handler=run_batch)
+
+    classify = subparsers.add_parser("classify", help="find the badge and points to the next rank for every row")
+    classify.add_argument("input", help="input file with a points (or current_points) column, or - for stdin")
+    classify.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    classify.add_argument("--input-format", choices=("csv", "jsonl"), help="defaults to the input file extension")
+    classify.add_argument("--output-format", choices=EXPORT_FORMATS, help="defaults to the output file extension")
+    classify.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE, help="rows classified together")
+    classify.add_argument(
+        "--ladder", default=WORLD_TOUR_SOURCE, help="data file the badges come from, e.g. QuickPlayInfo"
+    )
+    classify.set_defaults(handler=run_classify)
+
+    roster = subparsers.add_parser("roster", help="calculate a whole team and report on it")
+    roster.add_argument("input", help="input file with the same columns as batch, or - for stdin")
+    roster.add_argument("-o", "--output", default="-", help="per player output file, or - for stdout (default)")
+    roster.add_argument("--input-format", choices=("csv", "jsonl"), help="defaults to the input file extension")
+    roster.add_argument("--output-format", choices=EXPORT_FORMATS, help="defaults to the output file extension")
+    roster.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE, help="rows sent to a worker together")
+    roster.add_argument("--workers", type=int, help="worker processes, defaults to the number of CPU cores")
+    roster.add_argument(
+        "--at-risk-minutes", type=float, default=AT_RISK_DAILY_MINUTES,
+        help=f"daily play time needed for a player to be at risk (default {AT_RISK_DAILY_MINUTES})",
+    )
+    roster.add_argument("--report", help="also write the roll-up report to this JSON file")
+    roster.add_argument("--today", help="date to count the days left in the season from (YYYY-MM-DD)")
+    roster.set_defaults(handler=run_roster)
+
+    plan = subparsers.add_parser("plan", help="find the mix of round types that reaches the goal the fastest")
+    plan.add_argument("current_points", type=int)
+    plan.add_argument("--goal", default="", help="badge name or points, defaults to the highest badge")
+    plan.add_argument("--additional-game-time", type=int, default=ADDITIONAL_GAME_TIME, help="minutes between games")
+    plan.add_argument("--min-quick-play", type=float, help="lowest percent of games that are quick play")
+    plan.add_argument("--max-win-rate", type=float, help="highest percent of games that are wins")
+    plan.set_defaults(handler=run_plan)
+
+    sweep = subparsers.add_parser("sweep", help="find which round weight changes the play time the most")
+    sweep.add_argument("current_points", type=int)
+    sweep.add_argument("--goal", default="", help="badge name or points, defaults to the highest badge")
+    sweep.add_argument("--additional-game-time", type=int, default=ADDITIONAL_GAME_TIME, help="minutes between games")
+    sweep.add_argument("--step", type=sweep_step, default=SWEEP_STEP, help="percent between weight values (default 5)")
+    sweep.add_argument("--today", help="date to count the days left in the season from (YYYY-MM-DD)")
+    sweep.add_argument("-o", "--output", help="also write every set of weights and its play time to this file")
+    sweep.add_argument("--output-format", choices=EXPORT_FORMATS, help="defaults to the output file extension")
+    sweep.set_defaults(handler=run_sweep)
+
+    matches = subparsers.add_parser("matches", help="estimate the round weights from a match history log")
+    matches.add_argument("input", help="match history file (CSV or JSON Lines)")
+    matches.add_argument("--input-format", choices=("csv", "jsonl"), help="defaults to the input file extension")
+    matches.add_argument("--state", help="file keeping the totals so far, later imports only read new matches")
+    matches.set_defaults(handler=run_matches)
+
+    odds = subparsers.add_parser("odds", help="chance of reaching the goal for each daily play time")
+    odds.add_argument("current_points", type=int)
+    odds.add_argument("--goal", default="", help="badge name or points, defaults to the highest badge")
+    odds.add_argument("--additional-game-time", type=int, default=ADDITIONAL_GAME_TIME, help="minutes between games")
+    odds.add_argument("--weights", type=float, nargs="+", help="percent chance of each round type, in table order")
+    odds.add_argument("--budget-step", type=int, default=15, help="minutes between daily play times (default 15)")
+    odds.add_argument("--max-budget", type=int, default=480, help="longest daily play time (default 480)")
+    odds.add_argument("--today", help="date to count the days left in the season from (YYYY-MM-DD)")
+    odds.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    odds.add_argument("--output-format", choices=EXPORT_FORMATS, help="defaults to the output file extension")
+    odds.set_defaults(handler=run_odds)
+
+    modes = subparsers.add_parser("modes", help="rank the modes that earn points towards the goal by points per minute")
+    modes.add_argument("current_points", type=int)
+    modes.add_argument("--goal", default="", help="badge name or points, defaults to the highest badge")
+    modes.add_argument(
+        "--ladder", default=WORLD_TOUR_SOURCE, help="data file the badges come from, e.g. QuickPlayInfo"
+    )
+    modes.add_argument("--additional-game-time", type=int, default=ADDITIONAL_GAME_TIME, help="minutes between games")
+    modes.add_argument(
+        "--weights", action="append", metavar="MODE=WEIGHTS",
+        help='outcome weights of one mode in data file order, e.g. "Quick Cash=50,30,20" (can be repeated)',
+    )
+    modes.add_argument("--today", help="date to count the days left in the season from (YYYY-MM-DD)")
+    modes.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    modes.add_argument("--output-format", choices=EXPORT_FORMATS, help="defaults to the output file extension")
+    modes.set_defaults(handler=run_modes)
+
+    schedule = subparsers.add_parser("schedule", help="plan the play time for each day until the season ends")
+    schedule.add_argument("current_points", type=int)
+    schedule.add_argument("--goal", default="", help="badge name or points, defaults to the highest badge")
+    schedule.add_argument(
+        "--additional-game-time", type=int, default=ADDITIONAL_GAME_TIME, help="minutes between games"
+    )
+    schedule.add_argument("--weights", type=float, nargs="+", help="percent chance of each round type, in table order")
+    schedule.add_argument(
+        "--available", type=int, nargs="+", metavar="MINUTES",
+        help="minutes free each day, or one value for each weekday from Monday (default the whole day)",
+    )
+    schedule.add_argument(
+        "--blackout", action="append", metavar="DATE", help="date (or START:END) with no play, can be repeated"
+    )
+    schedule.add_argument(
+        "--loading", choices=LOADINGS, default="even", help="spread the play time evenly, early on, or later on"
+    )
+    schedule.add_argument("--today", help="date to plan from (YYYY-MM-DD)")
+    schedule.add_argument("-o", "--output", help="also write the plan to this file (.ics for a calendar), - for stdout")
+    schedule.add_argument("--output-format", choices=EXPORT_FORMATS + ("ics",), help="defaults to the file extension")
+    schedule.set_defaults(handler=run_schedule)
+
+    serve = subparsers.add_parser("serve", help="answer calculations over HTTP/JSON, e.g. for a bot or dashboard")
+    serve.add_argument("--host", default=DEFAULT_HOST, help=f"address to listen on (default {DEFAULT_HOST})")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default {DEFAULT_PORT})")
+    serve.add_argument("--cache-size", type=int, default=RESPONSE_CACHE_SIZE, help="responses kept in the cache")
+    serve.add_argument("--instrument", action="store_true", help="time each phase, served at /metrics")
+    serve.set_defaults(handler=run_serve)
+
+    history = subparsers.add_parser("history", help="save point snapshots and forecast the completion date")
+    history.add_argument("--history", help="progress history file, defaults to progress_history.db in the Data folder")
+    actions = history.add_subparsers(dest="action", required=True)
+
+    record = actions.add_parser("record", help="save a player's points")
+    record.add_argument("player")
+    record.add_argument("points", type=int)
+    record.add_argument("--when", help="time of the snapshot (YYYY-MM-DD or YYYY-MM-DDTHH:MM), defaults to now")
+    # The updated forecast is printed for the highest badge, from the time of the snapshot
+    record.set_defaults(goal="", today=None)
+
+    history_import = actions.add_parser("import", help="save every row (player, points, recorded_at) of a file")
+    history_import.add_argument("input", help="input file, or - for stdin")
+    history_import.add_argument("--input-format", choices=("csv", "jsonl"), help="defaults to the input file extension")
+
+    forecast = actions.add_parser("forecast", help="forecast when a player reaches the goal")
+    forecast.add_argument("player")
+    forecast.add_argument("--goal", default="", help="badge name or points, defaults to the highest badge")
+    forecast.add_argument("--today", help="date to count the days left in the season from (YYYY-MM-DD)")
+
+    history.set_defaults(handler=run_history)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.metrics:
+        enable()
+    try:
+        return args.handler(args)
+    except (ValueError, KeyError, OSError, csv.Error) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    finally:
+        if args.metrics:
+            write_metrics(args.metrics)
+
+
+def write_metrics(path):
+    with open(path, "w", encoding="utf-8") as file:
+        if path.lower().endswith(".json"):
+            json.dump(REGISTRY.to_dict(), file, indent=2)
+        else:
+            file.write(REGISTRY.prometheus_text())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,878 @@
+# Differential checks of the calculator's fast paths against plain scalar reference implementations
+# Run "python DifferentialCheck.py" to check every fast path on random inputs, it exits with 1 when any of them
+# disagrees with its reference. The speedup (reference time / fast time) is printed, it only fails a check when
+# --min-speedup is given, as timings depend on the machine and its load
+#
+# The engine reference is the original calculate() of the window, one player at a time with math.ceil, // and a
+# weighted sum, with one documented change:
+#   - days_remaining of 0 or below (on or after the season end date) counts as 1 day, everything left has to be played
+#     today. The original divided by zero on the last day and gave negative daily figures after it
+# and the original behaviour kept as it is:
+#   - a player already past the goal has a negative points_remaining, so 0 or negative games and play time (ceil
+#     rounds towards 0), and daily points floored towards minus infinity (-7 // 3 is -3)
+#
+# Inputs are drawn from fixed seeds, with extra weight on the edges: exactly at the goal, past it, the last day of the
+# season and after it, weights of 0, and custom round points. Exact values (games, badges, durations, percentiles) must
+# match exactly and float values to a relative 1e-9. Sampled paths (the simulation) are compared to the exact
+# distribution from the reference: means within a z-score bound using the exact variance, and percentiles with the
+# Dvoretzky-Kiefer-Wolfowitz bound, both at a false alarm chance of ALPHA over the whole run
+#
+# The CLI batch and roster modes, the server and the window all calculate through calculate_batch, so they are covered
+# by the engine check
+
+import argparse
+from itertools import combinations
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from BadgeIndex import BadgeIndex
+from BudgetOdds import DAILY_BUDGETS, budget_odds_curve, day_points_distribution, reach_probabilities
+from CalculationEngine import calculate_batch
+from GameConstants import ROUND_POINTS, ROUND_TIME_MULTIPLIERS, ROUND_WEIGHTS, WORLD_TOUR_BADGE_OPTIONS
+from ExactDistribution import EXACT_PERCENTILES, ExactDistributionTable
+from GrindSchedule import LOADINGS, fill_minutes, loading_weights
+from ModeComparison import Mode, ModeTable, compare_modes
+from PlaytimeSimulator import simulate_chunk, simulation_arguments
+from RoundMixPlanner import plan_round_mix
+from RoundResults import format_durations
+from WeightSweep import sweep_weights
+
+
+# Random inputs per check, checks with costly references (sweeps, tables, simulations) use fewer of their own units
+CASES = 1000
+SEED = 2024
+
+# Timings per path, the fastest is used
+REPEATS = 3
+
+# Chance of any statistical check failing by bad luck in a whole run
+ALPHA = 1e-3
+
+# Tolerance of float values
+RELATIVE_TOLERANCE = 1e-9
+ABSOLUTE_TOLERANCE = 1e-9
+
+# Highest points remaining in the exact and simulation checks, the scalar reference is too slow for the whole ladder
+DISTRIBUTION_POINTS = 150
+
+# Trajectories of the fast simulation and of the scalar reference simulation
+FAST_TRAJECTORIES = 8192
+REFERENCE_TRAJECTORIES = 500
+
+# Tolerance of chances summed with FFTs, their rounding errors add up over the squarings
+PROBABILITY_TOLERANCE = 1e-9
+
+# Modes in each random mode table, enough for the table to be the fast path
+TABLE_MODES = 250
+
+# The round mix reference tries every set of shares in steps of 1 / MIX_GRID_PARTS, constraints use the same steps
+MIX_GRID_PARTS = 10
+
+# Mismatches described in the output of each check
+MAX_REPORTED = 5
+
+# name -> check function taking (rng, cases, repeats) and returning a CheckResult
+_CHECKS = {}
+
+
+# Register a check
+def check(name):
+    def register(function):
+        _CHECKS[name] = function
+        return function
+    return register
+
+
+class CheckResult:
+    def __init__(self, name, cases):
+        self.name = name
+        self.cases = cases
+        self.mismatches = 0
+        self.examples = []
+        self.reference_seconds = 0.0
+        self.fast_seconds = 0.0
+
+    def mismatch(self, description):
+        self.mismatches += 1
+        if len(self.examples) < MAX_REPORTED:
+            self.examples.append(description)
+
+    # Compare two values, exactly for ints and strings and with the tolerance for floats
+    def compare(self, what, reference, fast):
+        if isinstance(reference, float) or isinstance(fast, float):
+            same = math.isclose(reference, fast, rel_tol=RELATIVE_TOLERANCE, abs_tol=ABSOLUTE_TOLERANCE)
+        else:
+            same = reference == fast
+        if not same:
+            self.mismatch(f"{what}: reference {reference!r}, fast {fast!r}")
+
+    @property
+    def speedup(self):
+        return self.reference_seconds / self.fast_seconds if self.fast_seconds > 0 else math.inf
+
+    def to_dict(self):
+        return {
+            "cases": self.cases,
+            "mismatches": self.mismatches,
+            "examples": self.examples,
+            "reference_seconds": self.reference_seconds,
+            "fast_seconds": self.fast_seconds,
+            "speedup": self.speedup,
+        }
+
+
+# Run function repeats times, returns the fastest time and the last result
+def _timed(function, repeats):
+    best = math.inf
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+# One value per row from one of several choices (arrays or scalars), picked with the given chances
+def _mix(rng, size, choices):
+    picks = rng.choice(len(choices), size, p=[chance for chance, _ in choices])
+    values = np.empty(size, dtype=np.result_type(*(np.asarray(value) for _, value in choices)))
+    for i, (_, value) in enumerate(choices):
+        values[picks == i] = np.broadcast_to(value, size)[picks == i]
+    return values
+
+
+# Round weights in percent, shape (size, rounds), some rounds weighted 0 and some sets not adding up to 100
+def _random_weights(rng, size, rounds=len(ROUND_WEIGHTS)):
+    weights = rng.uniform(0, 100, (size, rounds)) * (rng.random((size, rounds)) > 0.2)
+    normalized = weights / np.maximum(weights.sum(axis=1, keepdims=True), 1e-9) * 100
+    defaults = np.broadcast_to(np.asarray(ROUND_WEIGHTS, dtype=np.float64), (size, rounds))
+    pick = rng.random(size)
+    return np.where((pick < 0.2)[:, None], defaults, np.where((pick < 0.7)[:, None], normalized, weights))
+
+
+# Round points of the season, or a random ladder of points (at least 1 each)
+def _random_round_points(rng, default_chance=0.5):
+    if rng.random() < default_chance:
+        return ROUND_POINTS
+    return tuple(int(points) for points in rng.integers(1, 31, len(ROUND_POINTS)))
+
+
+# --- Scalar References ---
+# The window's original calculate() for one player, see the top of the file for the days_remaining change
+def reference_calculate(current_points, goal_points, game_time, days_remaining, round_points=ROUND_POINTS,
+                        round_time_multipliers=ROUND_TIME_MULTIPLIERS, round_weights=ROUND_WEIGHTS):
+    points_remaining = goal_points - current_points
+    games = [math.ceil(points_remaining / points) for points in round_points]
+    playtime = [count * game_time * multiplier for count, multiplier in zip(games, round_time_multipliers)]
+    weighted_playtime = sum((weight / 100) * minutes for weight, minutes in zip(round_weights, playtime))
+
+    days = max(days_remaining, 1)
+    return {
+        "points_remaining": points_remaining,
+        "games": games,
+        "playtime": playtime,
+        "weighted_playtime": weighted_playtime,
+        "days_remaining": days_remaining,
+        "daily_points": points_remaining // days,
+        "max_daily_playtime": playtime[0] / days,
+        "weighted_daily_playtime": weighted_playtime / days,
+    }
+
+
+# The window's original convert_time(), without the trailing newline
+def reference_convert_time(bulk_minutes):
+    hours = int(bulk_minutes // 60)
+    minutes = int(bulk_minutes % 60)
+    days = hours // 24
+    if days > 0:
+        return f"{days} days, {hours % 24} hours, {minutes} minutes"
+    elif hours > 0:
+        return f"{hours} hours, {minutes} minutes"
+    else:
+        return f"{minutes} minutes"
+
+
+# Badge reached and the next one by walking the ladder from the bottom
+def reference_classify(ladder, points):
+    current = -1
+    for i, (_, threshold) in enumerate(ladder):
+        if points >= threshold:
+            current = i
+    if current + 1 < len(ladder):
+        tier_start = ladder[current][1] if current >= 0 else 0
+        tier_end = ladder[current + 1][1]
+        return current, current + 1, tier_end - points, (points - tier_start) / (tier_end - tier_start) * 100
+    return current, current + 1, 0, 100.0
+
+
+# Fill the days by weight, cap the days that overflow and share what is left among the others, until nothing overflows
+def reference_fill_minutes(capacity, weights, minutes_needed):
+    minutes = [0.0] * len(capacity)
+    open_days = [day for day in range(len(capacity)) if capacity[day] > 0 and weights[day] > 0]
+    remaining = max(minutes_needed, 0.0)
+    while open_days and remaining > 0:
+        level = remaining / sum(weights[day] for day in open_days)
+        full = [day for day in open_days if capacity[day] <= level * weights[day]]
+        if not full:
+            for day in open_days:
+                minutes[day] = level * weights[day]
+            break
+        for day in full:
+            minutes[day] = capacity[day]
+            remaining -= capacity[day]
+        open_days = [day for day in open_days if capacity[day] > level * weights[day]]
+    return minutes
+
+
+# Chance of needing each number of games and of time slots (in game times) for 0 to max_points points remaining
+# One point total at a time with lists, the last round type played adds one game and its time multiplier in slots
+def reference_distribution(round_weights, round_points, round_time_multipliers, max_points):
+    total = sum(round_weights)
+    rounds = [
+        (weight / total, points, slots)
+        for weight, points, slots in zip(round_weights, round_points, round_time_multipliers)
+        if weight > 0
+    ]
+    max_games = math.ceil(max_points / min(points for _, points, _ in rounds))
+    games_length = max_games + 1
+    slots_length = max_games * max(slots for _, _, slots in rounds) + 1
+
+    games_rows = [[1.0] + [0.0] * (games_length - 1)]
+    slots_rows = [[1.0] + [0.0] * (slots_length - 1)]
+    for r in range(1, max_points + 1):
+        games_row = [0.0] * games_length
+        slots_row = [0.0] * slots_length
+        for probability, points, slots in rounds:
+            games_previous = games_rows[max(r - points, 0)]
+            slots_previous = slots_rows[max(r - points, 0)]
+            for g in range(1, games_length):
+                games_row[g] += probability * games_previous[g - 1]
+            for s in range(slots, slots_length):
+                slots_row[s] += probability * slots_previous[s - slots]
+        games_rows.append(games_row)
+        slots_rows.append(slots_row)
+    return games_rows, slots_rows
+
+
+def _distribution_mean(row):
+    return sum(value * count for value, count in enumerate(row))
+
+
+def _distribution_variance(row):
+    mean = _distribution_mean(row)
+    return sum((value - mean) ** 2 * count for value, count in enumerate(row))
+
+
+# Smallest value whose cumulative chance reaches q percent, with the same slack as the exact table
+def _distribution_percentile(row, q):
+    running = 0.0
+    for value, count in enumerate(row):
+        running += count
+        if running >= q / 100 - 1e-12:
+            return value
+    return len(row) - 1
+
+
+# Scalar simulation of the grind, one trajectory at a time, returns (games, minutes) of each trajectory
+def reference_simulation(seed, trajectories, points_remaining, game_time, round_weights, round_points,
+                         round_time_multipliers):
+    rng = random.Random(seed)
+    choices = list(zip(round_points, round_time_multipliers))
+    results = []
+    for _ in range(trajectories):
+        points = games = minutes = 0
+        while points < points_remaining:
+            round_points_won, multiplier = rng.choices(choices, weights=round_weights)[0]
+            points += round_points_won
+            minutes += multiplier * game_time
+            games += 1
+        results.append((games, minutes))
+    return results
+
+
+# Chance of reaching points_remaining in days days for each day distribution, by convolving the day's distribution
+# with the running total once per day. Chances at or above points_remaining are dropped after every day, they only
+# count as reached
+def reference_reach_probabilities(points_remaining, days, day_distributions):
+    if points_remaining <= 0:
+        return [1.0] * len(day_distributions)
+    chances = []
+    for distribution in day_distributions:
+        total = np.ones(1)
+        for _ in range(max(days, 1)):
+            total = np.convolve(total, distribution)[:points_remaining]
+        chances.append(min(max(1 - float(total.sum()), 0.0), 1.0))
+    return chances
+
+
+# Expected points per game and games to the goal of one mode at a time, weights are made to add up to 1 first like in
+# the mode table
+def reference_compare_modes(modes, points_remaining, days_remaining, additional_game_time):
+    rows = []
+    for mode in modes:
+        total = sum(mode.weights)
+        weights = [weight / total for weight in mode.weights]
+        games_per_outcome = sum(weight * multiplier for weight, multiplier in zip(weights, mode.time_multipliers))
+        points_per_game = sum(weight * points for weight, points in zip(weights, mode.points)) / games_per_outcome
+        minutes_per_game = mode.game_time + additional_game_time
+        games_to_goal = math.ceil(max(points_remaining, 0) / points_per_game)
+        rows.append({
+            "points_per_game": points_per_game,
+            "minutes_per_game": minutes_per_game,
+            "points_per_minute": points_per_game / minutes_per_game,
+            "games_to_goal": games_to_goal,
+            "minutes_to_goal": games_to_goal * minutes_per_game,
+            "daily_minutes": games_to_goal * minutes_per_game / max(days_remaining, 1),
+        })
+    ranking = sorted(range(len(rows)), key=lambda i: -rows[i]["points_per_minute"])
+    return rows, ranking
+
+
+# Most points per minute of any mix of round types in steps of 1 / parts that meets every constraint, None if none
+# does. Constraints on runs of neighbouring round types with limits in the same steps have their best mix on the grid
+def reference_best_mix_rate(game_time, constraints, round_points, round_time_multipliers, parts=MIX_GRID_PARTS):
+    rounds = len(round_points)
+    best = None
+    # Every way to split parts into rounds shares, from the positions of rounds - 1 dividers among parts + rounds - 1
+    for dividers in combinations(range(parts + rounds - 1), rounds - 1):
+        edges = (-1, *dividers, parts + rounds - 1)
+        shares = [(edges[i + 1] - edges[i] - 1) / parts for i in range(rounds)]
+        if any(
+            not minimum - 1e-9 <= sum(shares[i] for i in constraint_rounds) <= maximum + 1e-9
+            for constraint_rounds, minimum, maximum in constraints
+        ):
+            continue
+        points = sum(share * value for share, value in zip(shares, round_points))
+        minutes = sum(share * multiplier * game_time for share, multiplier in zip(shares, round_time_multipliers))
+        if best is None or points / minutes > best:
+            best = points / minutes
+    return best
+
+
+# --- Checks ---
+@check("engine.calculate_batch")
+def _check_calculate_batch(rng, cases, repeats):
+    result = CheckResult("engine.calculate_batch", cases)
+
+    # Cases are split into groups sharing one set of round points, as calculate_batch takes one set
+    for group in np.array_split(np.arange(cases), 4):
+        size = len(group)
+        if not size:
+            continue
+        round_points = ROUND_POINTS if group[0] == 0 else _random_round_points(rng)
+        goal_points = _mix(rng, size, [
+            (0.5, np.asarray([points for _, points in WORLD_TOUR_BADGE_OPTIONS])[rng.integers(0, 15, size)]),
+            (0.5, rng.integers(1, 5000, size)),
+        ])
+        current_points = _mix(rng, size, [
+            (0.5, rng.integers(0, goal_points + 1)),
+            (0.1, goal_points),
+            (0.1, goal_points - rng.integers(1, 4, size)),
+            (0.2, goal_points + rng.integers(1, 500, size)),
+            (0.1, 0),
+        ])
+        game_time = 10 + rng.integers(0, 16, size)
+        days_remaining = _mix(rng, size, [
+            (0.6, rng.integers(1, 121, size)),
+            (0.15, 0),
+            (0.15, rng.integers(-60, 0, size)),
+            (0.1, 1),
+        ])
+        round_weights = _random_weights(rng, size, len(round_points))
+
+        def reference():
+            return [
+                reference_calculate(
+                    int(current_points[i]), int(goal_points[i]), int(game_time[i]), int(days_remaining[i]),
+                    round_points, ROUND_TIME_MULTIPLIERS, round_weights[i].tolist(),
+                )
+                for i in range(size)
+            ]
+
+        def fast():
+            return calculate_batch(
+                current_points, goal_points, game_time, days_remaining, round_points, ROUND_TIME_MULTIPLIERS,
+                round_weights,
+            )
+
+        reference_seconds, expected = _timed(reference, repeats)
+        fast_seconds, actual = _timed(fast, repeats)
+        result.reference_seconds += reference_seconds
+        result.fast_seconds += fast_seconds
+
+        columns = {
+            "points_remaining": actual.points_remaining.tolist(),
+            "games": actual.games.tolist(),
+            "playtime": actual.playtime.tolist(),
+            "weighted_playtime": actual.weighted_playtime.tolist(),
+            "days_remaining": actual.days_remaining.tolist(),
+            "daily_points": actual.daily_points.tolist(),
+            "max_daily_playtime": actual.max_daily_playtime.tolist(),
+            "weighted_daily_playtime": actual.weighted_daily_playtime.tolist(),
+        }
+        for i, row in enumerate(expected):
+            case = (
+                f"current {current_points[i]}, goal {goal_points[i]}, game time {game_time[i]}, "
+                f"days {days_remaining[i]}, points {round_points}"
+            )
+            for key, values in columns.items():
+                if isinstance(row[key], list):
+                    for round_index, (reference_value, fast_value) in enumerate(zip(row[key], values[i])):
+                        result.compare(f"{key}[{round_index}] ({case})", reference_value, fast_value)
+                else:
+                    result.compare(f"{key} ({case})", row[key], values[i])
+    return result
+
+
+@check("format.format_durations")
+def _check_format_durations(rng, cases, repeats):
+    result = CheckResult("format.format_durations", cases)
+    minutes = _mix(rng, cases, [
+        (0.4, rng.uniform(0, 60 * 24 * 30, cases)),
+        (0.2, rng.integers(0, 60 * 24 * 3, cases).astype(np.float64)),
+        (0.1, np.asarray([0.0, 59.0, 60.0, 1439.0, 1440.0, 1500.5])[rng.integers(0, 6, cases)]),
+        (0.1, rng.uniform(-3000, 0, cases)),
+        (0.2, rng.uniform(0, 59.999, cases)),
+    ])
+
+    reference_seconds, expected = _timed(lambda: [reference_convert_time(value) for value in minutes.tolist()], repeats)
+    fast_seconds, actual = _timed(lambda: format_durations(minutes), repeats)
+    result.reference_seconds, result.fast_seconds = reference_seconds, fast_seconds
+
+    for value, reference_text, fast_text in zip(minutes.tolist(), expected, actual):
+        result.compare(f"{value!r} minutes", reference_text, fast_text)
+    return result
+
+
+@check("badges.classify_array")
+def _check_classify_array(rng, cases, repeats):
+    result = CheckResult("badges.classify_array", cases)
+    ladder = sorted(WORLD_TOUR_BADGE_OPTIONS, key=lambda option: option[1])
+    thresholds = np.asarray([points for _, points in ladder])
+    points = _mix(rng, cases, [
+        (0.5, rng.integers(-100, 3000, cases)),
+        (0.5, thresholds[rng.integers(0, len(thresholds), cases)] + rng.integers(-1, 2, cases)),
+    ])
+    index = BadgeIndex(WORLD_TOUR_BADGE_OPTIONS)
+
+    reference_seconds, expected = _timed(
+        lambda: [reference_classify(ladder, value) for value in points.tolist()], repeats
+    )
+    fast_seconds, actual = _timed(lambda: index.classify_array(points), repeats)
+    result.reference_seconds, result.fast_seconds = reference_seconds, fast_seconds
+
+    fast_rows = zip(
+        actual["current_badge"].tolist(),
+        actual["next_badge"].tolist(),
+        actual["points_to_next"].tolist(),
+        actual["percent_through_tier"].tolist(),
+    )
+    for value, reference_row, fast_row in zip(points.tolist(), expected, fast_rows):
+        for key, reference_value, fast_value in zip(
+            ("current_badge", "next_badge", "points_to_next", "percent_through_tier"), reference_row, fast_row
+        ):
+            result.compare(f"{key} of {value} points", reference_value, fast_value)
+    return result
+
+
+# Each case is one player swept over every set of weights in 10% steps (8,008 sets)
+@check("sweep.sweep_weights")
+def _check_sweep_weights(rng, cases, repeats):
+    players = max(1, cases // 200)
+    result = CheckResult("sweep.sweep_weights", players)
+    for _ in range(players):
+        goal_points = int(rng.integers(100, 2401))
+        current_points = int(rng.integers(0, goal_points + 200))
+        game_time = int(10 + rng.integers(0, 16))
+        days_remaining = int(rng.integers(-5, 121))
+
+        fast_seconds, sweep = _timed(
+            lambda: sweep_weights(current_points, goal_points, game_time, days_remaining, 10), repeats
+        )
+        weights = sweep.weights.tolist()
+
+        def reference():
+            return [
+                reference_calculate(current_points, goal_points, game_time, days_remaining, round_weights=row)
+                for row in weights
+            ]
+
+        reference_seconds, expected = _timed(reference, repeats)
+        result.reference_seconds += reference_seconds
+        result.fast_seconds += fast_seconds
+
+        for row, round_weights, playtime, daily in zip(
+            expected, weights, sweep.weighted_playtime.tolist(), sweep.weighted_daily_playtime.tolist()
+        ):
+            case = f"current {current_points}, goal {goal_points}, days {days_remaining}, weights {round_weights}"
+            result.compare(f"weighted_playtime ({case})", row["weighted_playtime"], playtime)
+            result.compare(f"weighted_daily_playtime ({case})", row["weighted_daily_playtime"], daily)
+    return result
+
+
+# Cases are split into calendars (availability, blackouts and loading) shared by many players, like a roster
+@check("schedule.fill_minutes")
+def _check_fill_minutes(rng, cases, repeats):
+    result = CheckResult("schedule.fill_minutes", cases)
+    for group in np.array_split(np.arange(cases), 8):
+        size = len(group)
+        if not size:
+            continue
+        days = int(rng.integers(1, 151))
+        available = rng.choice([0, 30, 60, 90, 120, 240, 1440], 7)
+        capacity = available[(int(rng.integers(0, 7)) + np.arange(days)) % 7].astype(np.float64)
+        capacity[rng.random(days) < 0.1] = 0
+        weights = loading_weights(days, LOADINGS[int(rng.integers(0, len(LOADINGS)))])
+        minutes_needed = _mix(rng, size, [
+            (0.6, rng.uniform(0, capacity.sum() + 1, size)),
+            (0.2, rng.uniform(capacity.sum(), capacity.sum() * 2 + 1, size)),
+            (0.1, 0.0),
+            (0.1, capacity.sum()),
+        ])
+
+        capacity_list, weights_list = capacity.tolist(), weights.tolist()
+        reference_seconds, expected = _timed(
+            lambda: [reference_fill_minutes(capacity_list, weights_list, need) for need in minutes_needed.tolist()],
+            repeats,
+        )
+        fast_seconds, actual = _timed(lambda: fill_minutes(capacity, weights, minutes_needed), repeats)
+        result.reference_seconds += reference_seconds
+        result.fast_seconds += fast_seconds
+
+        for need, reference_row, fast_row in zip(minutes_needed.tolist(), expected, actual.tolist()):
+            for day, (reference_value, fast_value) in enumerate(zip(reference_row, fast_row)):
+                # Capacities add up in a different order, so allow for rounding in the total
+                if not math.isclose(reference_value, fast_value, rel_tol=RELATIVE_TOLERANCE, abs_tol=1e-6):
+                    result.mismatch(f"day {day} of {days} for {need!r} minutes: {reference_value!r} != {fast_value!r}")
+    return result
+
+
+# Each case is one table of every point total up to DISTRIBUTION_POINTS, with random weights and round points
+@check("exact.distribution")
+def _check_exact_distribution(rng, cases, repeats):
+    tables = max(1, cases // 250)
+    result = CheckResult("exact.distribution", tables)
+    for _ in range(tables):
+        round_points = _random_round_points(rng)
+        round_weights = _random_weights(rng, 1, len(round_points))[0].tolist()
+        if sum(round_weights) <= 0:
+            round_weights = list(ROUND_WEIGHTS)
+        game_time = int(10 + rng.integers(0, 16))
+
+        reference_seconds, (games_rows, slots_rows) = _timed(
+            lambda: reference_distribution(round_weights, round_points, ROUND_TIME_MULTIPLIERS, DISTRIBUTION_POINTS),
+            repeats,
+        )
+        fast_seconds, table = _timed(
+            lambda: ExactDistributionTable(
+                round_weights, game_time, round_points, ROUND_TIME_MULTIPLIERS, DISTRIBUTION_POINTS
+            ),
+            repeats,
+        )
+        result.reference_seconds += reference_seconds
+        result.fast_seconds += fast_seconds
+
+        for r in range(DISTRIBUTION_POINTS + 1):
+            case = f"{r} points, weights {[round(w, 1) for w in round_weights]}, points {round_points}"
+            result.compare(f"mean_games ({case})", _distribution_mean(games_rows[r]), float(table.mean_games[r]))
+            result.compare(
+                f"mean_minutes ({case})",
+                _distribution_mean(slots_rows[r]) * game_time,
+                float(table.mean_minutes[r]),
+            )
+            for q, games, minutes in zip(
+                EXACT_PERCENTILES, table.games_percentiles[r].tolist(), table.minutes_percentiles[r].tolist()
+            ):
+                result.compare(f"p{q} games ({case})", _distribution_percentile(games_rows[r], q), games)
+                result.compare(
+                    f"p{q} minutes ({case})", _distribution_percentile(slots_rows[r], q) * game_time, minutes
+                )
+    return result
+
+
+# Each case is one simulation of FAST_TRAJECTORIES grinds, checked against the exact distribution of the reference
+# The fast simulation rounds each weight to the nearest 1/65536, far below what these bounds can see
+@check("simulation.simulate_chunk")
+def _check_simulate_chunk(rng, cases, repeats):
+    simulations = max(1, cases // 50)
+    result = CheckResult("simulation.simulate_chunk", simulations)
+    # Mean and percentile tests of the fast simulation, and the mean test of the reference simulation
+    tests = simulations * (3 + len(EXACT_PERCENTILES))
+    alpha = ALPHA / tests
+    z = statistics.NormalDist().inv_cdf(1 - alpha / 2)
+    epsilon = math.sqrt(math.log(2 / alpha) / (2 * FAST_TRAJECTORIES))
+
+    for _ in range(simulations):
+        round_weights = _random_weights(rng, 1)[0].tolist()
+        if sum(round_weights) <= 0:
+            round_weights = list(ROUND_WEIGHTS)
+        points_remaining = int(rng.integers(1, DISTRIBUTION_POINTS + 1))
+        game_time = int(10 + rng.integers(0, 16))
+        seed = int(rng.integers(0, 2 ** 32))
+        case = f"{points_remaining} points, weights {[round(w, 1) for w in round_weights]}"
+
+        games_rows, slots_rows = reference_distribution(
+            round_weights, ROUND_POINTS, ROUND_TIME_MULTIPLIERS, points_remaining
+        )
+        exact_games, exact_slots = games_rows[points_remaining], slots_rows[points_remaining]
+
+        arguments = simulation_arguments(points_remaining, game_time, round_weights)
+        fast_seconds, simulated = _timed(lambda: simulate_chunk(seed, FAST_TRAJECTORIES, *arguments), repeats)
+        reference_seconds, trajectories = _timed(
+            lambda: reference_simulation(
+                seed, REFERENCE_TRAJECTORIES, points_remaining, game_time, round_weights, ROUND_POINTS,
+                ROUND_TIME_MULTIPLIERS,
+            ),
+            repeats,
+        )
+        # Compared per trajectory, the two simulations run different numbers of them
+        result.reference_seconds += reference_seconds / REFERENCE_TRAJECTORIES
+        result.fast_seconds += fast_seconds / FAST_TRAJECTORIES
+
+        samples = (
+            ("fast mean games", simulated.mean_games, exact_games, 1, FAST_TRAJECTORIES),
+            ("fast mean minutes", simulated.mean_minutes, exact_slots, game_time, FAST_TRAJECTORIES),
+            (
+                "reference mean games",
+                statistics.fmean(games for games, _ in trajectories),
+                exact_games,
+                1,
+                REFERENCE_TRAJECTORIES,
+            ),
+        )
+        for what, mean, row, scale, count in samples:
+            expected = _distribution_mean(row) * scale
+            # Plus float rounding, for distributions with no spread (e.g. one game always reaches the goal)
+            bound = z * math.sqrt(_distribution_variance(row) / count) * scale + ABSOLUTE_TOLERANCE * max(expected, 1)
+            if abs(mean - expected) > bound:
+                result.mismatch(f"{what} ({case}): {mean:.3f}, exact {expected:.3f} +- {bound:.3f}")
+
+        # The simulated percentile x must have an exact chance of at most x at least q - epsilon, and of less than x
+        # at most q + epsilon
+        cumulative = np.cumsum(exact_slots)
+        for q in EXACT_PERCENTILES:
+            slots = simulated.minutes_percentile(q) // game_time
+            at_most = cumulative[min(slots, len(cumulative) - 1)]
+            below = cumulative[slots - 1] if slots > 0 else 0.0
+            if at_most < q / 100 - epsilon or below > q / 100 + epsilon:
+                result.mismatch(
+                    f"p{q} minutes ({case}): {slots * game_time}, exact chance {below:.4f} to {at_most:.4f}"
+                )
+    return result
+
+
+# Each case is one odds curve over every daily budget. The day distributions are shared, the check (and its timing) is
+# of adding them up over the days left
+@check("odds.budget_odds_curve")
+def _check_budget_odds_curve(rng, cases, repeats):
+    curves = max(1, cases // 100)
+    result = CheckResult("odds.budget_odds_curve", curves)
+    for _ in range(curves):
+        round_points = _random_round_points(rng)
+        round_weights = _random_weights(rng, 1, len(round_points))[0].tolist()
+        if sum(round_weights) <= 0:
+            round_weights = list(ROUND_WEIGHTS)
+        game_time = int(10 + rng.integers(0, 16))
+        points_remaining = int(_mix(rng, 1, [
+            (0.7, rng.integers(1, 2401, 1)),
+            (0.1, rng.integers(1, 10, 1)),
+            (0.2, rng.integers(-100, 1, 1)),
+        ])[0])
+        days_remaining = int(_mix(rng, 1, [
+            (0.7, rng.integers(1, 121, 1)),
+            (0.15, 0),
+            (0.15, rng.integers(-5, 0, 1)),
+        ])[0])
+
+        days = [
+            day_points_distribution(budget, game_time, round_weights, round_points, ROUND_TIME_MULTIPLIERS)
+            for budget in DAILY_BUDGETS
+        ]
+        reference_seconds, expected = _timed(
+            lambda: reference_reach_probabilities(points_remaining, days_remaining, days), repeats
+        )
+        fast_seconds, actual = _timed(lambda: reach_probabilities(points_remaining, days_remaining, days), repeats)
+        result.reference_seconds += reference_seconds
+        result.fast_seconds += fast_seconds
+
+        curve = budget_odds_curve(
+            points_remaining, days_remaining, game_time, DAILY_BUDGETS, round_weights, round_points,
+            ROUND_TIME_MULTIPLIERS,
+        )
+        for budget, reference_chance, fast_chance, curve_chance in zip(
+            DAILY_BUDGETS, expected, actual.tolist(), curve.probabilities.tolist()
+        ):
+            case = f"{budget} minutes a day, {points_remaining} points, {days_remaining} days, points {round_points}"
+            for what, chance in (("reach_probabilities", fast_chance), ("budget_odds_curve", curve_chance)):
+                if not math.isclose(reference_chance, chance, rel_tol=0, abs_tol=PROBABILITY_TOLERANCE):
+                    result.mismatch(f"{what} ({case}): reference {reference_chance!r}, fast {chance!r}")
+    return result
+
+
+# Cases are split into mode tables of TABLE_MODES random modes, with padded outcomes, zero weights and repeated rates
+@check("modes.compare_modes")
+def _check_compare_modes(rng, cases, repeats):
+    result = CheckResult("modes.compare_modes", cases)
+    for group in np.array_split(np.arange(cases), max(1, cases // TABLE_MODES)):
+        modes = []
+        for i in range(len(group)):
+            outcomes = int(rng.integers(1, 8))
+            weights = (rng.integers(0, 5, outcomes) * (rng.random(outcomes) > 0.2)).tolist()
+            if sum(weights) <= 0:
+                weights[0] = 1
+            modes.append(Mode(
+                f"Mode {i}",
+                "Random",
+                [f"Outcome {outcome}" for outcome in range(outcomes)],
+                rng.integers(1, 31, outcomes).tolist(),
+                rng.integers(1, 4, outcomes).tolist(),
+                weights,
+                int(rng.choice([6, 8, 10, 12])),
+            ))
+        table = ModeTable(modes)
+        points_remaining = int(_mix(rng, 1, [(0.7, rng.integers(1, 2401, 1)), (0.3, rng.integers(-50, 1, 1))])[0])
+        days_remaining = int(_mix(rng, 1, [(0.7, rng.integers(1, 121, 1)), (0.3, rng.integers(-5, 1, 1))])[0])
+        additional_game_time = int(rng.integers(0, 6))
+
+        reference_seconds, (expected, ranking) = _timed(
+            lambda: reference_compare_modes(modes, points_remaining, days_remaining, additional_game_time), repeats
+        )
+        fast_seconds, comparison = _timed(
+            lambda: compare_modes(table, points_remaining, days_remaining, additional_game_time), repeats
+        )
+        result.reference_seconds += reference_seconds
+        result.fast_seconds += fast_seconds
+
+        columns = {
+            "points_per_game": comparison.points_per_game.tolist(),
+            "minutes_per_game": comparison.minutes_per_game.tolist(),
+            "points_per_minute": comparison.points_per_minute.tolist(),
+            "games_to_goal": comparison.games_to_goal.tolist(),
+            "minutes_to_goal": comparison.minutes_to_goal.tolist(),
+            "daily_minutes": comparison.daily_minutes.tolist(),
+        }
+        for mode, row, *values in zip(modes, expected, *columns.values()):
+            case = f"{mode.name}, {points_remaining} points, {days_remaining} days"
+            for key, value in zip(columns, values):
+                result.compare(f"{key} ({case})", float(row[key]), float(value))
+        result.compare(f"ranking ({points_remaining} points)", ranking, comparison.ranking.tolist())
+    return result
+
+
+# Each case is one plan with random round points and constraints on runs of neighbouring round types, like the quick
+# play and win rounds, some of which can't all be met
+@check("planner.plan_round_mix")
+def _check_plan_round_mix(rng, cases, repeats):
+    plans = max(1, cases // 20)
+    result = CheckResult("planner.plan_round_mix", plans)
+    rounds = len(ROUND_POINTS)
+    for _ in range(plans):
+        round_points = _random_round_points(rng)
+        game_time = int(10 + rng.integers(0, 16))
+        constraints = []
+        for _ in range(int(rng.integers(0, 4))):
+            first = int(rng.integers(0, rounds))
+            last = int(rng.integers(first, rounds))
+            low, high = sorted(rng.integers(0, MIX_GRID_PARTS + 1, 2).tolist())
+            constraints.append((tuple(range(first, last + 1)), low / MIX_GRID_PARTS, high / MIX_GRID_PARTS))
+        case = f"points {round_points}, constraints {constraints}"
+
+        reference_seconds, expected = _timed(
+            lambda: reference_best_mix_rate(game_time, constraints, round_points, ROUND_TIME_MULTIPLIERS), repeats
+        )
+
+        def fast():
+            try:
+                return plan_round_mix(1000, game_time, constraints, round_points, ROUND_TIME_MULTIPLIERS)
+            except ValueError:
+                return None
+
+        fast_seconds, plan = _timed(fast, repeats)
+        result.reference_seconds += reference_seconds
+        result.fast_seconds += fast_seconds
+
+        if plan is None or expected is None:
+            if (plan is None) != (expected is None):
+                result.mismatch(f"feasible ({case}): reference {expected is not None}, fast {plan is not None}")
+            continue
+        result.compare(f"points_per_minute ({case})", expected, plan.points_per_minute)
+        shares = plan.shares.tolist()
+        if min(shares) < -1e-9 or not math.isclose(sum(shares), 1.0) or any(
+            not minimum - 1e-9 <= sum(shares[i] for i in constraint_rounds) <= maximum + 1e-9
+            for constraint_rounds, minimum, maximum in constraints
+        ):
+            result.mismatch(f"shares ({case}): {[round(share, 4) for share in shares]} break the constraints")
+    return result
+
+
+# --- Running ---
+def run_checks(names=None, cases=CASES, seed=SEED, repeats=REPEATS, min_speedup=None, stream=sys.stderr):
+    results = {}
+    failures = []
+    for name, function in _CHECKS.items():
+        if names and not any(name.startswith(prefix) for prefix in names):
+            continue
+        # Each check has its own stream of inputs, so the inputs don't depend on which checks run
+        rng = np.random.default_rng([seed, zlib.crc32(name.encode("utf-8"))])
+        result = function(rng, cases, repeats)
+        results[name] = result.to_dict()
+
+        line = f"{name}: {result.cases:,} cases, "
+        line += f"{result.mismatches:,} mismatches" if result.mismatches else "all match"
+        line += f", {result.speedup:.1f}x the reference speed"
+        if result.mismatches:
+            failures.append(name)
+        if min_speedup is not None and result.speedup < min_speedup:
+            failures.append(name)
+            line += "  SLOWER"
+        print(line, file=stream)
+        for example in result.examples:
+            print(f"  {example}", file=stream)
+
+    return {
+        "metadata": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": seed,
+            "cases": cases,
+            "min_speedup": min_speedup,
+        },
+        "results": results,
+        "failures": sorted(set(failures)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the fast paths against scalar reference implementations")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--cases", type=int, default=CASES, help=f"random inputs per check (default {CASES})")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"seed of the random inputs (default {SEED})")
+    parser.add_argument("--filter", nargs="+", help="only run checks whose names start with these")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="timings of each path, the fastest is used")
+    parser.add_argument(
+        "--min-speedup", type=float,
+        help="also fail a fast path that isn't this many times faster than the reference (e.g. 1)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_checks(args.filter, args.cases, args.seed, args.repeats, args.min_speedup)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    if results["failures"]:
+        print(f"{len(results['failures'])} check(s) failed: {', '.join(results['failures'])}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
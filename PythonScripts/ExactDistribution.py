@@ -0,0 +1,160 @@
+# Exact distribution of the games and play time needed to reach the goal points
+# The round points and time multipliers are small integers, so the chance of needing every possible number of games
+# (and minutes) can be worked out for each point total with a dynamic programming pass, with no sampling noise
+
+from functools import lru_cache
+import math
+
+import numpy as np
+
+from GameConstants import (
+    ADDITIONAL_GAME_TIME,
+    BASE_GAME_TIME,
+    ROUND_POINTS,
+    ROUND_TIME_MULTIPLIERS,
+    ROUND_WEIGHTS,
+)
+
+
+# Highest point total covered by a table, the Emerald 1 badge
+MAX_TABLE_POINTS = 2400
+
+# Percentiles stored for every point total
+EXACT_PERCENTILES = (50, 90, 99)
+
+# Number of tables (one per set of weights and game time) kept in memory
+TABLE_CACHE_SIZE = 32
+
+
+# Expected games and minutes, and their percentiles, for every number of points remaining from 0 to max_points
+class ExactDistributionTable:
+    def __init__(self, round_weights, game_time, round_points=ROUND_POINTS,
+                 round_time_multipliers=ROUND_TIME_MULTIPLIERS, max_points=MAX_TABLE_POINTS,
+                 percentiles=EXACT_PERCENTILES):
+        self.game_time = game_time
+        self.max_points = max_points
+        self.percentiles = tuple(percentiles)
+
+        weights = np.asarray(round_weights, dtype=np.float64)
+        if weights.sum() <= 0 or weights.min() < 0:
+            raise ValueError("Round weights must not be negative and at least one must be above 0")
+
+        # Round types that can never happen don't take part in the distribution
+        used = weights > 0
+        probabilities = (weights / weights.sum())[used]
+        points = [int(p) for p, u in zip(round_points, used) if u]
+        slots = [int(m) for m, u in zip(round_time_multipliers, used) if u]
+        if min(points) <= 0:
+            raise ValueError("Every round type must award at least 1 point")
+
+        # Shape (max_points + 1,) and (max_points + 1, len(percentiles))
+        self.mean_games, self.games_percentiles, self.mean_minutes, self.minutes_percentiles = _fill_table(
+            probabilities, points, slots, max_points, self.percentiles
+        )
+        self.mean_minutes *= game_time
+        self.minutes_percentiles *= game_time
+
+    # Look up the distribution for one player, points already past the goal need no games
+    def query(self, current_points, goal_points):
+        r = self._points_remaining(goal_points - current_points)
+        return {
+            "points_remaining": goal_points - current_points,
+            "mean_games": float(self.mean_games[r]),
+            "mean_minutes": float(self.mean_minutes[r]),
+            "games_percentiles": dict(zip(self.percentiles, self.games_percentiles[r].tolist())),
+            "minutes_percentiles": dict(zip(self.percentiles, self.minutes_percentiles[r].tolist())),
+        }
+
+    # Look up the distribution for arrays of players, returns the same keys as query with array values
+    def query_batch(self, current_points, goal_points):
+        points_remaining = np.asarray(goal_points) - np.asarray(current_points)
+        r = self._points_remaining(points_remaining)
+        return {
+            "points_remaining": points_remaining,
+            "mean_games": self.mean_games[r],
+            "mean_minutes": self.mean_minutes[r],
+            "games_percentiles": self.games_percentiles[r],
+            "minutes_percentiles": self.minutes_percentiles[r],
+        }
+
+    def _points_remaining(self, points_remaining):
+        if np.max(points_remaining) > self.max_points:
+            raise ValueError(f"Points remaining must not be above {self.max_points}")
+        return np.maximum(points_remaining, 0)
+
+
+# Distribution of games (and time slots, in units of one game time) needed for every point total
+# Reaching r points takes one more game than reaching r - points of that game's round type, so the distribution
+# for r is the weighted sum of earlier distributions shifted by one game (and by the round type's time multiplier)
+def _fill_table(probabilities, points, slots, max_points, percentiles):
+    max_games = math.ceil(max_points / min(points))
+    games_length = max_games + 1
+    slots_length = max_games * max(slots) + 1
+    quantiles = np.asarray(percentiles, dtype=np.float64) / 100
+
+    # Zero points (or less) remaining needs zero games
+    games_done = np.zeros(games_length)
+    slots_done = np.zeros(slots_length)
+    games_done[0] = 1
+    slots_done[0] = 1
+
+    # Only the last max(points) rows are needed to build the next one, so they are kept in a ring
+    window = max(points)
+    games_rows = np.zeros((window, games_length))
+    slots_rows = np.zeros((window, slots_length))
+
+    games_steps = np.arange(games_length)
+    slots_steps = np.arange(slots_length)
+
+    mean_games = np.zeros(max_points + 1)
+    mean_slots = np.zeros(max_points + 1)
+    games_percentiles = np.zeros((max_points + 1, len(quantiles)), dtype=np.int64)
+    slots_percentiles = np.zeros((max_points + 1, len(quantiles)), dtype=np.int64)
+
+    for r in range(1, max_points + 1):
+        games_row = np.zeros(games_length)
+        slots_row = np.zeros(slots_length)
+        for p, a, s in zip(probabilities, points, slots):
+            if r <= a:
+                games_previous, slots_previous = games_done, slots_done
+            else:
+                games_previous, slots_previous = games_rows[(r - a) % window], slots_rows[(r - a) % window]
+            games_row[1:] += p * games_previous[:-1]
+            slots_row[s:] += p * slots_previous[:-s]
+        games_rows[r % window] = games_row
+        slots_rows[r % window] = slots_row
+
+        mean_games[r] = games_row @ games_steps
+        mean_slots[r] = slots_row @ slots_steps
+        games_percentiles[r] = np.searchsorted(np.cumsum(games_row), quantiles - 1e-12)
+        slots_percentiles[r] = np.searchsorted(np.cumsum(slots_row), quantiles - 1e-12)
+
+    return mean_games, games_percentiles, mean_slots, slots_percentiles
+
+
+# Build (or reuse) the table for a set of weights and game time
+# Arguments must be hashable, see exact_distribution for a helper that accepts lists
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _cached_table(round_weights, game_time, round_points, round_time_multipliers, max_points):
+    return ExactDistributionTable(round_weights, game_time, round_points, round_time_multipliers, max_points)
+
+
+# Memoized table lookup, building a table once per set of weights and game time, then answering each query instantly
+def exact_distribution(round_weights=ROUND_WEIGHTS, game_time=BASE_GAME_TIME + ADDITIONAL_GAME_TIME,
+                       round_points=ROUND_POINTS, round_time_multipliers=ROUND_TIME_MULTIPLIERS,
+                       max_points=MAX_TABLE_POINTS):
+    return _cached_table(
+        tuple(float(w) for w in round_weights),
+        int(game_time),
+        tuple(int(p) for p in round_points),
+        tuple(int(m) for m in round_time_multipliers),
+        int(max_points),
+    )
+
+
+# Query the memoized table in one call, used to run lookups in a worker process (which keeps its own table cache)
+def query_exact_distribution(current_points, goal_points, round_weights=ROUND_WEIGHTS,
+                             game_time=BASE_GAME_TIME + ADDITIONAL_GAME_TIME, round_points=ROUND_POINTS,
+                             round_time_multipliers=ROUND_TIME_MULTIPLIERS, max_points=MAX_TABLE_POINTS):
+    table = exact_distribution(round_weights, game_time, round_points, round_time_multipliers, max_points)
+    return table.query(current_points, goal_points)
@@ -0,0 +1,88 @@
+# Default world tour data shared by the engine, the window, and the bulk modes
+# Kept free of NumPy, so the window can draw its first frame before the engine (and NumPy) is imported
+
+from datetime import date
+
+
+# --- Default World Tour Data ---
+# Every per-round sequence below is ordered the same way as the rows of the games table:
+# round one, round two, lose final round, win final round, win quick play, second place quick play, lose quick play
+
+# Points awarded for each round in world tour, followed by the world tour points awarded for the quickplay modes
+ROUND_POINTS = (2, 6, 14, 25, 4, 3, 2)
+
+# Number of games played to reach each round type, multiplied by the game time to get the time spent on that round type
+ROUND_TIME_MULTIPLIERS = (1, 2, 3, 3, 1, 1, 1)
+
+# Default percent chance of getting each round type (total 100%)
+ROUND_WEIGHTS = (25, 20, 10, 5, 15, 5, 20)
+
+# Estimated time each game will take, the additional time covers queue, loading, and transition time between matches
+BASE_GAME_TIME = 10
+ADDITIONAL_GAME_TIME = 3
+
+# Largest point values taken from players (current points and goals), far below where the int64 results of the
+# engine would overflow
+MAX_POINTS = 10 ** 9
+
+# Names used for the round types in attribute names and in the columns of batch files
+ROUND_NAMES = (
+    "round_one",
+    "round_two",
+    "lose_final_round",
+    "win_final_round",
+    "win_qp",
+    "second_place_qp",
+    "lose_qp",
+)
+
+# Columns of the round weights in batch files, and of the rows written by the batch command (and window exports)
+WEIGHT_COLUMNS = tuple(f"{name}_weight" for name in ROUND_NAMES)
+
+BATCH_OUTPUT_COLUMNS = (
+    ("player", "current_points", "goal_points", "points_remaining")
+    + tuple(f"{name}_games" for name in ROUND_NAMES)
+    + ("weighted_playtime", "days_remaining", "daily_points", "max_daily_playtime", "weighted_daily_playtime")
+)
+
+# Labels for rows in the world tour games table
+ROW_LABELS = (
+    "Round one",
+    "Round two",
+    "Lose final round",
+    "Win final round",
+    "Win Quick Play",
+    "Second Place Quick Play",
+    "Lose Quick Play",
+)
+
+# The different badges in world tour
+WORLD_TOUR_BADGE_OPTIONS = (
+    ("Bronze 4", 25),
+    ("Bronze 3", 50),
+    ("Bronze 2", 75),
+    ("Bronze 1", 100),
+    ("Silver 4", 150),
+    ("Silver 3", 200),
+    ("Silver 2", 250),
+    ("Silver 1", 300),
+    ("Gold 4", 375),
+    ("Gold 3", 450),
+    ("Gold 2", 525),
+    ("Gold 1", 600),
+    ("Platinum 4", 700),
+    ("Platinum 3", 800),
+    ("Platinum 2", 900),
+    ("Platinum 1", 1000),
+    ("Diamond 4", 1150),
+    ("Diamond 3", 1300),
+    ("Diamond 2", 1450),
+    ("Diamond 1", 1600),
+    ("Emerald 4", 1800),
+    ("Emerald 3", 2000),
+    ("Emerald 2", 2200),
+    ("Emerald 1", 2400),
+)
+
+# Last day of the current season
+SEASON_END_DATE = date(2026, 3, 26)
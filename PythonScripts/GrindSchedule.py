@@ -0,0 +1,218 @@
+# Day by day plan for the grind to the goal, from today until the season ends
+# Each day has the minutes available on its weekday (none on blackout dates), and the play time still needed (the
+# estimated play time from the engine) is spread over the days in the chosen shape: even, front loaded (more play
+# early on) or back loaded. A day that can't fit its share is filled up and the rest goes to the other days.
+#
+# Every day gets min(available minutes, level x shape weight), and the level that adds up to the play time needed is
+# found from the days sorted by the level they fill up at, for many players at once. When a new point total is entered
+# only the days from then on are planned again, the earlier days keep their plan
+#
+# Days run from today up to the day before the season end date, like the days left in the rest of the calculator, and
+# on the last day of the season (or after it) today is the only day left
+
+from datetime import timedelta
+
+import numpy as np
+
+from CalculationEngine import calculate_batch
+from GameConstants import (
+    ADDITIONAL_GAME_TIME,
+    BASE_GAME_TIME,
+    ROUND_POINTS,
+    ROUND_TIME_MULTIPLIERS,
+    ROUND_WEIGHTS,
+)
+
+
+LOADINGS = ("even", "front", "back")
+
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+# Minutes available on each weekday when none are given, the whole day
+FULL_DAY_MINUTES = 24 * 60
+
+SCHEDULE_COLUMNS = (
+    "date", "weekday", "available_minutes", "planned_minutes", "planned_points", "target_points", "blackout",
+)
+
+
+# --- Planning ---
+# Weight of each day in the plan's shape, days is the number of days in the plan
+def loading_weights(days, loading="even"):
+    if loading == "even":
+        return np.ones(days)
+    if loading == "front":
+        return np.arange(days, 0, -1, dtype=np.float64)
+    if loading == "back":
+        return np.arange(1, days + 1, dtype=np.float64)
+    raise ValueError(f"Loading must be one of {', '.join(LOADINGS)}")
+
+
+# Minutes to play on each day, shape (players, days), for the minutes_needed of each player (a number or an array)
+# Days are filled in the shape of weights without going over their capacity, a player needing more than the days
+# can hold gets every day filled up
+def fill_minutes(capacity, weights, minutes_needed):
+    minutes_needed = np.atleast_1d(np.asarray(minutes_needed, dtype=np.float64))
+    usable = (capacity > 0) & (weights > 0)
+    capacity = np.where(usable, capacity, 0.0)
+    weights = np.where(usable, weights, 0.0)
+    if not usable.any():
+        return np.zeros((len(minutes_needed), len(capacity)))
+
+    # Level at which each day is full, days that can't be used are full from the start
+    full_at = np.where(usable, capacity / np.where(usable, weights, 1.0), 0.0)
+    order = np.argsort(full_at, kind="stable")
+    levels = full_at[order]
+    full_minutes = np.cumsum(capacity[order])
+    open_weight = weights.sum() - np.cumsum(weights[order])
+    # Minutes planned when the level reaches each day's full level
+    totals = full_minutes + levels * open_weight
+
+    # Between two of those levels the days already full stay full, and the rest share by weight
+    k = np.searchsorted(totals, minutes_needed)
+    full_before = np.concatenate(([0.0], full_minutes))[k]
+    weight_after = np.concatenate(([weights.sum()], open_weight))[k]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        level = np.where(weight_after > 0, (minutes_needed - full_before) / weight_after, levels[-1])
+    level = np.clip(level, 0.0, levels[-1])
+
+    return np.minimum(capacity, level[:, None] * weights)
+
+
+# Estimated play time (minutes) to get from current_points to goal_points, 0 once the goal is reached
+def playtime_needed(current_points, goal_points, game_time, round_weights, round_points, round_time_multipliers):
+    result = calculate_batch(
+        current_points, goal_points, game_time, 1, round_points, round_time_multipliers, round_weights
+    )
+    return np.maximum(result.weighted_playtime, 0.0)
+
+
+# --- Schedule ---
+class GrindSchedule:
+    # available is the minutes free on each weekday (Monday first, or one number for every day), blackouts are dates
+    # with no play at all
+    def __init__(self, current_points, goal_points, today, season_end_date, available=None, blackouts=(),
+                 loading="even", game_time=BASE_GAME_TIME + ADDITIONAL_GAME_TIME, round_weights=ROUND_WEIGHTS,
+                 round_points=ROUND_POINTS, round_time_multipliers=ROUND_TIME_MULTIPLIERS):
+        if sum(round_weights) <= 0:
+            raise ValueError("At least one round weight must be above 0")
+        available = [FULL_DAY_MINUTES] if available is None else list(available)
+        if len(available) == 1:
+            available *= 7
+        if len(available) != 7 or min(available) < 0:
+            raise ValueError("Available minutes need one value for every day, or one for each weekday")
+
+        self.start = today
+        self.goal_points = goal_points
+        self.engine_arguments = (game_time, round_weights, round_points, round_time_multipliers)
+        days = max((season_end_date - today).days, 1)
+
+        weekdays = (today.weekday() + np.arange(days)) % 7
+        self.weekdays = weekdays
+        self.capacity = np.asarray(available, dtype=np.float64)[weekdays]
+        self.blackout = np.zeros(days, dtype=bool)
+        for blackout in blackouts:
+            day = (blackout - today).days
+            if 0 <= day < days:
+                self.blackout[day] = True
+        self.capacity[self.blackout] = 0
+        self.weights = loading_weights(days, loading)
+
+        self.minutes = np.zeros(days)
+        # Points earned on each day, and the point total to have at the end of each day
+        self.points = np.zeros(days, dtype=np.int64)
+        self.target_points = np.zeros(days, dtype=np.int64)
+        self.replan(current_points, today)
+
+    def __len__(self):
+        return len(self.minutes)
+
+    @property
+    def dates(self):
+        return [self.start + timedelta(days=day) for day in range(len(self))]
+
+    # Plan the days from when on again for a new point total, the earlier days keep their plan
+    # Returns the index of the first day planned again
+    def replan(self, current_points, when):
+        first = min(max((when - self.start).days, 0), len(self) - 1)
+        points_remaining = max(self.goal_points - current_points, 0)
+        minutes_needed = playtime_needed(current_points, self.goal_points, *self.engine_arguments)
+
+        minutes = fill_minutes(self.capacity[first:], self.weights[first:], minutes_needed)[0]
+        # The points are spread like the minutes, and the totals are rounded so they add up to the points remaining
+        planned = float(minutes_needed[0])
+        share = np.cumsum(minutes) / planned if planned > 0 else np.zeros(len(minutes))
+        earned = np.minimum(np.rint(share * points_remaining), points_remaining).astype(np.int64)
+
+        self.minutes[first:] = minutes
+        self.points[first:] = np.diff(earned, prepend=0)
+        self.target_points[first:] = current_points + earned
+        return first
+
+    # Points still missing at the end of the season with this availability, 0 when the plan reaches the goal
+    @property
+    def shortfall(self):
+        return max(self.goal_points - int(self.target_points[-1]), 0)
+
+    # Plan of one day as (minutes, points), e.g. for today
+    def day(self, when):
+        day = (when - self.start).days
+        if not 0 <= day < len(self):
+            return 0.0, 0
+        return float(self.minutes[day]), int(self.points[day])
+
+    # One row per day, matching SCHEDULE_COLUMNS
+    def rows(self):
+        columns = (
+            [date.isoformat() for date in self.dates],
+            [WEEKDAY_NAMES[weekday] for weekday in self.weekdays.tolist()],
+            self.capacity.tolist(),
+            np.round(self.minutes, 1).tolist(),
+            self.points.tolist(),
+            self.target_points.tolist(),
+            self.blackout.tolist(),
+        )
+        return zip(*columns)
+
+    # Calendar table with a row per week, showing the minutes to play each day ("off" on blackout dates)
+    def calendar_text(self):
+        lines = ["Week of     " + "".join(f"{name:>8}" for name in WEEKDAY_NAMES) + "  Points"]
+        first_monday = self.start - timedelta(days=self.start.weekday())
+        offset = self.start.weekday()
+        cells = [""] * offset + [
+            "off" if blackout else f"{minutes:.0f}m"
+            for minutes, blackout in zip(self.minutes.tolist(), self.blackout.tolist())
+        ]
+        points = [0] * offset + self.points.tolist()
+        for week in range(0, len(cells), 7):
+            monday = first_monday + timedelta(days=week)
+            row = "".join(f"{cell:>8}" for cell in cells[week:week + 7])
+            lines.append(f"{monday.isoformat()}  {row:<56}  {sum(points[week:week + 7]):>6}")
+        return "\n".join(lines)
+
+    # iCalendar file with an all-day event for every day with play planned
+    def ics_text(self, title="World Tour"):
+        lines = [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//World Tour Calculator//Grind Schedule//EN",
+            "CALSCALE:GREGORIAN",
+        ]
+        stamp = self.start.strftime("%Y%m%dT000000Z")
+        for date, minutes, points, target in zip(
+            self.dates, self.minutes.tolist(), self.points.tolist(), self.target_points.tolist()
+        ):
+            if minutes <= 0:
+                continue
+            lines += [
+                "BEGIN:VEVENT",
+                f"UID:{date.strftime('%Y%m%d')}-{self.goal_points}@worldtourcalculator",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART;VALUE=DATE:{date.strftime('%Y%m%d')}",
+                f"DTEND;VALUE=DATE:{(date + timedelta(days=1)).strftime('%Y%m%d')}",
+                f"SUMMARY:{title}: play {minutes:.0f} minutes ({points} points)",
+                f"DESCRIPTION:Reach {target} points by the end of the day",
+                "END:VEVENT",
+            ]
+        lines.append("END:VCALENDAR")
+        return "\r\n".join(lines) + "\r\n"
@@ -0,0 +1,184 @@
+# Optional timings and counters for the phases of a calculation, to see where time goes on slow machines and servers
+# Instrumentation is off unless enable() is called (or WORLDTOUR_INSTRUMENT=1 is set), and while it is off phase(),
+# count() and observe() return straight away, so the hooks can stay in the hot paths
+#
+#   with phase("engine.game_counts"):   time a block, into a histogram of seconds
+#   count("server.requests")            add to a counter
+#   observe("server.batch_size", 12)    add a value to a histogram
+#
+# The registry can be dumped as JSON (to_dict), or as Prometheus text (prometheus_text) for the server's /metrics
+
+from bisect import bisect_left
+from contextlib import nullcontext
+import os
+import re
+import threading
+import time
+
+
+# Upper bounds of the histogram buckets, timings are in seconds so these cover 1 microsecond to 10 seconds
+DEFAULT_BUCKETS = tuple(scale * 10.0 ** exponent for exponent in range(-6, 1) for scale in (1, 2.5, 5)) + (10.0,)
+
+# Buckets for counts like batch sizes
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_NOT_TIMED = nullcontext()
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # One count per bucket, plus one for values above the last bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    # Estimate of the q-th percentile from the buckets (the upper bound of the bucket it falls in)
+    def percentile(self, q):
+        if self.count == 0:
+            return None
+        target = self.count * q / 100
+        running = 0
+        for bound, bucket_count in zip(self.buckets + (self.max,), self.counts):
+            running += bucket_count
+            if running >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "unit": "seconds" if self.buckets == DEFAULT_BUCKETS else "count",
+            "buckets": dict(zip([f"{bound:g}" for bound in self.buckets] + ["+Inf"], self.counts)),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+        # Phases can be timed from worker threads (e.g. background jobs)
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {name: self.histograms[name].to_dict() for name in sorted(self.histograms)},
+            }
+
+    # Prometheus text exposition format, names get the prefix and dots become underscores
+    def prometheus_text(self, prefix="worldtour_"):
+        lines = []
+        with self.lock:
+            for name in sorted(self.counters):
+                metric = _metric_name(prefix, name) + "_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {self.counters[name]}")
+            for name in sorted(self.histograms):
+                histogram = self.histograms[name]
+                metric = _metric_name(prefix, name)
+                lines.append(f"# TYPE {metric} histogram")
+                running = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    running += bucket_count
+                    lines.append(f'{metric}_bucket{{le="{bound:g}"}} {running}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum {histogram.sum:.9g}")
+                lines.append(f"{metric}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    # Short text summary, one line per metric, for the debug panel
+    def summary_text(self):
+        values = self.to_dict()
+        lines = [f"{name}: {value:,}" for name, value in values["counters"].items()]
+        for name, histogram in values["histograms"].items():
+            if histogram["unit"] == "seconds":
+                lines.append(
+                    f"{name}: {histogram['count']:,} x {histogram['mean'] * 1000:.3f} ms "
+                    f"(p99 {histogram['p99'] * 1000:.3f} ms, max {histogram['max'] * 1000:.3f} ms)"
+                )
+            else:
+                lines.append(
+                    f"{name}: {histogram['count']:,} values, mean {histogram['mean']:.2f}, max {histogram['max']:g}"
+                )
+        return "\n".join(lines) or "Nothing recorded yet"
+
+
+def _metric_name(prefix, name):
+    return prefix + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+# Times one block into the registry's histogram called name
+class _Phase:
+    __slots__ = ("registry", "name", "started")
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+# --- Module Level Registry ---
+REGISTRY = MetricsRegistry(os.environ.get("WORLDTOUR_INSTRUMENT") == "1")
+
+
+def enable(enabled=True):
+    REGISTRY.enabled = enabled
+
+
+def is_enabled():
+    return REGISTRY.enabled
+
+
+def phase(name):
+    if not REGISTRY.enabled:
+        return _NOT_TIMED
+    return _Phase(REGISTRY, name)
+
+
+def count(name, amount=1):
+    if REGISTRY.enabled:
+        REGISTRY.count(name, amount)
+
+
+def observe(name, value, buckets=DEFAULT_BUCKETS):
+    if REGISTRY.enabled:
+        REGISTRY.observe(name, value, buckets)
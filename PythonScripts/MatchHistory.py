@@ -0,0 +1,258 @@
+# Estimates the round weights and the additional game time from a match history export
+# The log (CSV with a header, or JSON Lines) is memory-mapped and read one line at a time, and only running totals are
+# kept, so memory use is the same for a gigabyte log as for a small one. The totals and the byte offset reached are
+# saved to a state file, so the next import only reads the matches added since
+#
+# Each row is one match. The outcome comes from an "outcome" column (a round name like "win_qp", or a table label like
+# "Win Quick Play"), or from these columns:
+#   mode            "World Tour" / "wt" or "Quick Play" / "qp"
+#   rounds_played   world tour, rounds reached (1, 2, or 3 for the final round)
+#   won             world tour, whether the final round was won (true/false, yes/no, 1/0)
+#   placement       quick play, 1 for a win, 2 for second place, anything else is a loss
+# Time spent per match comes from "started_at" (ISO date and time, the time until the next match in the same session
+# is the full time of the match including queueing and loading) or "duration_minutes" when there is no next match
+#
+# Rows must be in the order they were played. CSV fields can't contain line breaks
+
+import csv
+from datetime import datetime
+import json
+import math
+import mmap
+import os
+
+from GameConstants import BASE_GAME_TIME, ROUND_NAMES, ROUND_TIME_MULTIPLIERS, ROW_LABELS
+
+
+# A gap longer than this (minutes) between the starts of two matches ends a session, it isn't counted as play time
+SESSION_BREAK_MINUTES = 60
+
+# z value for the 95% confidence intervals
+CONFIDENCE_Z = 1.96
+
+_OUTCOMES = {name: i for i, name in enumerate(ROUND_NAMES)}
+_OUTCOMES.update({label.lower().replace(" ", "_"): i for i, label in enumerate(ROW_LABELS)})
+_TRUE_VALUES = ("true", "yes", "y", "1", "win", "won")
+
+
+# --- Classifying Matches ---
+def _normalize(value):
+    return str(value).strip().lower().replace(" ", "_").replace("-", "_")
+
+
+# Index of the round type (in ROUND_NAMES order) a match counts as, None when the row can't be classified
+def classify_match(record):
+    outcome = record.get("outcome")
+    if outcome:
+        return _OUTCOMES.get(_normalize(outcome))
+
+    mode = _normalize(record.get("mode", ""))
+    won = _normalize(record.get("won", "")) in _TRUE_VALUES
+    try:
+        if mode in ("world_tour", "wt", "worldtour"):
+            rounds_played = int(record.get("rounds_played"))
+            if rounds_played <= 1:
+                return 0
+            if rounds_played == 2:
+                return 1
+            return 3 if won else 2
+        if mode in ("quick_play", "qp", "quickplay"):
+            placement = record.get("placement")
+            if placement in (None, ""):
+                return 4 if won else 6
+            return {1: 4, 2: 5}.get(int(placement), 6)
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+# --- Running Totals ---
+# Count, mean and sum of squared differences of a stream of values (Welford's method)
+class RunningStats:
+    def __init__(self, count=0, mean=0.0, squares=0.0):
+        self.count = count
+        self.mean = mean
+        self.squares = squares
+
+    def add(self, value):
+        self.count += 1
+        difference = value - self.mean
+        self.mean += difference / self.count
+        self.squares += difference * (value - self.mean)
+
+    @property
+    def standard_deviation(self):
+        return math.sqrt(self.squares / (self.count - 1)) if self.count > 1 else 0.0
+
+    # 95% confidence interval of the mean, None until there are two values
+    @property
+    def interval(self):
+        if self.count < 2:
+            return None
+        margin = CONFIDENCE_Z * self.standard_deviation / math.sqrt(self.count)
+        return self.mean - margin, self.mean + margin
+
+    def values(self):
+        return [self.count, self.mean, self.squares]
+
+
+# 95% Wilson score interval of a proportion
+def wilson_interval(successes, total):
+    if total == 0:
+        return 0.0, 1.0
+    proportion = successes / total
+    z2 = CONFIDENCE_Z * CONFIDENCE_Z
+    centre = (proportion + z2 / (2 * total)) / (1 + z2 / total)
+    spread = math.sqrt(proportion * (1 - proportion) / total + z2 / (4 * total * total))
+    margin = CONFIDENCE_Z * spread / (1 + z2 / total)
+    return max(centre - margin, 0.0), min(centre + margin, 1.0)
+
+
+class MatchStatistics:
+    def __init__(self, offset=0, header=None, counts=None, minutes=None, additional=None, previous=None,
+                 skipped=0):
+        # Byte offset in the log up to which matches have been counted, and the CSV header for resuming
+        self.offset = offset
+        self.header = header
+        self.counts = counts or [0] * len(ROUND_NAMES)
+        # Minutes spent per match, for each round type
+        self.minutes = [RunningStats(*values) for values in minutes] if minutes else [
+            RunningStats() for _ in ROUND_NAMES
+        ]
+        # Minutes per round beyond the base game time
+        self.additional = RunningStats(*additional) if additional else RunningStats()
+        # (round type, start minute, duration) of the last match, its time is known once the next match starts
+        self.previous = previous
+        self.skipped = skipped
+
+    @property
+    def matches(self):
+        return sum(self.counts)
+
+    def _add_time(self, outcome, minutes):
+        self.minutes[outcome].add(minutes)
+        self.additional.add(minutes / ROUND_TIME_MULTIPLIERS[outcome] - BASE_GAME_TIME)
+
+    def add_match(self, outcome, started=None, duration=None):
+        self.counts[outcome] += 1
+
+        if self.previous is not None:
+            previous_outcome, previous_start, previous_duration = self.previous
+            gap = started - previous_start if started is not None and previous_start is not None else None
+            if gap is not None and 0 < gap <= SESSION_BREAK_MINUTES:
+                self._add_time(previous_outcome, gap)
+            elif previous_duration is not None:
+                self._add_time(previous_outcome, previous_duration)
+            self.previous = None
+
+        if started is not None:
+            self.previous = (outcome, started, duration)
+        elif duration is not None:
+            self._add_time(outcome, duration)
+
+    # Round weights (percent), their 95% intervals, and the additional game time (minutes) with its interval
+    def estimate(self):
+        total = self.matches
+        weights = [count / total * 100 if total else 0.0 for count in self.counts]
+        intervals = [tuple(bound * 100 for bound in wilson_interval(count, total)) for count in self.counts]
+        return {
+            "matches": total,
+            "skipped": self.skipped,
+            "round_weights": dict(zip(ROUND_NAMES, weights)),
+            "round_weight_intervals": dict(zip(ROUND_NAMES, intervals)),
+            "minutes_per_match": {
+                name: stats.mean if stats.count else None for name, stats in zip(ROUND_NAMES, self.minutes)
+            },
+            "additional_game_time": self.additional.mean if self.additional.count else None,
+            "additional_game_time_interval": self.additional.interval,
+        }
+
+    def to_dict(self):
+        return {
+            "offset": self.offset,
+            "header": self.header,
+            "counts": self.counts,
+            "minutes": [stats.values() for stats in self.minutes],
+            "additional": self.additional.values(),
+            "previous": list(self.previous) if self.previous else None,
+            "skipped": self.skipped,
+        }
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(
+            values["offset"], values["header"], values["counts"], values["minutes"], values["additional"],
+            tuple(values["previous"]) if values["previous"] else None, values["skipped"],
+        )
+
+    def save(self, path):
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as file:
+            return cls.from_dict(json.load(file))
+
+
+# --- Reading the Log ---
+# Complete lines of a file from a byte offset, as (line, offset after it) pairs
+# A last line without a line break may still be being written, so it is left for the next import
+def read_lines(path, offset=0):
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if offset > size:
+            raise ValueError(f"{path} is shorter than the saved offset, it isn't the log the state file was made from")
+        if size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            position = offset
+            while True:
+                end = buffer.find(b"\n", position)
+                if end < 0:
+                    return
+                yield buffer[position:end].rstrip(b"\r"), end + 1
+                position = end + 1
+
+
+def _minutes_since_epoch(value):
+    if value in (None, ""):
+        return None
+    return datetime.fromisoformat(str(value)).timestamp() / 60
+
+
+def _duration(record):
+    value = record.get("duration_minutes")
+    return float(value) if value not in (None, "") else None
+
+
+# Count the matches in a log from where statistics left off, input_format is "csv" or "jsonl"
+def ingest_match_history(path, input_format, statistics=None):
+    statistics = statistics or MatchStatistics()
+
+    for line, offset in read_lines(path, statistics.offset):
+        statistics.offset = offset
+        if not line.strip():
+            continue
+        text = line.decode("utf-8")
+
+        if input_format == "jsonl":
+            record = json.loads(text)
+        elif statistics.header is None:
+            statistics.header = [_normalize(name) for name in next(csv.reader([text]))]
+            continue
+        else:
+            record = dict(zip(statistics.header, next(csv.reader([text]))))
+
+        outcome = classify_match(record)
+        if outcome is None:
+            statistics.skipped += 1
+            continue
+        try:
+            statistics.add_match(outcome, _minutes_since_epoch(record.get("started_at")), _duration(record))
+        except ValueError:
+            statistics.skipped += 1
+
+    return statistics
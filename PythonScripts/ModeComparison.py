@@ -0,0 +1,178 @@
+# Compares every game mode that earns points towards a badge ladder, ranked by points per minute
+# Each mode has its own outcomes, point awards, game length and outcome weights. The modes are kept in a mode table,
+# a struct of arrays with one row per mode (padded with zero weight outcomes to the longest mode), so all of them are
+# worked out in one pass and a longer table only adds rows to the arrays, never a code path per mode
+#
+# A world tour outcome is a run of up to three rounds, its time multiplier is the number of games it takes. Every
+# other mode's outcomes are one game. Games last the mode's own game time (e.g. 6 minutes for Blast Off) when the data
+# file gives one, otherwise the base game time, plus the additional time between games
+
+import numpy as np
+
+from GameConstants import ADDITIONAL_GAME_TIME, BASE_GAME_TIME, ROUND_TIME_MULTIPLIERS, ROUND_WEIGHTS
+from SeasonData import QUICK_PLAY_MODE, WORLD_TOUR_MODE, WORLD_TOUR_SOURCE
+
+
+# Data files whose modes earn points towards each badge ladder, a ladder not listed only counts its own file's modes
+LADDER_SOURCES = {
+    WORLD_TOUR_SOURCE: (WORLD_TOUR_SOURCE, QUICK_PLAY_MODE[0]),
+}
+
+# Modes listed in more than one data file, the copy is left out
+DUPLICATE_MODES = {("Season9", "World Tour (Cashout) Awarded point values")}
+
+# Names shown for the modes the rest of the calculator models, others are shown by their section name
+MODE_NAMES = {WORLD_TOUR_MODE: "World Tour", QUICK_PLAY_MODE: "Quick Play"}
+
+# Outcome weights and time multipliers of the modes the rest of the calculator models (the world tour rounds and the
+# quick play outcomes), other modes have equal weights and take one game per outcome
+DEFAULT_MODE_WEIGHTS = {WORLD_TOUR_MODE: ROUND_WEIGHTS[:4], QUICK_PLAY_MODE: ROUND_WEIGHTS[4:]}
+MODE_TIME_MULTIPLIERS = {WORLD_TOUR_MODE: ROUND_TIME_MULTIPLIERS[:4]}
+
+COMPARISON_COLUMNS = (
+    "rank", "mode", "source", "game_time", "points_per_game", "points_per_minute", "games_to_goal", "minutes_to_goal",
+    "daily_minutes",
+)
+
+
+class Mode:
+    __slots__ = ("name", "source", "outcomes", "points", "time_multipliers", "weights", "game_time")
+
+    def __init__(self, name, source, outcomes, points, time_multipliers=None, weights=None, game_time=BASE_GAME_TIME):
+        self.name = name
+        self.source = source
+        self.outcomes = tuple(outcomes)
+        self.points = tuple(points)
+        self.time_multipliers = tuple(time_multipliers or (1,) * len(self.points))
+        self.weights = tuple(weights or (1,) * len(self.points))
+        # Minutes per game, before the additional time between games
+        self.game_time = game_time
+
+
+# --- Mode Table ---
+class ModeTable:
+    def __init__(self, modes):
+        self.modes = list(modes)
+        if not self.modes:
+            raise ValueError("There are no modes to compare")
+
+        shape = (len(self.modes), max(len(mode.points) for mode in self.modes))
+        # Shape (modes, outcomes), padding outcomes have no weight
+        self.points = np.zeros(shape, dtype=np.float64)
+        self.time_multipliers = np.ones(shape, dtype=np.float64)
+        self.weights = np.zeros(shape, dtype=np.float64)
+        # Shape (modes,)
+        self.game_time = np.array([mode.game_time for mode in self.modes], dtype=np.float64)
+
+        for i, mode in enumerate(self.modes):
+            outcomes = len(mode.points)
+            self.points[i, :outcomes] = mode.points
+            self.time_multipliers[i, :outcomes] = mode.time_multipliers
+            self.set_weights(mode.name, mode.weights)
+
+    def __len__(self):
+        return len(self.modes)
+
+    @property
+    def names(self):
+        return [mode.name for mode in self.modes]
+
+    def index(self, name):
+        for i, mode in enumerate(self.modes):
+            if mode.name.lower() == name.strip().lower():
+                return i
+        raise ValueError(f"Unknown mode {name}, the modes are: {', '.join(self.names)}")
+
+    # Replace the outcome weights of one mode (in the data file's outcome order), they don't need to add up to 100
+    def set_weights(self, name, weights):
+        i = self.index(name)
+        mode = self.modes[i]
+        weights = [float(weight) for weight in weights]
+        if len(weights) != len(mode.points):
+            raise ValueError(
+                f"{mode.name} needs {len(mode.points)} weights, one for each of {', '.join(mode.outcomes)}"
+            )
+        if min(weights) < 0 or sum(weights) <= 0:
+            raise ValueError(f"The weights of {mode.name} must not be negative and at least one must be above 0")
+
+        mode.weights = tuple(weights)
+        self.weights[i] = 0
+        self.weights[i, :len(weights)] = np.asarray(weights) / sum(weights)
+
+
+# Mode table of every mode that earns points towards a badge ladder, from the season registry
+def mode_table(registry, ladder=WORLD_TOUR_SOURCE):
+    modes = []
+    for source in LADDER_SOURCES.get(ladder, (ladder,)):
+        for section, outcomes in registry.modes(source).items():
+            key = (source, section)
+            if key in DUPLICATE_MODES:
+                continue
+            modes.append(Mode(
+                MODE_NAMES.get(key, section),
+                source,
+                [label for label, _ in outcomes],
+                [points for _, points in outcomes],
+                MODE_TIME_MULTIPLIERS.get(key),
+                DEFAULT_MODE_WEIGHTS.get(key),
+                registry.game_time(source, section) or BASE_GAME_TIME,
+            ))
+    return ModeTable(modes)
+
+
+# --- Comparison ---
+# Every mode of a table worked out for the points left to the goal, arrays have one entry per mode in table order
+class ModeComparison:
+    def __init__(self, table, points_per_game, minutes_per_game, games_to_goal, days_remaining):
+        self.table = table
+        self.points_per_game = points_per_game
+        self.minutes_per_game = minutes_per_game
+        self.games_to_goal = games_to_goal
+        self.days_remaining = days_remaining
+
+    @property
+    def points_per_minute(self):
+        return self.points_per_game / self.minutes_per_game
+
+    @property
+    def minutes_to_goal(self):
+        return self.games_to_goal * self.minutes_per_game
+
+    # On the last day of the season (or after it) everything left has to be played today
+    @property
+    def daily_minutes(self):
+        return self.minutes_to_goal / max(self.days_remaining, 1)
+
+    # Indexes of the modes from the most points per minute to the least
+    @property
+    def ranking(self):
+        return np.argsort(-self.points_per_minute, kind="stable")
+
+    # One row per mode in ranking order, matching COMPARISON_COLUMNS
+    def rows(self):
+        points_per_minute = self.points_per_minute
+        minutes_to_goal = self.minutes_to_goal
+        daily_minutes = self.daily_minutes
+        for rank, i in enumerate(self.ranking.tolist(), 1):
+            mode = self.table.modes[i]
+            yield (
+                rank,
+                mode.name,
+                mode.source,
+                float(self.minutes_per_game[i]),
+                round(float(self.points_per_game[i]), 3),
+                round(float(points_per_minute[i]), 4),
+                int(self.games_to_goal[i]),
+                round(float(minutes_to_goal[i]), 2),
+                round(float(daily_minutes[i]), 2),
+            )
+
+
+# Expected points per game and games to the goal of every mode in one pass over the table
+# A goal that is already reached (points_remaining of 0 or less) needs no games
+def compare_modes(table, points_remaining, days_remaining, additional_game_time=ADDITIONAL_GAME_TIME):
+    games_per_outcome = (table.weights * table.time_multipliers).sum(axis=1)
+    points_per_game = (table.weights * table.points).sum(axis=1) / games_per_outcome
+    minutes_per_game = table.game_time + additional_game_time
+    games_to_goal = np.ceil(max(points_remaining, 0) / points_per_game)
+    return ModeComparison(table, points_per_game, minutes_per_game, games_to_goal, days_remaining)
@@ -0,0 +1,214 @@
+# Monte Carlo playtime simulator for the World Tour Calculator
+# Instead of a weighted average of "play only this round type" playtimes, every simulated grind plays random matches
+# (drawn using the round weights) until the goal points are reached
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from GameConstants import ROUND_POINTS, ROUND_TIME_MULTIPLIERS, ROUND_WEIGHTS
+
+
+# Number of simulated grinds used when none is given
+SIMULATION_TRAJECTORIES = 1_000_000
+
+# Trajectories simulated by one task, results only depend on the seed and not on how many workers are used
+SIMULATION_CHUNK_SIZE = 8192
+
+# Upper limit on the number of matches drawn at once for every active trajectory
+MAX_BLOCK_MATCHES = 1024
+
+# Match tables kept by each process, so a worker builds the table once per simulation instead of it being sent with
+# every chunk (it is 512 KB, and a simulation has over a hundred chunks)
+MATCH_TABLE_CACHE_SIZE = 8
+
+# Percentiles reported by default
+SIMULATION_PERCENTILES = (50, 90, 99)
+
+
+# Games and minutes needed by the simulated trajectories, stored as counts so results from workers can be merged
+class SimulationResult:
+    def __init__(self, games_counts, minutes_counts):
+        self.games_counts = games_counts
+        self.minutes_counts = minutes_counts
+
+    @property
+    def trajectories(self):
+        return int(self.games_counts.sum())
+
+    @property
+    def mean_games(self):
+        return _counts_mean(self.games_counts)
+
+    @property
+    def mean_minutes(self):
+        return _counts_mean(self.minutes_counts)
+
+    # Smallest number of games that covers at least q percent of the trajectories
+    def games_percentile(self, q):
+        return _counts_percentile(self.games_counts, q)
+
+    def minutes_percentile(self, q):
+        return _counts_percentile(self.minutes_counts, q)
+
+    # Combine with the result of another chunk
+    def merge(self, other):
+        return SimulationResult(
+            _add_counts(self.games_counts, other.games_counts),
+            _add_counts(self.minutes_counts, other.minutes_counts),
+        )
+
+    def summary(self, percentiles=SIMULATION_PERCENTILES):
+        return {
+            "trajectories": self.trajectories,
+            "mean_games": self.mean_games,
+            "mean_minutes": self.mean_minutes,
+            "games_percentiles": {q: self.games_percentile(q) for q in percentiles},
+            "minutes_percentiles": {q: self.minutes_percentile(q) for q in percentiles},
+        }
+
+
+# --- Count Helpers ---
+def _add_counts(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    total = a.copy()
+    total[:len(b)] += b
+    return total
+
+
+def _counts_mean(counts):
+    return float(np.dot(np.arange(len(counts)), counts) / counts.sum())
+
+
+def _counts_percentile(counts, q):
+    cdf = np.cumsum(counts)
+    return int(np.searchsorted(cdf, cdf[-1] * q / 100, side="left"))
+
+
+# --- Simulation ---
+# Each match is packed into one integer with the points in the high bits and the minutes in the low bits,
+# so a single running sum tracks both and comparing it against the goal only looks at the points
+_POINTS_SHIFT = 32
+
+# Random numbers are drawn 16 bits at a time and used as an index into a table of packed matches
+_TABLE_SIZE = 1 << 16
+
+
+# Spread the table slots over the round types in proportion to their weights
+# Each round type's chance is rounded to the nearest 1/65536, well below the sampling noise of a simulation
+def _match_table(round_weights, round_points, round_minutes):
+    weights = np.asarray(round_weights, dtype=np.float64)
+    if weights.sum() <= 0 or weights.min() < 0:
+        raise ValueError("Round weights must not be negative and at least one must be above 0")
+    exact = weights / weights.sum() * _TABLE_SIZE
+    slots = np.floor(exact).astype(np.int64)
+    leftover = _TABLE_SIZE - slots.sum()
+    slots[np.argsort(slots - exact, kind="stable")[:leftover]] += 1
+
+    packed = (np.asarray(round_points, dtype=np.int64) << _POINTS_SHIFT) | np.asarray(round_minutes, dtype=np.int64)
+    return np.repeat(packed, slots)
+
+
+# Build (or reuse) the match table, arguments must be hashable (see simulation_arguments)
+@lru_cache(maxsize=MATCH_TABLE_CACHE_SIZE)
+def _cached_match_table(round_weights, round_points, round_minutes):
+    table = _match_table(round_weights, round_points, round_minutes)
+    table.flags.writeable = False
+    return table
+
+
+# Simulate one chunk of trajectories, used as the unit of work for the process pool
+# Only the small round inputs are sent to the worker, which builds the match table from them
+def simulate_chunk(seed, trajectories, points_remaining, round_weights, round_points, round_minutes):
+    match_table = _cached_match_table(round_weights, round_points, round_minutes)
+    rng = np.random.default_rng(seed)
+    bit_generator = rng.bit_generator
+
+    games_needed = np.zeros(trajectories, dtype=np.int64)
+    minutes_needed = np.zeros(trajectories, dtype=np.int64)
+
+    if points_remaining > 0:
+        goal = np.full(trajectories, points_remaining << _POINTS_SHIFT, dtype=np.int64)
+        active = np.arange(trajectories)
+
+        # Draw enough matches in one block that most trajectories finish in it
+        mean_points = (match_table >> _POINTS_SHIFT).mean()
+        block = min(int(math.ceil(points_remaining / mean_points * 1.2)) + 8, MAX_BLOCK_MATCHES)
+        minutes_mask = (1 << _POINTS_SHIFT) - 1
+
+        while active.size:
+            draws = active.size * block
+            indexes = bit_generator.random_raw((draws + 3) // 4).view(np.uint16)[:draws]
+            totals = np.cumsum(match_table[indexes].reshape(active.size, block), axis=1)
+
+            hit = totals >= goal[active, None]
+            finished = hit[:, -1]
+            first = np.argmax(hit[finished], axis=1)
+
+            done = active[finished]
+            games_needed[done] += first + 1
+            minutes_needed[done] += totals[finished, first] & minutes_mask
+
+            # Trajectories that haven't reached the goal yet carry their progress into the next block
+            still_active = ~finished
+            active = active[still_active]
+            carried = totals[still_active, -1]
+            games_needed[active] += block
+            minutes_needed[active] += carried & minutes_mask
+            goal[active] -= carried & ~minutes_mask
+
+    return SimulationResult(np.bincount(games_needed), np.bincount(minutes_needed))
+
+
+# Split the requested trajectories into seeded chunks
+def simulation_chunks(trajectories, seed=None):
+    chunk_count = max(1, math.ceil(trajectories / SIMULATION_CHUNK_SIZE))
+    seeds = np.random.SeedSequence(seed).spawn(chunk_count)
+    sizes = [SIMULATION_CHUNK_SIZE] * (chunk_count - 1)
+    sizes.append(trajectories - SIMULATION_CHUNK_SIZE * (chunk_count - 1))
+    return list(zip(seeds, sizes))
+
+
+# Arguments for simulate_chunk that are shared by every chunk of a simulation, as hashable tuples
+# The match table is built here once as well, so bad weights raise ValueError before any chunk is sent
+def simulation_arguments(points_remaining, game_time, round_weights=ROUND_WEIGHTS, round_points=ROUND_POINTS,
+                         round_time_multipliers=ROUND_TIME_MULTIPLIERS):
+    if min(round_points) <= 0:
+        raise ValueError("Every round type must award at least 1 point")
+    round_weights = tuple(float(weight) for weight in round_weights)
+    round_points = tuple(int(points) for points in round_points)
+    round_minutes = tuple(int(game_time) * int(m) for m in round_time_multipliers)
+    _cached_match_table(round_weights, round_points, round_minutes)
+    return int(points_remaining), round_weights, round_points, round_minutes
+
+
+# Simulate the grind to the goal points
+# Chunks are spread over a process pool when workers is above 1 (or an executor is given)
+# The same seed always gives the same result, no matter how many workers are used
+def simulate_playtime(points_remaining, game_time, round_weights=ROUND_WEIGHTS, round_points=ROUND_POINTS,
+                      round_time_multipliers=ROUND_TIME_MULTIPLIERS, trajectories=SIMULATION_TRAJECTORIES, seed=None,
+                      workers=None, executor=None):
+    arguments = simulation_arguments(points_remaining, game_time, round_weights, round_points, round_time_multipliers)
+    chunks = simulation_chunks(trajectories, seed)
+    chunk_seeds = [chunk_seed for chunk_seed, _ in chunks]
+    chunk_sizes = [size for _, size in chunks]
+    repeated = [[argument] * len(chunks) for argument in arguments]
+
+    workers = workers or os.cpu_count() or 1
+
+    if executor is not None:
+        results = executor.map(simulate_chunk, chunk_seeds, chunk_sizes, *repeated)
+    elif len(chunks) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(simulate_chunk, chunk_seeds, chunk_sizes, *repeated))
+    else:
+        results = map(simulate_chunk, chunk_seeds, chunk_sizes, *repeated)
+
+    total = None
+    for result in results:
+        total = result if total is None else total.merge(result)
+    return total
@@ -0,0 +1,299 @@
+# Progress history, an append-only SQLite store of point snapshots per player and season
+# Next to every player's snapshots is a row of running totals (for a least squares fit of points against time) and an
+# exponentially weighted pace, both updated in place as each snapshot is added, so a forecast never reads old snapshots.
+# Forecasts stay instant however many seasons and players the store holds
+#
+# Times are stored in days (date ordinals with a fraction for the time of day), paces are in points per day. Paces only
+# use the last snapshot of each calendar day, a later snapshot on the same day replaces the day's points, so two saves
+# a few minutes apart don't set the pace
+
+from datetime import date, datetime, timedelta
+import math
+import os
+import sqlite3
+
+from SeasonData import DATA_DIRECTORY
+
+
+HISTORY_FILE_NAME = "progress_history.db"
+
+# Player name used by the calculator window
+DEFAULT_PLAYER = "me"
+
+# Days for the weight of an old pace to halve
+PACE_HALF_LIFE_DAYS = 7.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    player TEXT NOT NULL,
+    season TEXT NOT NULL,
+    day REAL NOT NULL,
+    points INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_by_player ON snapshots (player, season, day);
+CREATE TABLE IF NOT EXISTS pace (
+    player TEXT NOT NULL,
+    season TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    first_day REAL NOT NULL,
+    last_day REAL NOT NULL,
+    last_points INTEGER NOT NULL,
+    sum_t REAL NOT NULL,
+    sum_p REAL NOT NULL,
+    sum_tt REAL NOT NULL,
+    sum_tp REAL NOT NULL,
+    sum_pp REAL NOT NULL,
+    base_day REAL,
+    base_points INTEGER,
+    rates INTEGER NOT NULL,
+    ewma_rate REAL,
+    ewma_variance REAL NOT NULL,
+    PRIMARY KEY (player, season)
+);
+"""
+
+_PACE_COLUMNS = (
+    "count", "first_day", "last_day", "last_points", "sum_t", "sum_p", "sum_tt", "sum_tp", "sum_pp",
+    "base_day", "base_points", "rates", "ewma_rate", "ewma_variance",
+)
+
+
+def default_history_path():
+    return os.path.join(DATA_DIRECTORY, HISTORY_FILE_NAME)
+
+
+# Date or datetime as a day number
+def day_number(when):
+    if isinstance(when, datetime):
+        midnight = datetime.combine(when.date(), datetime.min.time(), when.tzinfo)
+        return when.toordinal() + (when - midnight).total_seconds() / 86400
+    return float(when.toordinal())
+
+
+# Chance a standard normal value is below x
+def _normal_cdf(x):
+    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+
+
+# Exponentially weighted pace and variance after a new daily rate over elapsed days, longer gaps count for more as
+# they cover more days of play
+def _ewma_step(ewma_rate, ewma_variance, rate, elapsed):
+    if ewma_rate is None:
+        return rate, 0.0
+    alpha = 1 - 0.5 ** (elapsed / PACE_HALF_LIFE_DAYS)
+    difference = rate - ewma_rate
+    return ewma_rate + alpha * difference, (1 - alpha) * (ewma_variance + alpha * difference * difference)
+
+
+# Running totals for one player and season, over the last snapshot of each calendar day. Times in the totals are
+# whole days since the first day, which keeps the sums small enough to not lose precision
+# The exponentially weighted pace holds the rates up to base_day, the last day before the latest one. The rate from
+# base_day to the latest day is only added on read, as a later snapshot on the latest day can still change it
+class PaceEstimate:
+    def __init__(self, count, first_day, last_day, last_points, sum_t, sum_p, sum_tt, sum_tp, sum_pp,
+                 base_day, base_points, rates, ewma_rate, ewma_variance):
+        self.count = count
+        self.first_day = first_day
+        self.last_day = last_day
+        self.last_points = last_points
+        self.sum_t = sum_t
+        self.sum_p = sum_p
+        self.sum_tt = sum_tt
+        self.sum_tp = sum_tp
+        self.sum_pp = sum_pp
+        self.base_day = base_day
+        self.base_points = base_points
+        self.rates = rates
+        self.ewma_rate = ewma_rate
+        self.ewma_variance = ewma_variance
+
+    @classmethod
+    def first(cls, day, points):
+        return cls(
+            1, float(math.floor(day)), day, points, 0.0, float(points), 0.0, 0.0, float(points) ** 2, None, None, 0,
+            None, 0.0,
+        )
+
+    def values(self):
+        return tuple(getattr(self, column) for column in _PACE_COLUMNS)
+
+    def _add_totals(self, t, points, sign=1):
+        self.count += sign
+        self.sum_t += sign * t
+        self.sum_p += sign * points
+        self.sum_tt += sign * t * t
+        self.sum_tp += sign * t * points
+        self.sum_pp += sign * points * points
+
+    # Add a snapshot, taken no earlier than the last one
+    def add(self, day, points):
+        if day < self.last_day:
+            raise ValueError("Snapshots must be added in time order")
+
+        calendar_day = math.floor(day)
+        last_calendar_day = math.floor(self.last_day)
+        if calendar_day == last_calendar_day:
+            # The day's points so far are replaced
+            self._add_totals(last_calendar_day - self.first_day, self.last_points, -1)
+        else:
+            # The latest day is over, its rate goes into the pace for good
+            if self.base_day is not None:
+                self.ewma_rate, self.ewma_variance = self._recent()
+                self.rates += 1
+            self.base_day = float(last_calendar_day)
+            self.base_points = self.last_points
+
+        self._add_totals(calendar_day - self.first_day, points)
+        self.last_day = day
+        self.last_points = points
+
+    # Exponentially weighted pace and variance including the latest day, (None, 0.0) until there are two days
+    def _recent(self):
+        if self.base_day is None:
+            return self.ewma_rate, self.ewma_variance
+        elapsed = math.floor(self.last_day) - self.base_day
+        rate = (self.last_points - self.base_points) / elapsed
+        return _ewma_step(self.ewma_rate, self.ewma_variance, rate, elapsed)
+
+    # Daily rates in the pace, one less than the days with progress saved
+    @property
+    def rate_count(self):
+        return self.rates + (self.base_day is not None)
+
+    # Least squares slope of points against time, None until there are two snapshots on different days
+    @property
+    def regression_rate(self):
+        spread = self.count * self.sum_tt - self.sum_t * self.sum_t
+        if spread <= 0:
+            return None
+        return (self.count * self.sum_tp - self.sum_t * self.sum_p) / spread
+
+    # Standard error of the regression slope, None until there are three snapshots
+    @property
+    def regression_rate_error(self):
+        rate = self.regression_rate
+        if rate is None or self.count < 3:
+            return None
+        s_tt = self.sum_tt - self.sum_t * self.sum_t / self.count
+        s_tp = self.sum_tp - self.sum_t * self.sum_p / self.count
+        s_pp = self.sum_pp - self.sum_p * self.sum_p / self.count
+        residual_variance = max(s_pp - rate * s_tp, 0.0) / (self.count - 2)
+        return math.sqrt(residual_variance / s_tt)
+
+    # Recent pace, None until progress is saved on two different days
+    @property
+    def pace(self):
+        return self._recent()[0]
+
+    # Completion date and chance of finishing before the season ends, as a dictionary with:
+    #   pace                  recent points per day (None when there aren't enough snapshots yet)
+    #   regression_pace       points per day over the whole history
+    #   points_remaining      from the last snapshot
+    #   completion_date       date the goal is reached at the recent pace (None if it never is)
+    #   chance_before_end     chance of reaching the goal before season_end (None until there are two daily rates, one
+    #                         rate has no spread), treating each day's points as independent with the spread of the
+    #                         recent daily paces
+    def forecast(self, goal_points, season_end, today=None):
+        today = today or date.today()
+        points_remaining = goal_points - self.last_points
+        last_date = date.fromordinal(int(self.last_day))
+        days_left = max((season_end - max(today, last_date)).days, 0)
+        pace, variance = self._recent()
+
+        if points_remaining <= 0:
+            completion_date, chance = last_date, 1.0
+        elif pace is None:
+            completion_date, chance = None, None
+        elif pace <= 0:
+            completion_date, chance = None, 0.0 if self.rate_count >= 2 else None
+        else:
+            completion_date = last_date + timedelta(days=math.ceil(points_remaining / pace))
+            expected = pace * days_left
+            spread = math.sqrt(variance * days_left)
+            if self.rate_count < 2:
+                chance = None
+            elif spread > 0:
+                chance = _normal_cdf((expected - points_remaining) / spread)
+            else:
+                chance = 1.0 if expected >= points_remaining else 0.0
+
+        return {
+            "pace": pace,
+            "regression_pace": self.regression_rate,
+            "points_remaining": points_remaining,
+            "completion_date": completion_date,
+            "chance_before_end": chance,
+        }
+
+
+class ProgressHistory:
+    def __init__(self, path=None):
+        self.path = path or default_history_path()
+        self.connection = sqlite3.connect(self.path)
+        self.connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def pace(self, player, season):
+        row = self.connection.execute(
+            f"SELECT {', '.join(_PACE_COLUMNS)} FROM pace WHERE player = ? AND season = ?", (player, season)
+        ).fetchone()
+        return PaceEstimate(*row) if row else None
+
+    def _record(self, player, season, day, points):
+        estimate = self.pace(player, season)
+        if estimate is None:
+            estimate = PaceEstimate.first(day, points)
+        else:
+            estimate.add(day, points)
+
+        self.connection.execute(
+            "INSERT INTO snapshots (player, season, day, points) VALUES (?, ?, ?, ?)", (player, season, day, points)
+        )
+        self.connection.execute(
+            f"INSERT OR REPLACE INTO pace (player, season, {', '.join(_PACE_COLUMNS)}) "
+            f"VALUES (?, ?, {', '.join('?' * len(_PACE_COLUMNS))})",
+            (player, season, *estimate.values()),
+        )
+        return estimate
+
+    # Add a snapshot of a player's points, season is any name for the season (e.g. its end date)
+    # Returns the updated pace. Raises ValueError if the snapshot is older than the player's last one
+    def record(self, player, points, season, when=None):
+        with self.connection:
+            return self._record(player, season, day_number(when or datetime.now()), int(points))
+
+    # Add many (player, points, when) snapshots in one transaction
+    def record_many(self, snapshots, season):
+        count = 0
+        with self.connection:
+            for player, points, when in snapshots:
+                self._record(player, season, day_number(when), int(points))
+                count += 1
+        return count
+
+    def forecast(self, player, season, goal_points, season_end, today=None):
+        estimate = self.pace(player, season)
+        if estimate is None:
+            return None
+        return estimate.forecast(goal_points, season_end, today)
+
+    # Snapshots of one player as (datetime, points) pairs, oldest first
+    def snapshots(self, player, season):
+        rows = self.connection.execute(
+            "SELECT day, points FROM snapshots WHERE player = ? AND season = ? ORDER BY day", (player, season)
+        )
+        return [
+            (datetime.fromordinal(int(day)) + timedelta(seconds=round(day % 1 * 86400)), points) for day, points in rows
+        ]
+
+    def players(self, season):
+        rows = self.connection.execute("SELECT player FROM pace WHERE season = ? ORDER BY player", (season,))
+        return [player for (player,) in rows]
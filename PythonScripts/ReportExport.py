@@ -0,0 +1,257 @@
+# Writes rows of results (a single calculation, a batch, a sweep, or simulated percentiles) to a report file
+# Formats are CSV, JSON Lines, a self-contained HTML summary, and a columnar binary file. Rows are taken from any
+# iterable in chunks and each chunk is written with one write, so a million row export never sits in memory at once
+#
+# Reports only depend on their rows (no timestamps, hostnames or random ids), so the same inputs give the same bytes
+# and reports from two seasons can be diffed
+#
+# Columnar files (.wtc) hold each chunk column by column, all numbers little endian:
+#   b"WTCOLS\x00\x01"                      magic and version
+#   u32 length, JSON header                {"columns": [...], "title": ..., "types": [...]}
+#   for each chunk: u32 rows, then each column in order
+#     int64 / float64                      rows x 8 bytes
+#     bool                                 rows x 1 byte
+#     str                                  rows x u32 byte lengths, then the UTF-8 text
+#   u32 0                                  end of the file
+# Column types come from the first chunk (str when there are no rows), a later value that doesn't fit its column's
+# type raises ValueError, and export_file leaves no file behind
+
+import csv
+import html
+import io
+from itertools import islice
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+
+EXPORT_FORMATS = ("csv", "jsonl", "html", "columnar")
+
+# Formats picked from the file extension, anything else is CSV
+EXTENSION_FORMATS = {
+    ".jsonl": "jsonl", ".json": "jsonl", ".ndjson": "jsonl", ".html": "html", ".htm": "html", ".wtc": "columnar",
+}
+
+BINARY_FORMATS = ("columnar",)
+
+# Rows taken from the input and written at once
+EXPORT_CHUNK_SIZE = 16384
+
+# Rows shown in the table of an HTML summary, the summary itself covers every row
+HTML_PREVIEW_ROWS = 1000
+
+DEFAULT_TITLE = "World Tour Calculator"
+
+COLUMNAR_MAGIC = b"WTCOLS\x00\x01"
+
+_COLUMNAR_DTYPES = {"int64": "<i8", "float64": "<f8", "bool": "u1"}
+
+
+# Yield lists of up to chunk_size items
+def chunked(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# --- Files ---
+# Format from the option given, or from the file extension
+def export_format(path, chosen_format=None):
+    if chosen_format:
+        return chosen_format
+    return EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower(), "csv")
+
+
+# Open the file a report is written to, - is stdout
+def open_export(path, output_format="csv"):
+    binary = output_format in BINARY_FORMATS
+    if path == "-":
+        if binary:
+            # Text already printed has to come out before the binary report
+            sys.stdout.flush()
+            return sys.stdout.buffer
+        return sys.stdout
+    if binary:
+        return open(path, "wb")
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+# Reports are written to a temporary file that replaces path once it is complete, so an export that fails part way
+# (an error in the rows, or a columnar value that doesn't fit its column) never leaves a cut off report
+def export_file(path, output_format, columns, rows, title=DEFAULT_TITLE, chunk_size=EXPORT_CHUNK_SIZE):
+    if path == "-":
+        write_report(open_export(path, output_format), output_format, columns, rows, title, chunk_size)
+        return
+
+    temporary_path = f"{path}.tmp"
+    try:
+        with open_export(temporary_path, output_format) as stream:
+            write_report(stream, output_format, columns, rows, title, chunk_size)
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+# Write rows (tuples matching columns) to an open stream, binary for the columnar format and text for the others
+def write_report(stream, output_format, columns, rows, title=DEFAULT_TITLE, chunk_size=EXPORT_CHUNK_SIZE):
+    writers = {"csv": _write_csv, "jsonl": _write_jsonl, "html": _write_html, "columnar": _write_columnar}
+    if output_format not in writers:
+        raise ValueError(f"Unknown report format {output_format}, the formats are: {', '.join(EXPORT_FORMATS)}")
+    writers[output_format](stream, tuple(columns), chunked(rows, chunk_size), title)
+
+
+# --- Text Formats ---
+def _write_csv(stream, columns, chunks, title):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        stream.write(buffer.getvalue())
+        buffer.seek(0)
+        buffer.truncate()
+    stream.write(buffer.getvalue())
+
+
+def _write_jsonl(stream, columns, chunks, title):
+    for chunk in chunks:
+        stream.write("".join(json.dumps(dict(zip(columns, row))) + "\n" for row in chunk))
+
+
+# Running count, total, lowest and highest of a column's numbers, other values are only counted
+class _ColumnSummary:
+    __slots__ = ("count", "numbers", "total", "low", "high")
+
+    def __init__(self):
+        self.count = 0
+        self.numbers = 0
+        self.total = 0
+        self.low = None
+        self.high = None
+
+    def add(self, values):
+        self.count += len(values)
+        numbers = [value for value in values if isinstance(value, (int, float)) and not isinstance(value, bool)]
+        if not numbers:
+            return
+        self.numbers += len(numbers)
+        self.total += sum(numbers)
+        low, high = min(numbers), max(numbers)
+        self.low = low if self.low is None else min(self.low, low)
+        self.high = high if self.high is None else max(self.high, high)
+
+    def cells(self):
+        if not self.numbers:
+            return (self.count, "", "", "")
+        return (self.count, self.low, f"{self.total / self.numbers:.2f}", self.high)
+
+
+_HTML_STYLE = (
+    "body{font-family:Gadugi,Segoe UI,sans-serif;margin:2em;color:#222}"
+    "table{border-collapse:collapse;margin-bottom:2em}"
+    "th,td{border:1px solid #ccc;padding:4px 10px;text-align:right}"
+    "th{background:#eee}td:first-child,th:first-child{text-align:left}"
+)
+
+
+def _html_row(cells, tag="td"):
+    return "<tr>" + "".join(f"<{tag}>{html.escape(str(cell))}</{tag}>" for cell in cells) + "</tr>\n"
+
+
+# Only the summary and the first rows are kept, so memory use doesn't grow with the number of rows
+def _write_html(stream, columns, chunks, title):
+    summaries = [_ColumnSummary() for _ in columns]
+    preview = []
+    rows = 0
+    for chunk in chunks:
+        rows += len(chunk)
+        if len(preview) < HTML_PREVIEW_ROWS:
+            preview.extend(chunk[:HTML_PREVIEW_ROWS - len(preview)])
+        for summary, values in zip(summaries, zip(*chunk)):
+            summary.add(values)
+
+    title = html.escape(title)
+    parts = [
+        "<!DOCTYPE html>\n",
+        f'<html lang="en">\n<head>\n<meta charset="utf-8">\n<title>{title}</title>\n',
+        f"<style>{_HTML_STYLE}</style>\n</head>\n<body>\n<h1>{title}</h1>\n<p>{rows:,} rows</p>\n",
+        "<h2>Summary</h2>\n<table>\n",
+        _html_row(("Column", "Count", "Lowest", "Mean", "Highest"), "th"),
+        *(_html_row((column, *summary.cells())) for column, summary in zip(columns, summaries)),
+        "</table>\n<h2>Rows</h2>\n",
+    ]
+    if rows > len(preview):
+        parts.append(f"<p>First {len(preview):,} of {rows:,} rows</p>\n")
+    parts += ["<table>\n", _html_row(columns, "th"), *(_html_row(row) for row in preview), "</table>\n"]
+    parts.append("</body>\n</html>\n")
+    stream.write("".join(parts))
+
+
+# --- Columnar Format ---
+def _column_type(values):
+    if all(isinstance(value, bool) for value in values):
+        return "bool"
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        return "int64"
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+        return "float64"
+    return "str"
+
+
+def _encode_column(name, column_type, values):
+    if column_type == "str":
+        encoded = [str(value).encode("utf-8") for value in values]
+        return np.array([len(text) for text in encoded], dtype="<u4").tobytes() + b"".join(encoded)
+    allowed = {"int64": int, "float64": (int, float), "bool": bool}[column_type]
+    for value in values:
+        if not isinstance(value, allowed) or (column_type != "bool" and isinstance(value, bool)):
+            raise ValueError(f"Column {name} is {column_type} in its first rows, but later has {value!r}")
+    return np.array(values, dtype=_COLUMNAR_DTYPES[column_type]).tobytes()
+
+
+def _write_columnar(stream, columns, chunks, title):
+    first = next(chunks, [])
+    types = [_column_type(values) for values in zip(*first)] or ["str"] * len(columns)
+    header = json.dumps({"columns": list(columns), "title": title, "types": types}, sort_keys=True).encode("utf-8")
+    stream.write(COLUMNAR_MAGIC + struct.pack("<I", len(header)) + header)
+
+    chunk = first
+    while chunk:
+        values = list(zip(*chunk))
+        stream.write(struct.pack("<I", len(chunk)) + b"".join(
+            _encode_column(name, column_type, list(column))
+            for name, column_type, column in zip(columns, types, values)
+        ))
+        chunk = next(chunks, None)
+    stream.write(struct.pack("<I", 0))
+
+
+# Read a columnar file chunk by chunk, yields a dictionary of column name to NumPy array (a list for str columns)
+def columnar_chunks(stream):
+    if stream.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar report file")
+    header = json.loads(stream.read(struct.unpack("<I", stream.read(4))[0]))
+
+    while True:
+        rows = struct.unpack("<I", stream.read(4))[0]
+        if rows == 0:
+            return
+        chunk = {}
+        for name, column_type in zip(header["columns"], header["types"]):
+            if column_type == "str":
+                lengths = np.frombuffer(stream.read(rows * 4), dtype="<u4").tolist()
+                text = stream.read(sum(lengths))
+                ends = np.cumsum(lengths).tolist()
+                chunk[name] = [text[end - length:end].decode("utf-8") for end, length in zip(ends, lengths)]
+            else:
+                dtype = np.dtype(_COLUMNAR_DTYPES[column_type])
+                values = np.frombuffer(stream.read(rows * dtype.itemsize), dtype=dtype)
+                chunk[name] = values.astype(bool) if column_type == "bool" else values
+        yield chunk
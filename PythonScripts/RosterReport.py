@@ -0,0 +1,104 @@
+# Roll-ups for a whole roster (team or clan): median hours to goal, players at risk of missing the season end,
+# and how many players are at each badge tier
+# Each chunk of players is summarized on its own (e.g. in a worker process) and the summaries are merged as they
+# come back, so memory use only depends on the number of badges and MAX_TRACKED_MINUTES, not the roster size
+
+import numpy as np
+
+
+# Players needing more than this much weighted play time a day (minutes) are at risk of missing the season end
+AT_RISK_DAILY_MINUTES = 120
+
+# Longest play time (minutes) kept in the median's histogram, a year of play. Longer play times are counted as this
+# long, so a median at it means at least a year
+MAX_TRACKED_MINUTES = 366 * 24 * 60
+
+# At risk players listed in the report, the ones needing the most daily play time
+AT_RISK_LISTED = 20
+
+
+class RosterSummary:
+    def __init__(self, badge_labels, at_risk_daily_minutes=AT_RISK_DAILY_MINUTES, at_risk_listed=AT_RISK_LISTED):
+        self.badge_labels = list(badge_labels)
+        self.at_risk_daily_minutes = at_risk_daily_minutes
+        self.at_risk_listed = at_risk_listed
+        self.players = 0
+        self.finished = 0
+        # Players still playing by whole minutes of weighted play time left, for the median
+        self.minutes_counts = np.zeros(0, dtype=np.int64)
+        # Players at each badge, index 0 is no badge yet
+        self.badge_counts = np.zeros(len(self.badge_labels) + 1, dtype=np.int64)
+        self.at_risk = 0
+        # (weighted daily play time, player) of the players needing the most
+        self.at_risk_players = []
+
+    # Add a chunk of players, badge_indexes are from BadgeIndex.classify_array (-1 for no badge yet)
+    def add(self, players, points_remaining, weighted_playtime, weighted_daily_playtime, badge_indexes):
+        self.players += len(players)
+        self.badge_counts += np.bincount(np.asarray(badge_indexes) + 1, minlength=len(self.badge_counts))
+
+        playing = np.asarray(points_remaining) > 0
+        self.finished += int((~playing).sum())
+        minutes = np.asarray(weighted_playtime, dtype=np.float64)[playing]
+        if not np.isfinite(minutes).all() or (minutes < 0).any():
+            raise ValueError("Weighted play times must be finite and not negative")
+        minutes = np.ceil(np.minimum(minutes, MAX_TRACKED_MINUTES)).astype(np.int64)
+        self._add_minutes(np.bincount(minutes, minlength=len(self.minutes_counts)) if len(minutes) else None)
+
+        at_risk = np.flatnonzero(playing & (np.asarray(weighted_daily_playtime) > self.at_risk_daily_minutes))
+        self.at_risk += len(at_risk)
+        daily = np.asarray(weighted_daily_playtime)
+        self._add_at_risk([(float(daily[i]), players[i]) for i in at_risk])
+
+    def merge(self, other):
+        self.players += other.players
+        self.finished += other.finished
+        self.badge_counts += other.badge_counts
+        self._add_minutes(other.minutes_counts)
+        self.at_risk += other.at_risk
+        self._add_at_risk(other.at_risk_players)
+        return self
+
+    def _add_minutes(self, counts):
+        if counts is None or not len(counts):
+            return
+        if len(counts) > len(self.minutes_counts):
+            counts = counts.copy()
+            counts[:len(self.minutes_counts)] += self.minutes_counts
+            self.minutes_counts = counts
+        else:
+            self.minutes_counts[:len(counts)] += counts
+
+    def _add_at_risk(self, players):
+        combined = self.at_risk_players + list(players)
+        combined.sort(key=lambda entry: entry[0], reverse=True)
+        self.at_risk_players = combined[:self.at_risk_listed]
+
+    # Median weighted play time left of the players still playing, in hours (None when everyone is done)
+    @property
+    def median_hours(self):
+        playing = int(self.minutes_counts.sum())
+        if playing == 0:
+            return None
+        cumulative = np.cumsum(self.minutes_counts)
+        lower = int(np.searchsorted(cumulative, (playing + 1) // 2))
+        upper = int(np.searchsorted(cumulative, playing // 2 + 1))
+        return (lower + upper) / 2 / 60
+
+    def badge_distribution(self):
+        return dict(zip(["No badge"] + self.badge_labels, self.badge_counts.tolist()))
+
+    def report(self):
+        median_hours = self.median_hours
+        return {
+            "players": self.players,
+            "finished": self.finished,
+            "median_hours_to_goal": round(median_hours, 2) if median_hours is not None else None,
+            "at_risk_daily_minutes": self.at_risk_daily_minutes,
+            "at_risk": self.at_risk,
+            "most_at_risk": [
+                {"player": player, "weighted_daily_playtime": round(daily, 2)}
+                for daily, player in self.at_risk_players
+            ],
+            "badge_distribution": self.badge_distribution(),
+        }
@@ -0,0 +1,113 @@
+# Finds the mix of round types that reaches the goal points in the least expected time
+# Each round type is an item with a point yield and a time cost (game time x time multiplier). The shares of each
+# round type are chosen to give the most points per minute, under constraints such as a minimum share of quick play
+# or a cap on the win rate. Points per minute is a ratio of two linear functions of the shares, so its best value is
+# at a corner of the allowed region, and with only a handful of constraints there are few enough corners to check all
+# of them, which takes a few milliseconds
+
+from itertools import combinations
+import math
+
+import numpy as np
+
+from GameConstants import ROUND_POINTS, ROUND_TIME_MULTIPLIERS
+
+
+# Indexes of the quick play round types, and of the round types that are wins
+QUICK_PLAY_ROUNDS = (4, 5, 6)
+WIN_ROUNDS = (3, 4)
+
+# Shares are treated as equal when this close, to allow for rounding in the corner solutions
+_TOLERANCE = 1e-9
+
+
+# A planned mix of round types and the games and time it needs to reach the goal
+class RoundMixPlan:
+    def __init__(self, shares, points_per_game, minutes_per_game, points_remaining):
+        self.shares = shares
+        self.points_per_game = points_per_game
+        self.minutes_per_game = minutes_per_game
+        self.points_remaining = points_remaining
+
+    @property
+    def points_per_minute(self):
+        return self.points_per_game / self.minutes_per_game
+
+    @property
+    def expected_games(self):
+        return max(self.points_remaining, 0) / self.points_per_game
+
+    @property
+    def expected_minutes(self):
+        return self.expected_games * self.minutes_per_game
+
+    # Whole games of each round type, rounded up so the mix always covers the points remaining
+    @property
+    def games_per_round(self):
+        total_games = math.ceil(self.expected_games - _TOLERANCE)
+        return np.ceil(self.shares * total_games - _TOLERANCE).astype(np.int64)
+
+
+# Share constraints are (round indexes, minimum share, maximum share), shares are from 0 to 1
+def min_quick_play_share(share, quick_play_rounds=QUICK_PLAY_ROUNDS):
+    return (tuple(quick_play_rounds), share, 1.0)
+
+
+def max_win_rate(share, win_rounds=WIN_ROUNDS):
+    return (tuple(win_rounds), 0.0, share)
+
+
+# Turn the share constraints into rows of A x <= b
+def _constraint_rows(constraints, round_count):
+    rows, limits = [], []
+    for rounds, minimum, maximum in constraints:
+        row = np.zeros(round_count)
+        row[list(rounds)] = 1
+        if minimum > 0:
+            rows.append(-row)
+            limits.append(-minimum)
+        if maximum < 1:
+            rows.append(row)
+            limits.append(maximum)
+    return np.array(rows).reshape(-1, round_count), np.array(limits)
+
+
+# Every corner of {shares >= 0, sum of shares = 1, A shares <= b}
+# A corner uses k round types and has k - 1 of the constraint rows exactly at their limit
+def _corners(a, b, round_count):
+    for size in range(1, len(b) + 2):
+        for rounds in combinations(range(round_count), size):
+            for active in combinations(range(len(b)), size - 1):
+                system = np.vstack([np.ones(size), a[list(active)][:, list(rounds)]])
+                target = np.concatenate([[1.0], b[list(active)]])
+                try:
+                    solution = np.linalg.solve(system, target)
+                except np.linalg.LinAlgError:
+                    continue
+                if solution.min() < -_TOLERANCE:
+                    continue
+                shares = np.zeros(round_count)
+                shares[list(rounds)] = np.maximum(solution, 0)
+                if len(b) and (a @ shares > b + _TOLERANCE).any():
+                    continue
+                yield shares
+
+
+# Plan the mix with the least expected time to cover points_remaining
+# Raises ValueError when the constraints can't all be met
+def plan_round_mix(points_remaining, game_time, constraints=(), round_points=ROUND_POINTS,
+                   round_time_multipliers=ROUND_TIME_MULTIPLIERS):
+    points = np.asarray(round_points, dtype=np.float64)
+    minutes = np.asarray(round_time_multipliers, dtype=np.float64) * game_time
+    a, b = _constraint_rows(constraints, len(points))
+
+    best = None
+    best_rate = -1.0
+    for shares in _corners(a, b, len(points)):
+        rate = (shares @ points) / (shares @ minutes)
+        if rate > best_rate + _TOLERANCE:
+            best, best_rate = shares, rate
+
+    if best is None:
+        raise ValueError("No mix of round types meets every constraint")
+    return RoundMixPlan(best, float(best @ points), float(best @ minutes), points_remaining)
@@ -0,0 +1,59 @@
+# Games and play time for each round type, for any number of player states, kept as a struct of arrays
+# The engine's NumPy arrays are held as they are (no record or tuple per round) and only turned into strings when
+# something is displayed or exported, then the days, hours and minutes of a whole array are split at once
+#
+# Nothing here imports NumPy, arrays are used through their own methods, so the window can format durations before
+# the engine has been loaded
+
+# Days, hours of the day, and minutes of the hour in a number (or array) of minutes, fractions of a minute are dropped
+def split_minutes(minutes):
+    hours, minutes = divmod(minutes // 1, 60)
+    days, hours = divmod(hours, 24)
+    return days, hours, minutes
+
+
+def _duration_text(days, hours, minutes):
+    if days > 0:
+        return f"{days} days, {hours} hours, {minutes} minutes"
+    if days == 0 and hours > 0:
+        return f"{hours} hours, {minutes} minutes"
+    return f"{minutes} minutes"
+
+
+# One duration as text, e.g. "1 days, 2 hours, 5 minutes", "3 hours, 0 minutes" or "45 minutes"
+def format_duration(minutes):
+    return _duration_text(*(int(part) for part in split_minutes(minutes)))
+
+
+# Every duration in a NumPy array as text, in the array's (flattened) order
+# Same text as format_duration, written out inline since a function call per value would be most of the cost
+def format_durations(minutes):
+    days, hours, minutes = (part.astype("int64").tolist() for part in split_minutes(minutes.ravel()))
+    return [
+        f"{d} days, {h} hours, {m} minutes" if d > 0
+        else f"{h} hours, {m} minutes" if d == 0 and h > 0
+        else f"{m} minutes"
+        for d, h, m in zip(days, hours, minutes)
+    ]
+
+
+class RoundResults:
+    __slots__ = ("games", "minutes")
+
+    def __init__(self, games, minutes):
+        # Shape (rows, rounds), games and minutes needed if only that round type is played
+        self.games = games
+        self.minutes = minutes
+
+    def __len__(self):
+        return len(self.games)
+
+    # Formatted play time for every row, one list per row
+    def durations(self):
+        rounds = self.minutes.shape[1]
+        text = format_durations(self.minutes)
+        return [text[start:start + rounds] for start in range(0, len(text), rounds)]
+
+    # (label, games, play time) for each round type of one row, like the rows of the games table
+    def table_rows(self, labels, row=0):
+        return list(zip(labels, self.games[row].tolist(), format_durations(self.minutes[row])))
@@ -0,0 +1,357 @@
+# Season and mode registry, loaded from the files in the Data folder
+# The text files (and the match log spreadsheet) are parsed once and compiled into a small binary cache file,
+# which is memory-mapped on later starts. The cache is rebuilt whenever a source file's size or modification time changes
+#
+# A new season only needs new data files:
+#   WorldTourInfo.txt   world tour round points, badges, and "Season end date: YYYY-MM-DD"
+#   Season9.txt         quick play points, and points for the other quick play modes
+#   QuickPlayInfo.txt   Quick Cash, Team VS Team and Blast Off points, and their badge ladder
+#   *.ods               match log, the daily totals from its "Master" sheet are kept
+#
+# Table values are int64 sequences (array.array, or a view of the cache) rather than NumPy arrays, so loading the
+# registry at startup doesn't import NumPy
+
+from array import array
+from datetime import date
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+
+from GameConstants import ROUND_POINTS, SEASON_END_DATE, WORLD_TOUR_BADGE_OPTIONS
+
+
+# Data folder next to the PythonScripts folder (or next to the executable in the pyinstaller build)
+if getattr(sys, "frozen", False):
+    DATA_DIRECTORY = os.path.join(os.path.dirname(sys.executable), "Data")
+else:
+    DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Data")
+
+CACHE_FILE_NAME = "season_cache.bin"
+
+# Source (data file name) and section the current season's badges and round points come from
+WORLD_TOUR_SOURCE = "WorldTourInfo"
+WORLD_TOUR_MODE = (WORLD_TOUR_SOURCE, "Awarded point values")
+QUICK_PLAY_MODE = ("Season9", "Quick Play Awarded Points")
+
+_CACHE_MAGIC = b"WTSEASON"
+_CACHE_VERSION = 1
+
+
+# --- Text Files ---
+_DATE_LINE = re.compile(r"^season end date:\s*(\d{4}-\d{2}-\d{2})$", re.IGNORECASE)
+_TITLE_LINE = re.compile(r"^-+\s*(.+?)\s*-+$")
+_ENTRY_LINE = re.compile(r"^(?P<label>[^:\t]+?)\s*(?::|\t)\s*(?P<value>\d+)?\s*(?P<unit>points|minutes)?$", re.IGNORECASE)
+
+
+# Split a text data file into sections of (label, value, unit) entries, values are None when left blank in the file
+# A section starts at a title line ("-- TDM --", "Badges:", "Blast off"), lines like "Bronze: +25 between each tier"
+# and notes starting with "*" are skipped
+def parse_text_source(text):
+    sections = {}
+    season_end = None
+    section = None
+    after_blank = True
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            after_blank = True
+            continue
+
+        date_match = _DATE_LINE.match(line)
+        title_match = _TITLE_LINE.match(line)
+        entry_match = _ENTRY_LINE.match(line)
+
+        if date_match:
+            season_end = date_match.group(1)
+        elif line.startswith("*") or "between each tier" in line:
+            pass
+        elif title_match:
+            section = sections.setdefault(title_match.group(1), [])
+        elif entry_match and (entry_match.group("value") or not after_blank):
+            # An entry with a blank value only counts when it follows its section directly, "Badges:" is a title
+            if section is None:
+                section = sections.setdefault("", [])
+            value = entry_match.group("value")
+            unit = (entry_match.group("unit") or "points").lower()
+            section.append((entry_match.group("label").strip(), int(value) if value else None, unit))
+        else:
+            section = sections.setdefault(line.rstrip(":").strip(), [])
+
+        after_blank = False
+
+    return sections, season_end
+
+
+# --- Match Log Spreadsheet ---
+_ODS_NAMESPACES = {
+    "table": "urn:oasis:names:tc:opendocument:xmlns:table:1.0",
+}
+
+
+# Rows of a sheet in an .ods file as lists of cell text, repeated cells are expanded (up to the last filled cell)
+# The spreadsheet is only read when the cache is rebuilt, so its imports are left until then
+def _ods_rows(path, sheet_name):
+    import xml.etree.ElementTree as ET
+    import zipfile
+
+    table_tag = f"{{{_ODS_NAMESPACES['table']}}}table"
+    row_tag = f"{{{_ODS_NAMESPACES['table']}}}table-row"
+    name_attribute = f"{{{_ODS_NAMESPACES['table']}}}name"
+    repeat_attribute = f"{{{_ODS_NAMESPACES['table']}}}number-columns-repeated"
+
+    with zipfile.ZipFile(path) as archive, archive.open("content.xml") as content:
+        root = ET.parse(content).getroot()
+
+    for table in root.iter(table_tag):
+        if table.get(name_attribute) != sheet_name:
+            continue
+        for row in table.iter(row_tag):
+            cells = []
+            for cell in row:
+                text = "".join(cell.itertext())
+                repeat = int(cell.get(repeat_attribute, "1"))
+                cells.extend([text] * (repeat if text else 1))
+            while cells and not cells[-1]:
+                cells.pop()
+            if cells:
+                yield cells
+
+
+# Dates and daily totals ([points, rounds, minutes] for each date) from the "Master" sheet of the match log
+def parse_match_log(path):
+    dates, totals = [], []
+    for cells in _ods_rows(path, "Master"):
+        if len(cells) < 4 or cells[0] in ("Date", "Total"):
+            continue
+        try:
+            values = [int(float(cell)) for cell in cells[1:4]]
+        except ValueError:
+            continue
+        # Unplayed placeholder days are left out
+        if any(values):
+            dates.append(cells[0])
+            totals.append(values)
+    return dates, totals
+
+
+# --- Registry ---
+# Named integer tables (with a label per value) and a little metadata, backed by the memory-mapped cache
+class SeasonRegistry:
+    def __init__(self, tables, metadata, buffer=None):
+        # Name -> (labels, int64 values)
+        self.tables = tables
+        self.metadata = metadata
+        # Kept open so the arrays stay valid
+        self._buffer = buffer
+
+    def table(self, name):
+        return self.tables[name]
+
+    def table_names(self, prefix=""):
+        return [name for name in self.tables if name.startswith(prefix)]
+
+    # Badge ladder as (label, points) pairs, e.g. badge_options("WorldTourInfo")
+    def badge_options(self, source=WORLD_TOUR_SOURCE):
+        if f"{source}.badges" not in self.tables:
+            raise ValueError(f"There are no badges in {source}")
+        labels, values = self.table(f"{source}.badges")
+        return list(zip(labels, values.tolist()))
+
+    # Modes in a source as {mode name: [(outcome label, points), ...]}, only modes with every value filled in
+    def modes(self, source):
+        prefix = f"{source}.modes."
+        modes = {}
+        for name in self.table_names(prefix):
+            labels, values = self.table(name)
+            modes[name[len(prefix):]] = list(zip(labels, values.tolist()))
+        return modes
+
+    # Game length of a mode in minutes, when the data file gives one
+    def game_time(self, source, mode):
+        return self.metadata.get("game_times", {}).get(f"{source}.{mode}")
+
+    @property
+    def season_end_date(self):
+        value = self.metadata.get("season_end_date")
+        return date.fromisoformat(value) if value else SEASON_END_DATE
+
+    # World tour round points followed by quick play points, in the same order as ROUND_POINTS
+    @property
+    def round_points(self):
+        points = []
+        for source, mode in (WORLD_TOUR_MODE, QUICK_PLAY_MODE):
+            points.extend(value for _, value in self.modes(source).get(mode, []))
+        return tuple(points) if len(points) == len(ROUND_POINTS) else ROUND_POINTS
+
+
+# Compile the parsed sources into tables
+def _compile_sources(paths):
+    tables = {}
+    metadata = {"game_times": {}}
+
+    for path in paths:
+        source = os.path.splitext(os.path.basename(path))[0]
+        if path.endswith(".ods"):
+            dates, totals = parse_match_log(path)
+            for i, column in enumerate(("points", "rounds", "minutes")):
+                tables[f"{source}.daily_{column}"] = (dates, array("q", [row[i] for row in totals]))
+            continue
+
+        with open(path, encoding="utf-8") as file:
+            sections, season_end = parse_text_source(file.read())
+        if season_end:
+            metadata["season_end_date"] = season_end
+
+        for name, entries in sections.items():
+            points = [(label, value) for label, value, unit in entries if unit == "points"]
+            minutes = [value for _, value, unit in entries if unit == "minutes" and value]
+            if not points or any(value is None for _, value in points):
+                continue
+            labels = [label for label, _ in points]
+            values = array("q", [value for _, value in points])
+            if name.lower().startswith("badges"):
+                tables[f"{source}.badges"] = (labels, values)
+            else:
+                tables[f"{source}.modes.{name}"] = (labels, values)
+                if minutes:
+                    metadata["game_times"][f"{source}.{name}"] = minutes[0]
+
+    return tables, metadata
+
+
+# Sizes and modification times of the sources, any change rebuilds the cache
+def _source_signature(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        status = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{status.st_size}:{status.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+# --- Cache File ---
+# Layout: magic, version, header length, JSON header (signature, labels, offsets), padding, then int64 table values
+def _write_cache(cache_path, signature, tables, metadata):
+    header = {"signature": signature, "metadata": metadata, "tables": {}}
+    offset = 0
+    for name, (labels, values) in tables.items():
+        header["tables"][name] = {"labels": list(labels), "offset": offset, "count": len(values)}
+        offset += len(values) * 8
+
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+    prefix = struct.pack("<8sII", _CACHE_MAGIC, _CACHE_VERSION, len(header_bytes)) + header_bytes
+    prefix += b"\0" * (-len(prefix) % 8)
+
+    # Written to a temporary file first so a half written cache is never read
+    temporary_path = f"{cache_path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(prefix)
+        for _, values in tables.values():
+            file.write(_int64_bytes(values))
+    os.replace(temporary_path, cache_path)
+
+
+# Little-endian bytes of int64 values
+def _int64_bytes(values):
+    values = array("q", values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+# int64 values stored in the cache, a view of the mapped file on little-endian machines and a swapped copy otherwise
+def _int64_values(buffer, start, count):
+    if sys.byteorder == "little":
+        return memoryview(buffer)[start:start + count * 8].cast("q")
+    values = array("q", buffer[start:start + count * 8])
+    values.byteswap()
+    return values
+
+
+# Map the cache file, returns None when it is missing, from an older version, built from different sources, or
+# truncated or corrupt (e.g. the app was closed while copying the data folder), so it is built again
+def _read_cache(cache_path, signature):
+    try:
+        with open(cache_path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        entries, metadata = _cache_entries(buffer, signature)
+    except (struct.error, ValueError, KeyError, TypeError):
+        # ValueError covers JSONDecodeError and UnicodeDecodeError
+        entries = None
+    if entries is None:
+        buffer.close()
+        return None
+
+    tables = {name: (labels, _int64_values(buffer, start, count)) for name, (labels, start, count) in entries.items()}
+    return SeasonRegistry(tables, metadata, buffer)
+
+
+# Labels, start and count of each table in a mapped cache, and its metadata, None when the cache can't be used
+# Raises struct.error, ValueError, KeyError or TypeError for a cache that is cut short or has a broken header
+def _cache_entries(buffer, signature):
+    prefix_size = struct.calcsize("<8sII")
+    magic, version, header_length = struct.unpack_from("<8sII", buffer)
+    if magic != _CACHE_MAGIC or version != _CACHE_VERSION:
+        return None, None
+    if prefix_size + header_length > len(buffer):
+        raise ValueError("The cache header is cut short")
+    header = json.loads(buffer[prefix_size:prefix_size + header_length])
+    if header["signature"] != signature:
+        return None, None
+
+    data_start = prefix_size + header_length
+    data_start += -data_start % 8
+    entries = {}
+    for name, entry in header["tables"].items():
+        start = data_start + int(entry["offset"])
+        count = int(entry["count"])
+        if start < data_start or count < 0 or start + count * 8 > len(buffer):
+            raise ValueError(f"Table {name} is outside the cache file")
+        entries[name] = (list(entry["labels"]), start, count)
+    return entries, header["metadata"]
+
+
+def _source_paths(data_directory):
+    names = sorted(os.listdir(data_directory))
+    return [os.path.join(data_directory, name) for name in names if name.endswith((".txt", ".ods"))]
+
+
+# Load the registry from the data folder, using the cache when it is up to date
+# Falls back to the built in defaults when there is no data folder (e.g. the executable was copied on its own)
+def load_season_registry(data_directory=DATA_DIRECTORY, cache_path=None):
+    if not os.path.isdir(data_directory):
+        return default_registry()
+
+    paths = _source_paths(data_directory)
+    signature = _source_signature(paths)
+    cache_path = cache_path or os.path.join(data_directory, CACHE_FILE_NAME)
+
+    registry = _read_cache(cache_path, signature)
+    if registry is not None:
+        return registry
+
+    tables, metadata = _compile_sources(paths)
+    try:
+        _write_cache(cache_path, signature, tables, metadata)
+    except OSError:
+        # A read only data folder still works, it is just parsed every time
+        return SeasonRegistry(tables, metadata)
+    return _read_cache(cache_path, signature) or SeasonRegistry(tables, metadata)
+
+
+# Registry built from the defaults in GameConstants
+def default_registry():
+    labels = [label for label, _ in WORLD_TOUR_BADGE_OPTIONS]
+    values = array("q", [points for _, points in WORLD_TOUR_BADGE_OPTIONS])
+    return SeasonRegistry(
+        {f"{WORLD_TOUR_SOURCE}.badges": (labels, values)},
+        {"season_end_date": SEASON_END_DATE.isoformat()},
+    )
@@ -0,0 +1,137 @@
+# Sweep over every set of round weights (that adds up to 100) at a chosen step, to see which weight matters most
+# At a 5% step there are 230,230 sets of weights. The play time for each round type doesn't depend on the weights,
+# so it is calculated once and the weighted play time of every set is one matrix product, which takes milliseconds
+#
+# The sensitivity of a weight is its main effect: the average weighted play time over every set with that weight at
+# each of its values. The range of that curve (and its slope) shows how much the answer depends on the weight
+
+from itertools import chain, combinations
+import math
+
+import numpy as np
+
+from CalculationEngine import calculate_batch
+from GameConstants import (
+    ADDITIONAL_GAME_TIME,
+    BASE_GAME_TIME,
+    ROUND_NAMES,
+    ROUND_POINTS,
+    ROUND_TIME_MULTIPLIERS,
+)
+
+
+# Default distance between weight values, in percent
+SWEEP_STEP = 5
+
+# Most sets of weights in one sweep, a 4% step has 736,281 and a 2% step would have over 32 million
+MAX_SWEEP_SETS = 1_000_000
+
+SWEEP_VALUE_COLUMNS = ("weighted_playtime", "weighted_daily_playtime")
+
+
+# Number of sets of weights at step, raises ValueError for a step that doesn't divide 100 or gives too many sets
+def sweep_size(step, round_count=len(ROUND_NAMES)):
+    if step <= 0 or 100 % step:
+        raise ValueError("The sweep step must be a whole number of percent that divides 100")
+    count = math.comb(100 // step + round_count - 1, round_count - 1)
+    if count > MAX_SWEEP_SETS:
+        raise ValueError(
+            f"A {step}% step has {count:,} sets of weights, more than the {MAX_SWEEP_SETS:,} a sweep can hold, "
+            "use a larger step"
+        )
+    return count
+
+
+# Every set of weights, in percent, made of multiples of step that add up to 100, shape (sets, rounds)
+# Each set is a way of splitting 100 / step units between the rounds, found by placing rounds - 1 dividers among them
+def simplex_grid(step=SWEEP_STEP, round_count=len(ROUND_NAMES)):
+    count = sweep_size(step, round_count)
+    slots = 100 // step + round_count - 1
+
+    dividers = np.fromiter(
+        chain.from_iterable(combinations(range(slots), round_count - 1)),
+        dtype=np.int16,
+        count=count * (round_count - 1),
+    ).reshape(count, round_count - 1)
+
+    edges = np.empty((count, round_count + 1), dtype=np.int16)
+    edges[:, 0] = -1
+    edges[:, 1:-1] = dividers
+    edges[:, -1] = slots
+    return ((np.diff(edges, axis=1) - 1) * step).astype(np.int16)
+
+
+# Weighted and daily play time for every set of weights in the grid
+class WeightSweep:
+    def __init__(self, weights, weighted_playtime, weighted_daily_playtime, step):
+        self.weights = weights
+        self.weighted_playtime = weighted_playtime
+        self.weighted_daily_playtime = weighted_daily_playtime
+        self.step = step
+
+    def __len__(self):
+        return len(self.weights)
+
+    @property
+    def levels(self):
+        return 100 // self.step + 1
+
+    # Average of values over every set of weights, for each value (0, step, ... 100) of one weight
+    def main_effect(self, round_index, values="weighted_playtime"):
+        values = getattr(self, values)
+        level = self.weights[:, round_index] // self.step
+        totals = np.bincount(level, weights=values, minlength=self.levels)
+        counts = np.bincount(level, minlength=self.levels)
+        return totals / counts
+
+    # Sensitivity of each weight, most sensitive first, as a list of dictionaries with:
+    #   round          round name
+    #   range          difference between the highest and lowest main effect, in minutes
+    #   slope          change in the main effect per percent of weight, from a least squares fit
+    #   lowest/highest average at a weight of 0% and of 100%
+    def sensitivities(self, values="weighted_playtime"):
+        percents = np.arange(self.levels) * self.step
+        results = []
+        for index, name in enumerate(ROUND_NAMES[:self.weights.shape[1]]):
+            effect = self.main_effect(index, values)
+            results.append({
+                "round": name,
+                "range": float(effect.max() - effect.min()),
+                "slope": float(np.polyfit(percents, effect, 1)[0]),
+                "lowest": float(effect[0]),
+                "highest": float(effect[-1]),
+            })
+        return sorted(results, key=lambda result: result["range"], reverse=True)
+
+    # Average of values for every pair of values of two weights, for heatmaps, shape (levels, levels)
+    # Pairs that add up to more than 100 are NaN
+    def heatmap(self, x_index, y_index, values="weighted_playtime"):
+        values = getattr(self, values)
+        cells = (self.weights[:, y_index] // self.step).astype(np.int64) * self.levels
+        cells += self.weights[:, x_index] // self.step
+        size = self.levels * self.levels
+        totals = np.bincount(cells, weights=values, minlength=size)
+        counts = np.bincount(cells, minlength=size)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (totals / counts).reshape(self.levels, self.levels)
+
+    # One row per set of weights (weights, then weighted and daily play time), for exporting the grid
+    def rows(self):
+        columns = [
+            *self.weights.T.tolist(),
+            np.round(self.weighted_playtime, 2).tolist(),
+            np.round(self.weighted_daily_playtime, 2).tolist(),
+        ]
+        return zip(*columns)
+
+
+# Sweep the weights for one player
+def sweep_weights(current_points, goal_points, game_time=BASE_GAME_TIME + ADDITIONAL_GAME_TIME, days_remaining=1,
+                  step=SWEEP_STEP, round_points=ROUND_POINTS, round_time_multipliers=ROUND_TIME_MULTIPLIERS):
+    weights = simplex_grid(step, len(round_points))
+    result = calculate_batch(current_points, goal_points, game_time, days_remaining, round_points,
+                             round_time_multipliers)
+
+    weighted_playtime = weights @ (result.playtime[0] / 100)
+    weighted_daily_playtime = weighted_playtime / max(int(result.days_remaining[0]), 1)
+    return WeightSweep(weights, weighted_playtime, weighted_daily_playtime, step)
@@ -1,147 +1,134 @@
-# Planned features: 
-# Have points to next rank stat
-# Potential additions: projected completion (based on time left and progress so far)
-#   Estimated completion date (how many points  you've gotten per day so far, and use days left in season)
-
 # To build the calculator, run "pyinstaller --onefile --windowed WorldTourCalculator.py"
 # If pyinstaller is not a recognized command, ensure you install it by running "pip install pyinstaller"
+# Copy the Data folder next to the built executable so it uses the season data, otherwise built in defaults are used
+# The calculations are done by CalculationEngine.py, which requires NumPy ("pip install numpy")
+# Passing arguments runs the headless command line mode, see CommandLine.py (e.g. "python WorldTourCalculator.py batch -h")
+# "python WorldTourCalculator.py --startup-profile [times.json]" opens the window, prints how long each startup phase
+# took, and closes it again
+#
+# To start quickly (the one-file build unpacks itself on every launch), only Tk, the game constants, and the season
+# data are imported before the first frame. NumPy, the engine, and the games table below the fold are loaded right
+# after it is drawn, and the simulation, exact odds, sweep, and progress history modules when they are first used
+
+import time
 
+# When this module started loading, the startup profile is timed from here
+STARTUP_STARTED = time.perf_counter()
 
 import tkinter as tk
 from tkinter import ttk
-import math
 from datetime import date
+from functools import cached_property
+import importlib
+import json
+import math
+import os
+import sys
+
+from BackgroundJobs import BackgroundJobs
+from GameConstants import (
+    ADDITIONAL_GAME_TIME,
+    BASE_GAME_TIME,
+    BATCH_OUTPUT_COLUMNS,
+    ROUND_NAMES,
+    ROUND_TIME_MULTIPLIERS,
+    ROUND_WEIGHTS,
+    ROW_LABELS,
+    WEIGHT_COLUMNS,
+)
+from Instrumentation import REGISTRY, count, enable, is_enabled, observe, phase
+from RoundResults import format_duration
+from SeasonData import load_season_registry
+
+
+# Milliseconds to wait after the last keystroke before recalculating in live mode
+LIVE_UPDATE_DELAY_MS = 200
+
+# Milliseconds between refreshes of the debug panel
+DEBUG_PANEL_REFRESH_MS = 1000
+
+# Modules every calculation needs, imported once the first frame is drawn instead of before it
+PRELOADED_MODULES = ("CalculationEngine", "BadgeIndex", "BudgetOdds", "GrindSchedule", "RoundMixPlanner")
+
+# Startup phases in the order they run, "first_frame" and "ready" are the time since the module started loading and
+# the others are how long that phase took
+STARTUP_PHASES = (
+    "imports", "window", "season_data", "widgets", "first_frame", "games_table", "engine", "progress_history", "ready",
+)
+
+# Columns of an exported simulation or exact distribution, a row for the mean and each percentile
+DISTRIBUTION_COLUMNS = ("statistic", "minutes")
 
 
 class WorldTourCalculator(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        
-        self.geometry("650x700")
-        
-        # Set application title
-        self.title("World Tour Points Calculator")
+    # With startup_profile, the startup phases are printed (and saved as JSON to startup_profile_path) once the window
+    # is ready, then the window closes
+    def __init__(self, startup_profile=False, startup_profile_path=None):
+        with phase("startup.window"):
+            super().__init__()
+            
+            self.geometry("650x700")
+            
+            # Set application title
+            self.title("World Tour Points Calculator")
 
-        # Set style for various UI elements
-        style = ttk.Style(self)
-        style.theme_use("clam")
-        style.configure("Treeview", font=("Gadugi", 10))
-        style.configure("Treeview.Heading", font=("Gadugi", 11))
-        style.configure("TButton", font=("Gadugi", 10))
-        style.configure("My.TMenubutton", font=("Gadugi", 11))
+            # Set style for various UI elements
+            style = ttk.Style(self)
+            style.theme_use("clam")
+            style.configure("Treeview", font=("Gadugi", 10))
+            style.configure("Treeview.Heading", font=("Gadugi", 11))
+            style.configure("TButton", font=("Gadugi", 10))
+            style.configure("My.TMenubutton", font=("Gadugi", 11))
 
         # --- World Tour Data ---
+        # Round points, badges, and the season end date come from the files in the Data folder
+        with phase("startup.season_data"):
+            season = load_season_registry()
+        # Kept for the modes of the other data files, compared by mode_ranking
+        self.season_registry = season
+        
         # Estimated time each game will take
         # Additional game time includes things like queue time, loading time, and transition time between matches
-        self.base_game_time = 10
-        self.additional_game_time = tk.StringVar(value="3")
+        self.base_game_time = BASE_GAME_TIME
+        self.additional_game_time = tk.StringVar(value=str(ADDITIONAL_GAME_TIME))
         self.game_time = self.base_game_time + int(self.additional_game_time.get())
+        # False while the time between games would make a game take no time, game_time keeps the last valid value
+        self.game_time_valid = True
         
         self.additional_game_time.trace_add("write", self.update_time)
+        self.additional_game_time.trace_add("write", self.schedule_recalculate)
+        
+        # Minutes played each day, for the chance of reaching the goal before the season ends
+        self.daily_budget = tk.StringVar(value="60")
+        self.daily_budget.trace_add("write", self.schedule_recalculate)
 
-        # Points awarded for each round in world tour
-        self.lose_round_one_points = 2
-        self.lose_round_two_points = 6
-        self.lose_final_round_points = 14
-        self.win_final_round_points = 25
-        
-        # World tour points awarded for the quickplay modes
-        self.win_qp_points = 4
-        self.second_place_qp_points = 3
-        self.lose_qp_points = 2
-
-        # Number of games needed to reach the goal points (default is 1)
-        self.round_one_games = 1
-        self.round_two_games = 1
-        self.lose_final_round_games = 1
-        self.win_final_round_games = 1
-        self.win_qp_games = 1
-        self.second_place_qp_games = 1
-        self.lose_qp_games = 1
-
-        # Time spent playing for each type of round
-        self.round_one_time = self.game_time
-        self.round_two_time = self.game_time * 2
-        self.lose_final_round_time = self.game_time * 3
-        self.win_final_round_time = self.game_time * 3
-        self.win_qp_time = self.game_time
-        self.second_place_qp_time = self.game_time
-        self.lose_qp_time = self.game_time
+        # Points awarded for each round in world tour, followed by the world tour points awarded for the quickplay modes
+        self.round_points = list(season.round_points)
+        
+        # Number of games each round type takes
+        self.round_time_multipliers = list(ROUND_TIME_MULTIPLIERS)
 
         # Dates used to determine how much time is left in the season
-        self.season_end_date = date(2026, 3, 26)
+        self.season_end_date = season.season_end_date
         self.todays_date = date.today()
 
-        # The different badges in world tour
-        self.world_tour_badge_options = [
-            ("Bronze 4", 25),
-            ("Bronze 3", 50),
-            ("Bronze 2", 75),
-            ("Bronze 1", 100),
-            ("Silver 4", 150),
-            ("Silver 3", 200),
-            ("Silver 2", 250),
-            ("Silver 1", 300),
-            ("Gold 4", 375),
-            ("Gold 3", 450),
-            ("Gold 2", 525),
-            ("Gold 1", 600),
-            ("Platinum 4", 700),
-            ("Platinum 3", 800),
-            ("Platinum 2", 900),
-            ("Platinum 1", 1000),
-            ("Diamond 4", 1150),
-            ("Diamond 3", 1300),
-            ("Diamond 2", 1450),
-            ("Diamond 1", 1600),
-            ("Emerald 4", 1800),
-            ("Emerald 3", 2000),
-            ("Emerald 2", 2200),
-            ("Emerald 1", 2400),
-        ]
+        # The different badges in world tour, the badge_index property looks up the badge reached
+        self.world_tour_badge_options = season.badge_options()
 
         # Labels for rows in the world tour games table
-        self.row_labels = [
-            "Round one",
-            "Round two",
-            "Lose final round",
-            "Win final round",
-            "Win Quick Play",
-            "Second Place Quick Play",
-            "Lose Quick Play"
-        ]
-
-        # Full table rows in the world tour games table
-        self.games_table_rows = [
-            [self.row_labels[0], self.round_one_games, self.round_one_time],
-            [self.row_labels[1], self.round_two_games, self.round_two_time],
-            [self.row_labels[2], self.lose_final_round_games, self.lose_final_round_time],
-            [self.row_labels[3], self.win_final_round_games, self.win_final_round_time],
-            [self.row_labels[4], self.win_qp_games, self.win_qp_time],
-            [self.row_labels[5], self.second_place_qp_games, self.second_place_qp_time],
-            [self.row_labels[6], self.lose_qp_games, self.lose_qp_time],
-        ]
+        self.row_labels = list(ROW_LABELS)
 
-        # Modified when a calculation occurs
-        # Number of games and time will be updated and then used to update the data in the games table rows
-        self.updated_games_data = [
-            (self.round_one_games, self.round_one_time),
-            (self.round_two_games, self.round_two_time),
-            (self.lose_final_round_games, self.lose_final_round_time),
-            (self.win_final_round_games, self.win_final_round_time),
-            (self.win_qp_games, self.win_qp_time),
-            (self.second_place_qp_games, self.second_place_qp_time),
-            (self.lose_qp_games, self.lose_qp_time)
-        ]
+        # Games and play time of each round type from the last calculation (RoundResults), None until the first one
+        self.round_results = None
         
         # Weights for how often a certain type of round will occur
-        self.round_one_weight = tk.StringVar(value="25")
-        self.round_two_weight = tk.StringVar(value="20")
-        self.lose_final_round_weight = tk.StringVar(value="10")
-        self.win_final_round_weight = tk.StringVar(value="5")
-        self.win_qp_weight = tk.StringVar(value="15")
-        self.second_place_qp_weight = tk.StringVar(value="5")
-        self.lose_qp_weight = tk.StringVar(value="20")
+        self.round_one_weight = tk.StringVar(value=str(ROUND_WEIGHTS[0]))
+        self.round_two_weight = tk.StringVar(value=str(ROUND_WEIGHTS[1]))
+        self.lose_final_round_weight = tk.StringVar(value=str(ROUND_WEIGHTS[2]))
+        self.win_final_round_weight = tk.StringVar(value=str(ROUND_WEIGHTS[3]))
+        self.win_qp_weight = tk.StringVar(value=str(ROUND_WEIGHTS[4]))
+        self.second_place_qp_weight = tk.StringVar(value=str(ROUND_WEIGHTS[5]))
+        self.lose_qp_weight = tk.StringVar(value=str(ROUND_WEIGHTS[6]))
 
         self.round_weights_vars = [
             self.round_one_weight,
@@ -153,8 +140,31 @@ class WorldTourCalculator(tk.Tk):
             self.lose_qp_weight
         ]
 
+        # Weight changes are checked and recalculated together once typing pauses
         for i, var in enumerate(self.round_weights_vars):
-            var.trace_add("write", lambda *args, idx=i: self.validate_weight(idx, self.round_weights_vars))
+            var.trace_add("write", lambda *args, idx=i: self.on_weight_changed(idx))
+            
+        # --- Live Update Data ---
+        # Recalculate as the user types, after a short pause
+        self.live_update = tk.BooleanVar(value=True)
+        self.recalculate_job = None
+        # Indexes of weight entries edited since the last check
+        self.changed_weights = set()
+        # Inputs of the last calculation and its results, so unchanged outputs are skipped
+        self.last_calculation_inputs = None
+        self.last_table_inputs = None
+        self.last_plan_inputs = None
+        self.last_plan_text = ""
+        self.last_odds_inputs = None
+        self.last_odds_text = ""
+        # Day by day plan, replanned from today when only the current points change
+        self.grind_schedule = None
+        self.last_schedule_inputs = None
+        # Title of the result shown and a function giving its (columns, rows), for the Export button
+        self.last_export = None
+        # Treeview item ids and the values they show, in table order
+        self.tree_items = []
+        self.tree_values = []
             
         # --- General Data --- 
         self.base_result_label_text = "\n Enter info and press calculate \n"
@@ -165,7 +175,7 @@ class WorldTourCalculator(tk.Tk):
                 "dropdown_options": self.world_tour_badge_options,
                 "selected_option": "Emerald 1: 2400",
                 "result_label_text": self.base_result_label_text,
-                "tree_data": self.games_table_rows,
+                "tree_data": self.initial_table_rows(),
             }
         }
         
@@ -176,19 +186,109 @@ class WorldTourCalculator(tk.Tk):
         # Create widgets, population occurs later
         self.badge_dict = {}
         self.badge_var = tk.StringVar()
+        self.points_var = tk.StringVar()
 
         self.goal_label = None
         self.badge_menu = None
         self.points_entry = None
         self.additional_game_time_entry = None
+        self.daily_budget_entry = None
         self.round_weights_frame = None
         self.qp_weight_frame = None
         self.calc_button = None
+        self.simulate_button = None
+        self.exact_button = None
+        self.sensitivity_button = None
+        self.save_progress_button = None
+        self.compare_modes_button = None
         self.result_label = None
         self.tree = None
 
-        # Setup the UI
-        self.setup_ui()
+        # Heavy calculations run in the background so the window keeps responding
+        self.jobs = BackgroundJobs(self)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Hidden debug panel with the instrumentation timings, opened with Ctrl+Shift+D
+        self.debug_panel = None
+        self.debug_label = None
+        self.debug_job = None
+        # Whether instrumentation was already on (e.g. for a startup profile) when the panel opened
+        self.instrumentation_was_enabled = False
+
+        # Saved progress, used to forecast the completion date (read once the window is drawn)
+        self.progress_history = None
+        self.progress_pace = None
+
+        # Setup the UI, the games table is added once the window is drawn
+        with phase("startup.widgets"):
+            self.setup_ui()
+
+        # --- Startup Data ---
+        # The rest of startup runs one step at a time once the first frame is drawn, so the window shows up first
+        self.startup_profile = startup_profile
+        self.startup_profile_path = startup_profile_path
+        self.startup_steps = [
+            ("games_table", self.setup_games_table),
+            ("engine", self.preload_modules),
+            ("progress_history", self.load_progress_pace),
+        ]
+        self.bind("<Map>", self.on_first_map)
+    
+    
+    # --- Startup ---
+    # Called when the window is first shown, draws it and starts the rest of startup
+    def on_first_map(self, event):
+        if event.widget is not self:
+            return
+        self.unbind("<Map>")
+        self.update_idletasks()
+        observe("startup.first_frame", time.perf_counter() - STARTUP_STARTED)
+        self.after_idle(self.run_startup_step)
+    
+    
+    # Run the next startup step, leaving the mainloop free to handle events between steps
+    def run_startup_step(self):
+        name, step = self.startup_steps.pop(0)
+        with phase(f"startup.{name}"):
+            step()
+        
+        if self.startup_steps:
+            self.after_idle(self.run_startup_step)
+            return
+        
+        observe("startup.ready", time.perf_counter() - STARTUP_STARTED)
+        if self.startup_profile:
+            self.report_startup()
+            self.on_close()
+    
+    
+    def preload_modules(self):
+        for name in PRELOADED_MODULES:
+            importlib.import_module(name)
+        # Building the badge lookups imports NumPy too
+        self.badge_index
+    
+    
+    # Print the seconds each startup phase took, and save them as JSON when a path was given
+    def report_startup(self):
+        histograms = REGISTRY.to_dict()["histograms"]
+        timings = {
+            name: histograms[f"startup.{name}"]["sum"] for name in STARTUP_PHASES if f"startup.{name}" in histograms
+        }
+        for name, seconds in timings.items():
+            since = " (since start)" if name in ("first_frame", "ready") else ""
+            print(f"{name:<18}{seconds * 1000:8.1f} ms{since}", file=sys.stderr)
+        
+        if self.startup_profile_path:
+            with open(self.startup_profile_path, "w", encoding="utf-8") as file:
+                json.dump(timings, file, indent=2)
+    
+    
+    # Badge lookups, built the first time they are needed since BadgeIndex imports NumPy
+    @cached_property
+    def badge_index(self):
+        from BadgeIndex import BadgeIndex
+        return BadgeIndex(self.world_tour_badge_options)
     
     
     # --- Math Utility Methods ---
@@ -199,20 +299,18 @@ class WorldTourCalculator(tk.Tk):
      
     # Given a time in minutes, calculates the resulting time in days, hours, and minutes format
     def convert_time(self, bulk_minutes):
-        hours = int(bulk_minutes // 60)
-        minutes = int(bulk_minutes % 60)
-        days = hours // 24
-        
-        # Format differently if the result contains days, hours, or only minutes
-        if days > 0:
-            return f"{days} days, {hours%24} hours, {minutes} minutes\n"
-        elif hours > 0:
-            return f"{hours} hours, {minutes} minutes\n"
-        else:
-            return f"{minutes} minutes\n"
+        return format_duration(bulk_minutes) + "\n"
             
 
     
+    # Games table rows before the first calculation, one game of each round type
+    def initial_table_rows(self):
+        return [
+            (label, 1, format_duration(self.game_time * multiplier))
+            for label, multiplier in zip(self.row_labels, self.round_time_multipliers)
+        ]
+    
+    
     # --- UI Data Management Methods ---
     # When a badge is selected, update the goal points and its display 
     def on_badge_selected(self, *args):
@@ -226,17 +324,31 @@ class WorldTourCalculator(tk.Tk):
      
      
     # Refresh the games table
+    # Rows that already exist are updated in place, and only when their values changed
     def refresh_games_table(self):
+        # The table is added after the first frame, unless a calculation needs it before then
+        if self.tree is None:
+            self.setup_games_table()
+            return
+        
         # Reference to the saved table data
         data = self.tab_data[self.current_tab]
+        rows = [tuple(row) for row in data["tree_data"]]
+        
+        for i, row in enumerate(rows):
+            if i < len(self.tree_items):
+                if self.tree_values[i] != row:
+                    self.tree.item(self.tree_items[i], values=row)
+                    self.tree_values[i] = row
+            else:
+                self.tree_items.append(self.tree.insert("", "end", values=row))
+                self.tree_values.append(row)
         
-        # Clear all existing rows
-        for item in self.tree.get_children():
+        # Remove rows the table no longer has
+        for item in self.tree_items[len(rows):]:
             self.tree.delete(item)
-
-        # Insert updated rows
-        for row in data["tree_data"]:
-            self.tree.insert("", "end", values=row)
+        del self.tree_items[len(rows):]
+        del self.tree_values[len(rows):]
             
             
     # Validate the inputted weight from the user to make sure it doesn't exceed the combined max of 100
@@ -258,6 +370,34 @@ class WorldTourCalculator(tk.Tk):
             weights_vars[index].set(str(max_allowed))
 
 
+    # Remember which weight was edited and recalculate once typing pauses
+    def on_weight_changed(self, index):
+        self.changed_weights.add(index)
+        self.schedule_recalculate()
+    
+    
+    # Restart the live update timer, so a burst of edits only causes one recalculation
+    # Background jobs started for the old inputs are cancelled, their results would be out of date
+    def schedule_recalculate(self, *args):
+        self.jobs.cancel_all()
+        if self.recalculate_job is not None:
+            self.after_cancel(self.recalculate_job)
+        self.recalculate_job = self.after(LIVE_UPDATE_DELAY_MS, self.live_recalculate)
+    
+    
+    # Check the edited weights, then recalculate if live update is on and the inputs are valid
+    def live_recalculate(self):
+        self.recalculate_job = None
+        
+        changed_weights = sorted(self.changed_weights)
+        self.changed_weights.clear()
+        for index in changed_weights:
+            self.validate_weight(index, self.round_weights_vars)
+        
+        if self.live_update.get():
+            self.calculate(live=True)
+
+
     # Update the times when the user changes the additional game time
     def update_time(self, *args):
         try:
@@ -265,96 +405,549 @@ class WorldTourCalculator(tk.Tk):
         except ValueError:
             inputted_time = 0
        
-        self.game_time = self.base_game_time + inputted_time
-        self.round_one_time = self.game_time
-        self.round_two_time = self.game_time * 2
-        self.lose_final_round_time = self.game_time * 3
-        self.win_final_round_time = self.game_time * 3
-        self.win_qp_time = self.game_time
-        self.second_place_qp_time = self.game_time
-        self.lose_qp_time = self.game_time
+        # A game must take at least a minute, calculate reports anything shorter as invalid input
+        self.game_time_valid = self.base_game_time + inputted_time > 0
+        if self.game_time_valid:
+            self.game_time = self.base_game_time + inputted_time
 
 
     # --- Main Calculations ---
     # Calculate the different data points that will be shown to the user
-    def calculate(self):
+    # In live mode, invalid input leaves the last results in place and unchanged inputs are not recalculated
+    def calculate(self, live=False):
         try:
             # Reference to the saved data for world tour tab
             data = self.tab_data["World Tour Tab"]
             
             # The amount of points left to reach the goal points
-            current_points = int(self.points_entry.get())
+            with phase("gui.parse_inputs"):
+                current_points = int(self.points_entry.get())
+                round_weights = [float(var.get() or 0) for var in self.round_weights_vars]
+                daily_budget = int(self.daily_budget.get())
+                if not self.game_time_valid:
+                    raise ValueError("The time between games leaves no time for a game")
+            
+            inputs = (current_points, self.goal_points, self.game_time, tuple(round_weights), daily_budget)
+            if live and inputs == self.last_calculation_inputs:
+                return
+            self.last_calculation_inputs = inputs
+            count("gui.calculations")
+            
             points_remaining = self.goal_points - current_points
             display = f"\n Points remaining: {points_remaining}\n"
             
-            # Number of games required in each round to reach the goal points
-            # Includes both world tour and quick play
-            self.round_one_games = self.division_round_up(points_remaining, self.lose_round_one_points)
-            self.round_two_games = self.division_round_up(points_remaining, self.lose_round_two_points)
-            self.lose_final_round_games = self.division_round_up(points_remaining, self.lose_final_round_points)
-            self.win_final_round_games = self.division_round_up(points_remaining, self.win_final_round_points)
-            self.win_qp_games = self.division_round_up(points_remaining, self.win_qp_points)
-            self.second_place_qp_games= self.division_round_up(points_remaining, self.second_place_qp_points)
-            self.lose_qp_games = self.division_round_up(points_remaining, self.lose_qp_points)
-            
-            # Playtime to reach goal points if only round type specified is played
-            round_one_playtime = self.round_one_games * self.round_one_time
-            round_two_playtime = self.round_two_games * self.round_two_time
-            lose_final_round_playtime = self.lose_final_round_games * self.lose_final_round_time
-            win_final_round_playtime = self.win_final_round_games * self.win_final_round_time
-            win_qp_playtime = self.win_qp_games * self.win_qp_time
-            second_place_qp_playtime = self.second_place_qp_games * self.second_place_qp_time
-            lose_qp_playtime = self.lose_qp_games * self.lose_qp_time
+            # Badge reached so far and the points needed for the next one
+            badge = self.badge_index.classify(current_points)
+            display += f"Current badge: {badge['current_badge'] or 'None'}\n"
+            if badge["next_badge"]:
+                display += f"Points to next rank: {badge['points_to_next']} ({badge['next_badge']}, "
+                display += f"{badge['percent_through_tier']:.0f}% through tier)\n"
+            
+            days_remaining = (self.season_end_date - self.todays_date).days
+            
+            # Games and playtime for each round type, weighted playtime and daily figures are all done by the engine
+            from CalculationEngine import calculate_batch
+            result = calculate_batch(
+                current_points,
+                self.goal_points,
+                self.game_time,
+                days_remaining,
+                self.round_points,
+                self.round_time_multipliers,
+                round_weights,
+            )
+            self.round_results = result.round_results()
+            weighted_playtime = float(result.weighted_playtime[0])
+            self.last_export = (
+                "Calculation", lambda: self.calculation_report(current_points, round_weights, days_remaining)
+            )
             
             # Update the data in the games table and refresh the table to display the updated data
-            self.updated_games_data[0] = (self.round_one_games, self.convert_time(round_one_playtime))
-            self.updated_games_data[1] = (self.round_two_games, self.convert_time(round_two_playtime))
-            self.updated_games_data[2] = (self.lose_final_round_games, self.convert_time(lose_final_round_playtime))
-            self.updated_games_data[3] = (self.win_final_round_games, self.convert_time(win_final_round_playtime))
-            self.updated_games_data[4] = (self.win_qp_games, self.convert_time(win_qp_playtime))
-            self.updated_games_data[5] = (self.second_place_qp_games, self.convert_time(second_place_qp_playtime))
-            self.updated_games_data[6] = (self.lose_qp_games, self.convert_time(lose_qp_playtime))
-
-            for i, (games, time_str) in enumerate(self.updated_games_data):
-                self.games_table_rows[i][1] = games
-                self.games_table_rows[i][2] = time_str
-
-            self.refresh_games_table()
-            
-            # Calculate playtime based on the chance of each round type occurring
-            playtimes = [
-            round_one_playtime,
-            round_two_playtime,
-            lose_final_round_playtime,
-            win_final_round_playtime,
-            win_qp_playtime,
-            second_place_qp_playtime,
-            lose_qp_playtime
-            ]
-            round_weights = [float(var.get() or 0) for var in self.round_weights_vars]
-            weighted_playtime = sum((w / 100) * t for w, t in zip(round_weights, playtimes))
+            # The table only depends on the points remaining and the game time
+            table_inputs = (points_remaining, self.game_time)
+            if table_inputs != self.last_table_inputs:
+                with phase("gui.convert_time"):
+                    data["tree_data"] = self.round_results.table_rows(self.row_labels)
+
+                with phase("gui.table_refresh"):
+                    self.refresh_games_table()
+                self.last_table_inputs = table_inputs
             
             # Estimated amount of play time to reach the goal points based on round weights
             display += f"Estimated play time: {self.convert_time(weighted_playtime)}\n"
             
+            # Fastest mix of round types that doesn't win more or play less quick play than the round weights
+            with phase("gui.fastest_mix"):
+                display += self.fastest_mix_text(points_remaining, round_weights)
+            
             # The amount of points needed per day to reach the goal points
-            days_remaining = (self.season_end_date - self.todays_date).days
-            daily_points = points_remaining // days_remaining
             display += f"Days left in season: {days_remaining}\n"
-            display += f"Daily points: {daily_points}\n"
+            display += f"Daily points: {int(result.daily_points[0])}\n"
+            
+            # Chance of reaching the goal points before the season ends, playing the daily budget
+            with phase("gui.budget_odds"):
+                display += self.budget_odds_text(points_remaining, days_remaining, round_weights, daily_budget)
             
-            # Maximum and weighted time to play each day to reach the goal points
-            display += f"Max daily play time: {self.convert_time(round_one_playtime / days_remaining)}"
-            display += f"Weighted daily play time: {self.convert_time(weighted_playtime / days_remaining)}"
+            # Today's share of a day by day plan that fits in the daily budget
+            with phase("gui.schedule"):
+                display += self.schedule_text(current_points, round_weights, daily_budget)
+            
+            # Completion date at the pace of the saved progress
+            display += self.progress_forecast_text()
             
             # Set and save the result label text
+            if display != data["result_label_text"]:
+                with phase("gui.label_update"):
+                    self.result_label.config(text=display)
+                data["result_label_text"] = display
+            
+        except ValueError:
+            self.last_calculation_inputs = None
+            if not live:
+                self.result_label.config(
+                    text="Please enter a valid points value, time between games and play time per day."
+                )
+                data["result_label_text"] = self.result_label.cget("text")
+    
+    
+    # --- Progress History ---
+    # Open the progress store in the Data folder, None when it can't be opened (e.g. no Data folder)
+    def open_progress_history(self):
+        import sqlite3
+        from ProgressHistory import ProgressHistory
+        
+        if self.progress_history is None:
+            try:
+                self.progress_history = ProgressHistory()
+            except (OSError, sqlite3.Error):
+                return None
+        return self.progress_history
+    
+    
+    # Pace of the progress saved so far this season, read once at startup
+    def load_progress_pace(self):
+        from ProgressHistory import DEFAULT_PLAYER, default_history_path
+        
+        if not os.path.exists(default_history_path()):
+            return
+        history = self.open_progress_history()
+        if history is not None:
+            self.progress_pace = history.pace(DEFAULT_PLAYER, self.season_end_date.isoformat())
+    
+    
+    # Save the entered points as today's progress, and show the updated forecast
+    def save_progress(self):
+        try:
+            current_points = int(self.points_entry.get())
+            
+        except ValueError:
+            self.result_label.config(text="Please enter a valid points value.")
+            return
+        
+        from ProgressHistory import DEFAULT_PLAYER
+        
+        history = self.open_progress_history()
+        if history is None:
+            self.result_label.config(text="\n Progress can't be saved, the Data folder is missing or read only. \n")
+            return
+        
+        try:
+            self.progress_pace = history.record(DEFAULT_PLAYER, current_points, self.season_end_date.isoformat())
+        except ValueError as error:
+            self.result_label.config(text=f"\n {error} \n")
+            return
+        
+        self.last_calculation_inputs = None
+        self.calculate()
+    
+    
+    # Result lines for the projected completion date, empty until progress has been saved on two different days
+    def progress_forecast_text(self):
+        if self.progress_pace is None:
+            return ""
+        
+        forecast = self.progress_pace.forecast(self.goal_points, self.season_end_date, self.todays_date)
+        if forecast["pace"] is None:
+            return ""
+        
+        text = f"\nYour pace: {forecast['pace']:.0f} points per day\n"
+        if forecast["completion_date"] is None:
+            text += "Projected completion: not at this pace\n"
+        else:
+            text += f"Projected completion: {forecast['completion_date'].strftime('%B %d, %Y')}\n"
+        if forecast["chance_before_end"] is not None:
+            text += f"Chance to finish before the season ends: {forecast['chance_before_end']:.0%}\n"
+        return text
+    
+    
+    # Result lines for the fastest mix of round types, only planned again when its inputs change
+    def fastest_mix_text(self, points_remaining, round_weights):
+        inputs = (points_remaining, self.game_time, tuple(round_weights))
+        if inputs == self.last_plan_inputs:
+            return self.last_plan_text
+        
+        from RoundMixPlanner import QUICK_PLAY_ROUNDS, WIN_ROUNDS, max_win_rate, min_quick_play_share, plan_round_mix
+        
+        text = ""
+        weight_total = sum(round_weights)
+        if weight_total > 0 and points_remaining > 0:
+            plan = plan_round_mix(
+                points_remaining,
+                self.game_time,
+                (
+                    max_win_rate(sum(round_weights[i] for i in WIN_ROUNDS) / weight_total),
+                    min_quick_play_share(sum(round_weights[i] for i in QUICK_PLAY_ROUNDS) / weight_total),
+                ),
+                self.round_points,
+                self.round_time_multipliers,
+            )
+            text = f"Fastest mix at your win rate: {self.convert_time(plan.expected_minutes)}"
+            text += ", ".join(
+                f"{share:.0%} {label}" for share, label in zip(plan.shares, self.row_labels) if share > 0
+            ) + "\n\n"
+        
+        self.last_plan_inputs = inputs
+        self.last_plan_text = text
+        return text
+            
+    
+    # Result lines for the chance of reaching the goal when playing the daily budget, and the daily play time needed for
+    # a 50% and 90% chance, only worked out again when their inputs change
+    def budget_odds_text(self, points_remaining, days_remaining, round_weights, daily_budget):
+        inputs = (points_remaining, days_remaining, self.game_time, tuple(round_weights), daily_budget)
+        if inputs == self.last_odds_inputs:
+            return self.last_odds_text
+        
+        from BudgetOdds import BUDGET_TARGETS, DAILY_BUDGETS, budget_odds_curve
+        
+        text = ""
+        if sum(round_weights) > 0 and daily_budget >= 0:
+            curve = budget_odds_curve(
+                points_remaining,
+                days_remaining,
+                self.game_time,
+                sorted(set(DAILY_BUDGETS) | {daily_budget}),
+                round_weights,
+                self.round_points,
+                self.round_time_multipliers,
+            )
+            chance = curve.probabilities[curve.budgets.tolist().index(daily_budget)]
+            text = f"Chance to finish playing {self.convert_time(daily_budget).strip()} a day: {chance:.0%}\n"
+            for target in BUDGET_TARGETS:
+                budget = curve.budget_for(target)
+                needed = self.convert_time(budget) if budget is not None else f"over {DAILY_BUDGETS[-1] // 60} hours\n"
+                text += f"Daily play time for a {target:.0%} chance: {needed}"
+        
+        self.last_odds_inputs = inputs
+        self.last_odds_text = text
+        return text
+    
+    
+    # Result line for the play time planned for today, with the play time per day as each day's limit
+    # A new point total only plans the days from today on again, other changes make a new plan
+    def schedule_text(self, current_points, round_weights, daily_budget):
+        if current_points >= self.goal_points or sum(round_weights) <= 0 or daily_budget < 0:
+            return ""
+        
+        inputs = (self.goal_points, self.game_time, tuple(round_weights), daily_budget, self.todays_date)
+        if inputs == self.last_schedule_inputs:
+            self.grind_schedule.replan(current_points, self.todays_date)
+        else:
+            from GrindSchedule import GrindSchedule
+            self.grind_schedule = GrindSchedule(
+                current_points,
+                self.goal_points,
+                self.todays_date,
+                self.season_end_date,
+                [daily_budget],
+                game_time=self.game_time,
+                round_weights=round_weights,
+                round_points=self.round_points,
+                round_time_multipliers=self.round_time_multipliers,
+            )
+            self.last_schedule_inputs = inputs
+        
+        minutes, points = self.grind_schedule.day(self.todays_date)
+        text = f"Today's plan: {self.convert_time(minutes).strip()} for {points} points\n"
+        if self.grind_schedule.shortfall:
+            text += f"Short of the goal by {self.grind_schedule.shortfall} points at this play time per day\n"
+        return text
+            
+    
+    # Simulate many grinds to the goal points using the round weights, and show the chance of being done in time
+    # The simulation runs in the background in chunks, and the results so far are shown as chunks finish
+    def simulate(self):
+        from PlaytimeSimulator import (
+            SIMULATION_PERCENTILES,
+            SIMULATION_TRAJECTORIES,
+            simulate_chunk,
+            simulation_arguments,
+            simulation_chunks,
+        )
+        
+        try:
+            current_points = int(self.points_entry.get())
+            points_remaining = self.goal_points - current_points
+            round_weights = [float(var.get() or 0) for var in self.round_weights_vars]
+            
+            arguments = simulation_arguments(
+                points_remaining,
+                self.game_time,
+                round_weights,
+                self.round_points,
+                self.round_time_multipliers,
+            )
+            
+        except ValueError:
+            self.result_label.config(text="Please enter a valid points value and round weights.")
+            return
+        
+        tasks = [(simulate_chunk, (seed, size, *arguments)) for seed, size in simulation_chunks(SIMULATION_TRAJECTORIES)]
+        merged = None
+        
+        def on_partial(result, completed, total):
+            nonlocal merged
+            merged = result if merged is None else merged.merge(result)
+            title = f"Simulated {merged.trajectories:,} grinds"
+            if completed < total:
+                title += f" ({completed / total:.0%} done)"
+            
+            self.display_distribution(
+                points_remaining,
+                title,
+                merged.mean_games,
+                merged.mean_minutes,
+                {q: merged.minutes_percentile(q) for q in SIMULATION_PERCENTILES},
+            )
+        
+        self.result_label.config(text="\n Simulating... \n")
+        self.jobs.submit("simulation", tasks, on_partial, on_error=self.show_job_error)
+            
+    
+    # Exact chance of being done in time, worked out from every possible sequence of rounds instead of sampling
+    # The table is built (or reused) in a worker process, so the window stays responsive the first time
+    def exact_odds(self):
+        from ExactDistribution import query_exact_distribution
+        
+        try:
+            current_points = int(self.points_entry.get())
+            round_weights = [float(var.get() or 0) for var in self.round_weights_vars]
+            max_points = max(points for _, points in self.world_tour_badge_options)
+            if self.goal_points - current_points > max_points:
+                raise ValueError
+            
+        except ValueError:
+            self.result_label.config(text="Please enter a valid points value and round weights.")
+            return
+        
+        def on_partial(result, completed, total):
+            self.display_distribution(
+                result["points_remaining"],
+                "Exact distribution",
+                result["mean_games"],
+                result["mean_minutes"],
+                result["minutes_percentiles"],
+            )
+        
+        task = (
+            query_exact_distribution,
+            (
+                current_points,
+                self.goal_points,
+                round_weights,
+                self.game_time,
+                self.round_points,
+                self.round_time_multipliers,
+                max_points,
+            ),
+        )
+        self.result_label.config(text="\n Working out the exact odds... \n")
+        self.jobs.submit("exact", [task], on_partial, on_error=self.show_job_error)
+    
+    
+    # Sweep every set of round weights (in 5% steps) and show which weight changes the play time the most
+    # The sweep only takes a moment, so it runs on a thread instead of sending its large arrays to another process
+    def sensitivity(self):
+        from WeightSweep import SWEEP_VALUE_COLUMNS, sweep_weights
+        
+        def sweep_columns():
+            return WEIGHT_COLUMNS + SWEEP_VALUE_COLUMNS
+        
+        try:
+            current_points = int(self.points_entry.get())
+            
+        except ValueError:
+            self.result_label.config(text="Please enter a valid points value.")
+            return
+        
+        days_remaining = (self.season_end_date - self.todays_date).days
+        task = (
+            sweep_weights,
+            (current_points, self.goal_points, self.game_time, days_remaining, 5, self.round_points, self.round_time_multipliers),
+        )
+        
+        def on_partial(sweep, completed, total):
+            data = self.tab_data["World Tour Tab"]
+            labels = dict(zip(ROUND_NAMES, self.row_labels))
+            
+            display = f"\n Play time over {len(sweep):,} sets of weights:\n"
+            display += f"Fastest: {self.convert_time(sweep.weighted_playtime.min())}"
+            display += f"Slowest: {self.convert_time(sweep.weighted_playtime.max())}"
+            display += "\n Most important weights:\n"
+            for result in sweep.sensitivities()[:3]:
+                change = "more" if result["slope"] > 0 else "less"
+                display += f"{labels[result['round']]}: {abs(result['slope']):.0f} minutes {change} per 1%\n"
+            
             self.result_label.config(text=display)
             data["result_label_text"] = display
+            self.last_export = ("Weight sweep", lambda: (sweep_columns(), sweep.rows()))
+        
+        self.jobs.submit("sweep", [task], on_partial, on_error=self.show_job_error, in_process=False)
+    
+    
+    # Rank every mode that earns world tour points by points per minute, world tour and quick play use the round weights
+    # and the other modes (e.g. Head 2 Head) have equal weights for each outcome
+    def mode_ranking(self):
+        from ModeComparison import COMPARISON_COLUMNS, compare_modes, mode_table
+        
+        try:
+            current_points = int(self.points_entry.get())
+            round_weights = [float(var.get() or 0) for var in self.round_weights_vars]
             
         except ValueError:
-            self.result_label.config(text="Please enter a valid points value.")
+            self.result_label.config(text="Please enter a valid points value and round weights.")
+            return
+        
+        table = mode_table(self.season_registry)
+        for name, weights in (("World Tour", round_weights[:4]), ("Quick Play", round_weights[4:])):
+            if name in table.names and sum(weights) > 0:
+                table.set_weights(name, weights)
+        
+        points_remaining = self.goal_points - current_points
+        days_remaining = (self.season_end_date - self.todays_date).days
+        comparison = compare_modes(table, points_remaining, days_remaining, self.game_time - self.base_game_time)
+        
+        data = self.tab_data["World Tour Tab"]
+        display = f"\n Points remaining: {points_remaining}\n"
+        display += "Modes by points per minute:\n"
+        for rank, i in enumerate(comparison.ranking.tolist(), 1):
+            display += f"{rank}. {table.modes[i].name}: {comparison.points_per_minute[i]:.2f} points per minute, "
+            display += self.convert_time(comparison.minutes_to_goal[i])
+        
+        self.result_label.config(text=display)
+        data["result_label_text"] = display
+        self.last_export = ("Modes by points per minute", lambda: (COMPARISON_COLUMNS, comparison.rows()))
+    
+    
+    # The calculation as one row of the batch command's output, so exports from the window and batch files match
+    def calculation_report(self, current_points, round_weights, days_remaining):
+        from CalculationEngine import calculate_batch
+        
+        result = calculate_batch(
+            [current_points], [self.goal_points], [self.game_time], days_remaining, self.round_points,
+            round_weights=[round_weights],
+        )
+        return BATCH_OUTPUT_COLUMNS, result.batch_rows([""], [current_points], [self.goal_points])
+    
+    
+    # Save the result shown (a calculation, simulation, exact odds, sensitivity or mode ranking) as a report
+    # The format comes from the file extension: CSV, JSON Lines, an HTML summary or the columnar format
+    def export_results(self):
+        if self.last_export is None:
+            self.result_label.config(text="\n Calculate something to export first \n")
+            return
+        
+        from tkinter import filedialog
+        from ReportExport import export_file, export_format
+        
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".csv",
+            filetypes=(
+                ("CSV", "*.csv"),
+                ("JSON Lines", "*.jsonl"),
+                ("HTML summary", "*.html"),
+                ("Columnar", "*.wtc"),
+            ),
+        )
+        if not path:
+            return
+        
+        title, report = self.last_export
+        columns, rows = report()
+        try:
+            export_file(path, export_format(path), columns, rows, f"World Tour Calculator: {title}")
+        except (OSError, ValueError) as error:
+            self.result_label.config(text=f"\n Export failed: {error} \n")
+    
+    
+    # Shown when a background job fails
+    def show_job_error(self, error):
+        self.result_label.config(text=f"\n Calculation failed: {error} \n")
+    
+    
+    # Stop background jobs before closing the window
+    def on_close(self):
+        self.jobs.shutdown()
+        if self.progress_history is not None:
+            self.progress_history.close()
+        self.destroy()
+    
+    
+    # Show the expected games and play time, plus the time needed to be done with each percent chance
+    def display_distribution(self, points_remaining, title, mean_games, mean_minutes, minutes_percentiles):
+        data = self.tab_data["World Tour Tab"]
+        
+        display = f"\n Points remaining: {points_remaining}\n"
+        display += f"{title}\n"
+        display += f"Average games: {mean_games:.0f}\n"
+        display += f"Average play time: {self.convert_time(mean_minutes)}\n"
+        for q, minutes in minutes_percentiles.items():
+            display += f"{q}% chance you're done in: {self.convert_time(minutes)}"
+        
+        self.result_label.config(text=display)
+        data["result_label_text"] = display
+        
+        rows = [("mean", round(float(mean_minutes), 2))]
+        rows += [(f"p{q}", round(float(minutes), 2)) for q, minutes in minutes_percentiles.items()]
+        self.last_export = (title, lambda: (DISTRIBUTION_COLUMNS, rows))
             
     
+    # --- Debug Panel ---
+    # Show or hide the timings of each calculation phase, instrumentation runs while the panel is open and goes back to
+    # how it was when the panel closes
+    def toggle_debug_panel(self, event=None):
+        if self.debug_panel is not None:
+            self.close_debug_panel()
+            return
+        
+        self.instrumentation_was_enabled = is_enabled()
+        enable(True)
+        self.debug_panel = tk.Toplevel(self)
+        self.debug_panel.title("Debug")
+        self.debug_panel.protocol("WM_DELETE_WINDOW", self.close_debug_panel)
+        
+        self.debug_label = tk.Label(self.debug_panel, justify="left", anchor="nw", font=("Courier", 10))
+        self.debug_label.pack(fill="both", expand=True, padx=10, pady=10)
+        ttk.Button(self.debug_panel, text="Reset", command=REGISTRY.reset).pack(pady=(0, 10))
+        self.refresh_debug_panel()
+    
+    
+    def refresh_debug_panel(self):
+        self.debug_label.config(text=REGISTRY.summary_text())
+        self.debug_job = self.after(DEBUG_PANEL_REFRESH_MS, self.refresh_debug_panel)
+    
+    
+    def close_debug_panel(self):
+        enable(self.instrumentation_was_enabled)
+        if self.debug_job is not None:
+            self.after_cancel(self.debug_job)
+            self.debug_job = None
+        self.debug_panel.destroy()
+        self.debug_panel = None
+        self.debug_label = None
+    
+    
     def on_frame_configure(self, event):
         self.canvas.configure(scrollregion=self.canvas.bbox("all"))
     
@@ -378,11 +971,13 @@ class WorldTourCalculator(tk.Tk):
         self.canvas.bind_all("<MouseWheel>", self.on_mousewheel)
         self.canvas.bind_all("<Button-4>", self.on_mousewheel)
         self.canvas.bind_all("<Button-5>", self.on_mousewheel)
+        self.bind_all("<Control-D>", self.toggle_debug_panel)
         
         self.canvas.grid(row=0, column=0, sticky="nsew")
         scrollbar.grid(row=0, column=1, sticky="ns")
         
-        scroll_frame = tk.Frame(self.canvas)
+        # Kept for the games table, which is added later
+        scroll_frame = self.scroll_frame = tk.Frame(self.canvas)
         self.canvas.create_window((0, 0), window=scroll_frame, anchor="nw")
         
         scroll_frame.bind("<Configure>", self.on_frame_configure)
@@ -400,6 +995,7 @@ class WorldTourCalculator(tk.Tk):
 
         self.badge_var.set(dropdown_options[-1])
         self.badge_var.trace_add("write", self.on_badge_selected)
+        self.badge_var.trace_add("write", self.schedule_recalculate)
 
         self.badge_menu = ttk.OptionMenu(
             scroll_frame,
@@ -417,7 +1013,8 @@ class WorldTourCalculator(tk.Tk):
         points_entry_label = tk.Label(points_entry_frame, text="Enter current points:", font=("Gadugi", 12))
         points_entry_label.grid(row=0, column=0, padx=5, pady=(0, 20), sticky=tk.E)
 
-        self.points_entry = ttk.Entry(points_entry_frame, font=("Gadugi", 10))
+        self.points_entry = ttk.Entry(points_entry_frame, textvariable=self.points_var, font=("Gadugi", 10))
+        self.points_var.trace_add("write", self.schedule_recalculate)
         self.points_entry.grid(row=0, column=1, padx=5, pady=(0, 20))
         
         # Additional game time input
@@ -426,6 +1023,13 @@ class WorldTourCalculator(tk.Tk):
         
         self.additional_game_time_entry = ttk.Entry(points_entry_frame, textvariable=self.additional_game_time, font=("Gadugi", 10))
         self.additional_game_time_entry.grid(row=1, column=1, padx=5)
+        
+        # Daily play time input
+        daily_budget_label = tk.Label(points_entry_frame, text="Play time per day (minutes):", font=("Gadugi", 12))
+        daily_budget_label.grid(row=2, column=0, padx=5, pady=(20, 0))
+        
+        self.daily_budget_entry = ttk.Entry(points_entry_frame, textvariable=self.daily_budget, font=("Gadugi", 10))
+        self.daily_budget_entry.grid(row=2, column=1, padx=5, pady=(20, 0))
 
         # World tour weights frame
         self.round_weights_frame = tk.Frame(scroll_frame)
@@ -478,9 +1082,34 @@ class WorldTourCalculator(tk.Tk):
                 row=2, column=i, padx=15, pady=(5, 30)
             )
             
-        # Calculate button
-        self.calc_button = ttk.Button(scroll_frame, text="Calculate", command=self.calculate, cursor="question_arrow")
-        self.calc_button.grid(row=5, column=0, columnspan=3, pady=(20, 0))
+        # Action buttons
+        button_frame = tk.Frame(scroll_frame)
+        button_frame.grid(row=5, column=0, columnspan=3, pady=(20, 0))
+        
+        self.calc_button = ttk.Button(button_frame, text="Calculate", command=self.calculate, cursor="question_arrow")
+        self.calc_button.grid(row=0, column=0, padx=10)
+        
+        self.simulate_button = ttk.Button(button_frame, text="Simulate", command=self.simulate, cursor="question_arrow")
+        self.simulate_button.grid(row=0, column=1, padx=10)
+        
+        self.exact_button = ttk.Button(button_frame, text="Exact Odds", command=self.exact_odds, cursor="question_arrow")
+        self.exact_button.grid(row=0, column=2, padx=10)
+        
+        self.sensitivity_button = ttk.Button(button_frame, text="Sensitivity", command=self.sensitivity, cursor="question_arrow")
+        self.sensitivity_button.grid(row=1, column=0, padx=10, pady=(10, 0))
+        
+        self.save_progress_button = ttk.Button(button_frame, text="Save Progress", command=self.save_progress, cursor="question_arrow")
+        self.save_progress_button.grid(row=1, column=1, padx=10, pady=(10, 0))
+        
+        self.compare_modes_button = ttk.Button(button_frame, text="Compare Modes", command=self.mode_ranking, cursor="question_arrow")
+        self.compare_modes_button.grid(row=1, column=2, padx=10, pady=(10, 0))
+        
+        self.export_button = ttk.Button(button_frame, text="Export", command=self.export_results, cursor="question_arrow")
+        self.export_button.grid(row=2, column=1, padx=10, pady=(10, 0))
+        
+        ttk.Checkbutton(button_frame, text="Update as I type", variable=self.live_update).grid(
+            row=3, column=0, columnspan=3, pady=(10, 0)
+        )
 
         # Results section
         result_frame = ttk.Frame(scroll_frame)
@@ -488,10 +1117,15 @@ class WorldTourCalculator(tk.Tk):
 
         self.result_label = tk.Label(result_frame, text=self.base_result_label_text, font=("Gadugi", 12))
         self.result_label.grid(row=0, column=0, padx=15, pady=15)
-
-        # Games table
+    
+    
+    # Games table, below the fold so it is added after the first frame
+    def setup_games_table(self):
+        if self.tree is not None:
+            return
+        
         columns = ("round_type", "number_of_rounds", "playtime")
-        self.tree = ttk.Treeview(scroll_frame, columns=columns, show="headings", height=8)
+        self.tree = ttk.Treeview(self.scroll_frame, columns=columns, show="headings", height=8)
         self.tree.heading("round_type", text="Round Type")
         self.tree.heading("number_of_rounds", text="Number of Rounds")
         self.tree.heading("playtime", text="Playtime")
@@ -501,17 +1135,28 @@ class WorldTourCalculator(tk.Tk):
         self.tree.column("playtime", width=200, anchor=tk.CENTER)
 
         # Initial tree rows for World Tour
-        self.tree.insert("", "end", values=(self.row_labels[0], self.round_one_games, self.convert_time(self.round_one_time)))
-        self.tree.insert("", "end", values=(self.row_labels[1], self.round_two_games, self.convert_time(self.round_two_time)))
-        self.tree.insert("", "end", values=(self.row_labels[2], self.lose_final_round_games, self.convert_time(self.lose_final_round_time)))
-        self.tree.insert("", "end", values=(self.row_labels[3], self.win_final_round_games, self.convert_time(self.win_final_round_time)))
-        self.tree.insert("", "end", values=(self.row_labels[4], self.win_qp_games, self.convert_time(self.win_qp_time)))
-        self.tree.insert("", "end", values=(self.row_labels[5], self.second_place_qp_games, self.convert_time(self.second_place_qp_time)))
-        self.tree.insert("", "end", values=(self.row_labels[6], self.lose_qp_games, self.convert_time(self.lose_qp_time)))
+        self.refresh_games_table()
 
         self.tree.grid(row=7, column=0, columnspan=3, padx=50, pady=(40, 50))
     
     
 if __name__ == "__main__":
-    app = WorldTourCalculator()
+    # Needed for the simulation process pool in the pyinstaller build (multiprocessing is slow to import, and only
+    # needed here when frozen)
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+        multiprocessing.freeze_support()
+    
+    # Time each startup phase, then close once the window is ready
+    startup_profile = sys.argv[1:2] == ["--startup-profile"]
+    if startup_profile:
+        enable()
+        observe("startup.imports", time.perf_counter() - STARTUP_STARTED)
+    
+    # Any other arguments run the headless command line mode instead of the window
+    elif len(sys.argv) > 1:
+        from CommandLine import main
+        sys.exit(main(sys.argv[1:]))
+    
+    app = WorldTourCalculator(startup_profile, sys.argv[2] if startup_profile and len(sys.argv) > 2 else None)
     app.mainloop()
@@ -0,0 +1,6 @@
+# The scripts import each other by module name, as when they are run from the PythonScripts folder
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "PythonScripts"))
@@ -0,0 +1,56 @@
+# Request fields are bounded before they reach the engine, and one bad key doesn't fail the rest of its batch
+
+import asyncio
+import json
+
+import pytest
+
+from CalculatorServer import CalculatorServer, RequestError
+from GameConstants import MAX_POINTS
+from SeasonData import default_registry
+
+
+@pytest.fixture
+def server():
+    return CalculatorServer(default_registry())
+
+
+@pytest.mark.parametrize("fields", [
+    {"current_points": MAX_POINTS + 1},
+    {"current_points": 10 ** 30},
+    {"current_points": -1},
+    {"current_points": 0, "goal": MAX_POINTS + 1},
+    {"current_points": 0, "goal": "1e400"},
+    {"current_points": 0, "additional_game_time": 10 ** 20},
+])
+def test_out_of_range_integers_are_request_errors(server, fields):
+    with pytest.raises(RequestError) as error:
+        server.normalize(fields)
+    assert error.value.status == 400
+
+
+def test_largest_points_are_accepted(server):
+    current_points, goal_points, *_ = server.normalize({"current_points": MAX_POINTS, "goal": MAX_POINTS})
+    assert current_points == goal_points == MAX_POINTS
+
+
+def test_failing_key_only_fails_its_own_requests(server):
+    good = server.normalize({"current_points": 1000})
+    # Slips past normalize, so the engine fails on it
+    bad = ("not a number",) + good[1:]
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in range(3)]
+        server.pending = [(good, futures[0]), (bad, futures[1]), (good, futures[2])]
+        server.flush()
+        return futures
+
+    futures = asyncio.run(run())
+    assert futures[1].exception() is not None
+    for future in (futures[0], futures[2]):
+        status, body = future.result()
+        assert status == 200
+        assert json.loads(body)["current_points"] == 1000
+    assert server.cache.get(good) is not None
+    assert server.cache.get(bad) is None
@@ -0,0 +1,48 @@
+# A game time of 0 minutes or less is rejected rather than dividing by zero or looping forever
+
+from types import SimpleNamespace
+
+import pytest
+
+from BudgetOdds import day_points_distribution
+from CommandLine import main, parse_chunk
+from GameConstants import BASE_GAME_TIME, WORLD_TOUR_BADGE_OPTIONS
+from WorldTourCalculator import WorldTourCalculator
+
+
+BADGE_POINTS = {label.lower(): points for label, points in WORLD_TOUR_BADGE_OPTIONS}
+
+
+@pytest.mark.parametrize("game_time", [0, -1, -BASE_GAME_TIME])
+def test_budget_odds_rejects_game_time(game_time):
+    with pytest.raises(ValueError):
+        day_points_distribution(60, game_time)
+
+
+@pytest.mark.parametrize("additional_game_time", [-BASE_GAME_TIME, -BASE_GAME_TIME - 5])
+def test_batch_rows_reject_game_time(additional_game_time):
+    with pytest.raises(ValueError, match="additional_game_time"):
+        parse_chunk([{"current_points": "0", "additional_game_time": str(additional_game_time)}], BADGE_POINTS)
+
+
+def test_shortest_game_time_is_accepted():
+    rows = [{"current_points": "0", "additional_game_time": str(1 - BASE_GAME_TIME)}]
+    _, _, game_time, _ = parse_chunk(rows, BADGE_POINTS)
+    assert game_time.tolist() == [1]
+
+
+def test_odds_command_reports_game_time(capsys):
+    assert main(["odds", "0", "--additional-game-time", str(-BASE_GAME_TIME)]) == 1
+    assert capsys.readouterr().err.startswith("error: ")
+
+
+@pytest.mark.parametrize("additional_game_time, valid", [(str(-BASE_GAME_TIME), False), ("0", True)])
+def test_window_marks_game_time(additional_game_time, valid):
+    window = SimpleNamespace(
+        additional_game_time=SimpleNamespace(get=lambda: additional_game_time),
+        base_game_time=BASE_GAME_TIME,
+        game_time=BASE_GAME_TIME + 3,
+    )
+    WorldTourCalculator.update_time(window)
+    assert window.game_time_valid is valid
+    assert window.game_time == (BASE_GAME_TIME if valid else BASE_GAME_TIME + 3)
@@ -0,0 +1,49 @@
+# Roster rows and play times are bounded, so the median's histogram can't grow with a bad row
+
+import math
+
+import numpy as np
+import pytest
+
+from CommandLine import parse_chunk
+from GameConstants import MAX_POINTS, WORLD_TOUR_BADGE_OPTIONS
+from RosterReport import MAX_TRACKED_MINUTES, RosterSummary
+
+
+BADGE_POINTS = {label.lower(): points for label, points in WORLD_TOUR_BADGE_OPTIONS}
+
+
+@pytest.mark.parametrize("row, column", [
+    ({"current_points": str(MAX_POINTS + 1)}, "current_points"),
+    ({"current_points": "0", "goal": str(10 ** 18)}, "goal"),
+    ({"current_points": "0", "goal": -5}, "goal"),
+    ({"current_points": "0", "round_one_weight": "nan"}, "round_one_weight"),
+    ({"current_points": "0", "round_one_weight": "150"}, "round_one_weight"),
+])
+def test_out_of_range_rows_are_rejected(row, column):
+    with pytest.raises(ValueError, match=column):
+        parse_chunk([row], BADGE_POINTS)
+
+
+@pytest.mark.parametrize("goal", [math.inf, math.nan])
+def test_non_finite_goal_is_rejected(goal):
+    with pytest.raises(ValueError):
+        parse_chunk([{"current_points": 0, "goal": goal}], BADGE_POINTS)
+
+
+@pytest.mark.parametrize("minutes", [math.nan, math.inf, -1.0])
+def test_non_finite_play_time_is_rejected(minutes):
+    summary = RosterSummary(["Bronze"])
+    with pytest.raises(ValueError):
+        summary.add(["a"], np.array([10]), np.array([minutes]), np.array([1.0]), np.array([-1]))
+
+
+def test_histogram_is_capped():
+    summary = RosterSummary(["Bronze"])
+    summary.add(
+        ["a", "b", "c"], np.array([10, 10, 10]), np.array([1e300, 1e12, 30.0]), np.array([1.0, 1.0, 1.0]),
+        np.array([-1, -1, 0]),
+    )
+    assert len(summary.minutes_counts) == MAX_TRACKED_MINUTES + 1
+    assert summary.median_hours == MAX_TRACKED_MINUTES / 60
+    assert summary.badge_distribution() == {"No badge": 2, "Bronze": 1}
@@ -0,0 +1,49 @@
+# A season cache that is cut short or corrupt is built again from the data folder instead of failing
+
+import os
+import shutil
+
+import pytest
+
+from SeasonData import CACHE_FILE_NAME, DATA_DIRECTORY, load_season_registry
+
+
+@pytest.fixture
+def data_directory(tmp_path):
+    directory = tmp_path / "Data"
+    directory.mkdir()
+    for name in os.listdir(DATA_DIRECTORY):
+        if name.endswith((".txt", ".ods")):
+            shutil.copy(os.path.join(DATA_DIRECTORY, name), directory)
+    return directory
+
+
+def _damage_cache(path, damage):
+    data = path.read_bytes()
+    if damage == "empty":
+        data = b""
+    elif damage == "prefix":
+        data = data[:10]
+    elif damage == "header":
+        data = data[:40]
+    elif damage == "tables":
+        data = data[:len(data) - 8]
+    elif damage == "garbage":
+        data = data[:16] + b"\xff" * (len(data) - 16)
+    path.write_bytes(data)
+
+
+@pytest.mark.parametrize("damage", ["empty", "prefix", "header", "tables", "garbage"])
+def test_damaged_cache_is_rebuilt(data_directory, damage):
+    expected = load_season_registry(str(data_directory))
+    badges, round_points, end_date = expected.badge_options(), expected.round_points, expected.season_end_date
+
+    cache_path = data_directory / CACHE_FILE_NAME
+    _damage_cache(cache_path, damage)
+    registry = load_season_registry(str(data_directory))
+
+    assert registry.badge_options() == badges
+    assert registry.round_points == round_points
+    assert registry.season_end_date == end_date
+    # The cache file was written again and is read from now on
+    assert load_season_registry(str(data_directory)).badge_options() == badges